@@ -0,0 +1,25 @@
+"""基准脚本共用的小工具"""
+
+import time
+from typing import Callable
+
+
+def timeit(fn: Callable[[], object], repeat: int = 5, number: int = 1) -> float:
+    """重复运行 fn，返回单次调用的最短耗时，单位 ms"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1000
+
+
+def report(title: str, rows: list[tuple[str, ...]], header: tuple[str, ...]):
+    """以对齐的表格打印结果"""
+    widths = [max(len(str(r[i])) for r in [header, *rows]) for i in range(len(header))]
+    print(f"== {title} ==")
+    print("  ".join(str(h).ljust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+    print()
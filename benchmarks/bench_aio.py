@@ -0,0 +1,95 @@
+"""事件循环延迟：在循环中直接 draw vs 线程池 adraw vs 进程池 adraw
+
+一个协程每 5 ms 醒来一次并记录实际醒来时间比预定时间晚多少，
+同时有 8 个协程不断绘制长文本，统计延迟的分位数与绘制吞吐量。
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+from impaper import ColorTextDrawer
+from impaper.aio import AsyncRunner
+
+from ._common import report
+from .bench_draw_many import make_messages
+
+TICK = 0.005
+CLIENTS = 8
+
+
+async def measure(
+    drawer: ColorTextDrawer, texts: list[str], draw
+) -> tuple[list[float], float]:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    async def client(texts):
+        for text in texts:
+            await draw(drawer, text)
+
+    tick = asyncio.ensure_future(ticker())
+    await asyncio.sleep(TICK * 4)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(texts[i::CLIENTS]) for i in range(CLIENTS)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return lags, len(texts) / elapsed
+
+
+async def inline(drawer, text):
+    drawer.draw_encoded(text)
+    await asyncio.sleep(0)
+
+
+async def offloaded(drawer, text):
+    await drawer.adraw_encoded(text)
+
+
+def main():
+    # 长文本：每段 10 条消息
+    texts = ["\n".join(make_messages(10, seed=i)) for i in range(32)]
+    drawer = ColorTextDrawer()
+    drawer.draw_encoded(texts[0])
+
+    workers = max(2, os.cpu_count() or 1)
+    rows = []
+    for name, runner, draw in (
+        ("inline draw", None, inline),
+        ("thread adraw", AsyncRunner("thread", workers=workers), offloaded),
+        ("process adraw", AsyncRunner("process", workers=workers), offloaded),
+    ):
+        if runner is not None:
+            drawer.async_runner = runner
+            # 等待工作进程启动
+            asyncio.run(drawer.adraw_encoded(texts[0]))
+        lags, throughput = asyncio.run(measure(drawer, texts, draw))
+        lags = sorted(lag * 1000 for lag in lags)
+        rows.append(
+            (
+                name,
+                f"{statistics.median(lags):.2f}",
+                f"{lags[int(len(lags) * 0.99)]:.2f}",
+                f"{lags[-1]:.2f}",
+                f"{throughput:.1f}",
+            )
+        )
+        if runner is not None:
+            runner.close()
+    report(
+        f"event loop lag, {CLIENTS} clients, {workers} workers",
+        rows,
+        ("mode", "p50 ms", "p99 ms", "max ms", "images/s"),
+    )
+
+
+if __name__ == "__main__":
+    main()
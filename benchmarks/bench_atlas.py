@@ -0,0 +1,50 @@
+"""字形图集：FreeType 直接绘制与图集贴图绘制的耗时对比，及图集命中率"""
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.atlas import GlyphAtlas
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+
+def main():
+    text = "\n".join(make_messages(20))
+    rows = []
+    for cls in (SimpleTextDrawer, ColorTextDrawer):
+        drawer = cls()
+        im = drawer.draw(text)
+        plain = timeit(lambda: drawer.draw(text), repeat=3)
+        drawer.glyph_atlas = GlyphAtlas()
+        cold = timeit(lambda: drawer.draw(text), repeat=1, number=1)
+        warm = timeit(lambda: drawer.draw(text), repeat=3)
+        stats = drawer.glyph_atlas.stats()
+        rows.append(
+            (
+                cls.__name__,
+                f"{im.size[0]}x{im.size[1]}",
+                f"{plain:.1f}",
+                f"{cold:.1f}",
+                f"{warm:.1f}",
+                f"{plain / warm:.1f}x",
+                str(stats.entries),
+                f"{stats.hit_rate:.1%}",
+            )
+        )
+    report(
+        "glyph atlas",
+        rows,
+        (
+            "drawer",
+            "size",
+            "freetype ms",
+            "atlas cold ms",
+            "atlas warm ms",
+            "speedup",
+            "glyphs",
+            "hit rate",
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""画布池：每次新建画布 vs CanvasPool 复用分桶画布
+
+模拟高并发下尺寸各异的彩色图像：行数在 1 到 300 之间随机的文本，逐个 draw 后丢弃。
+每种情况在独立的进程中运行，记录吞吐量、新建画布的次数，
+以及每绘制 50 张时的常驻内存（/proc/self/statm），观察其波动与增长。
+使用画布池时 finish 仍会为裁剪后的输出图像分配一次实际尺寸的内存。
+仅支持 Linux。
+"""
+
+import multiprocessing as mp
+import os
+import random
+import resource
+import time
+
+from impaper import ColorTextDrawer
+from impaper.atlas import GlyphAtlas
+from impaper.canvas import CanvasPool
+
+from ._common import report
+
+IMAGES = 600
+SAMPLE_EVERY = 50
+
+
+def make_texts(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = ["hello", "world", "你好", "世界", "<Red>", "<Reset/>", "ok", "日志"]
+    return [
+        "\n".join(
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 12)))
+            for _ in range(rng.randint(1, 300))
+        )
+        for _ in range(n)
+    ]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def worker(pooled: bool, queue):
+    drawer = ColorTextDrawer()
+    # 用字形图集缩短光栅化时间，突出画布分配的开销
+    drawer.glyph_atlas = GlyphAtlas()
+    if pooled:
+        drawer.canvas_pool = CanvasPool(max_bytes=128 * 1024 * 1024)
+    texts = make_texts(IMAGES)
+    # 预热字形图集
+    for text in texts[:20]:
+        drawer.draw(text)
+    warmup_allocations = drawer.canvas_pool.stats().allocations if pooled else 0
+    samples = []
+    start = time.perf_counter()
+    for i, text in enumerate(texts, 1):
+        drawer.draw(text)
+        if i % SAMPLE_EVERY == 0:
+            samples.append(rss_mb())
+    seconds = time.perf_counter() - start
+    # 不使用画布池时每张图像新建一次画布
+    allocations = IMAGES
+    if pooled:
+        allocations = drawer.canvas_pool.stats().allocations - warmup_allocations
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((IMAGES / seconds, allocations, samples, peak))
+
+
+def measure(pooled: bool):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=worker, args=(pooled, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    rows = []
+    for pooled in (False, True):
+        throughput, allocations, samples, peak = measure(pooled)
+        rows.append(
+            (
+                "CanvasPool" if pooled else "Image.new",
+                f"{throughput:.1f}",
+                str(allocations),
+                f"{min(samples):.0f}-{max(samples):.0f}",
+                f"{samples[-1] - samples[0]:+.0f}",
+                f"{peak:.0f}",
+            )
+        )
+    report(
+        f"{IMAGES} RGB images of 1-300 lines",
+        rows,
+        (
+            "canvas",
+            "images/s",
+            "canvas allocations",
+            "RSS MB",
+            "RSS drift MB",
+            "peak MB",
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
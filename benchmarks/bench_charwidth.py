@@ -0,0 +1,57 @@
+"""char_width / string_width 微基准：ASCII、纯 CJK、混排三种语料
+
+"linear" 是逐区间线性扫描的实现，作为对照。
+"""
+
+import random
+
+from impaper import charwidth
+from impaper.charwidth import char_width, string_width
+
+from ._common import report, timeit
+
+_RANGES = charwidth._load().ranges
+
+
+def linear_char_width(c: str) -> int:
+    o = ord(c)
+    for _, end, wid in _RANGES:
+        if o <= end:
+            return wid
+    return 1
+
+
+def corpora(n: int = 100_000, seed: int = 0) -> dict[str, str]:
+    rng = random.Random(seed)
+    ascii_ = "".join(
+        rng.choice("abcdefghijklmnopqrstuvwxyz0123456789 .,:;-_") for _ in range(n)
+    )
+    cjk = "".join(chr(rng.randrange(0x4E00, 0x9FA5)) for _ in range(n))
+    mixed = "".join(rng.choice((ascii_, cjk))[i] for i in range(n))
+    return {"ascii": ascii_, "cjk": cjk, "mixed": mixed}
+
+
+def main():
+    rows = []
+    for name, text in corpora().items():
+        linear = timeit(lambda: sum(map(linear_char_width, text)), repeat=3)
+        table = timeit(lambda: sum(map(char_width, text)), repeat=3)
+        vectorized = timeit(lambda: string_width(text), repeat=3)
+        rows.append(
+            (
+                name,
+                str(len(text)),
+                f"{linear:.2f}",
+                f"{table:.2f}",
+                f"{vectorized:.2f}",
+            )
+        )
+    report(
+        "character width, ms per corpus",
+        rows,
+        ("corpus", "chars", "linear char_width", "table char_width", "string_width"),
+    )
+
+
+if __name__ == "__main__":
+    main()
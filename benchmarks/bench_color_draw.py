@@ -0,0 +1,113 @@
+"""ColorTextDrawer.draw：逐字符绘制 vs 同色文本段合并绘制
+
+统计每张图调用 drawboard.text 的次数与耗时。
+"""
+
+import random
+
+from PIL import ImageDraw
+
+from impaper import ColorTextDrawer
+from impaper.charwidth import string_width
+from impaper.canvas import RGBCanvas
+
+from ._common import report, timeit
+
+
+def make_text(n_chars: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    colors = ["Red", "Yellow", "Green", "Blue", "Peach"]
+    pieces = []
+    size = 0
+    while size < n_chars:
+        word = "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz你好世界日志")
+            for _ in range(rng.randint(3, 12))
+        )
+        if rng.random() < 0.2:
+            word = f"<{rng.choice(colors)}>{word}<Reset/>"
+        pieces.append(word)
+        size += len(word) + 1
+    return " ".join(pieces)
+
+
+def draw_per_char(ctd: ColorTextDrawer, text: str):
+    """改动前的实现：每个字符调用一次 drawboard.text"""
+    lines = ctd.ts.wrap_text(text)
+    text_size = ctd._text_size_list([ctd._labels_re.sub("", i) for i in lines])
+    canvas_builder = RGBCanvas()
+    canvas_builder.size(ctd.canvas_size(text_size))
+    canvas_builder.background(ctd.bg_color)
+    canvas = canvas_builder.build()
+    drawboard = ImageDraw.Draw(canvas)
+    left, up = ctd.text_position()
+    fw, fh = ctd.fontbox_size()
+    color = ctd.fg_color
+    for i, line in enumerate(lines):
+        x = left
+        y = up + fh * i + i * ctd.conf.layout.spacing
+        for _, token in ctd.ts.iter_tokens(line):
+            if token in ctd._labels:
+                color = (
+                    ctd.fg_color
+                    if token == "<Reset/>"
+                    else ctd.conf.colors[token[1:-1]]
+                )
+            else:
+                drawboard.text(xy=(x, y), text=token, fill=color, font=ctd.font)
+                x += string_width(token) * fw
+    return canvas
+
+
+def count_calls(fn) -> int:
+    calls = 0
+    original = ImageDraw.ImageDraw.text
+
+    def counting(self, *args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original(self, *args, **kwargs)
+
+    ImageDraw.ImageDraw.text = counting
+    try:
+        fn()
+    finally:
+        ImageDraw.ImageDraw.text = original
+    return calls
+
+
+def main():
+    ctd = ColorTextDrawer()
+    rows = []
+    for n in (2000, 5000):
+        text = make_text(n)
+        before_calls = count_calls(lambda: draw_per_char(ctd, text))
+        after_calls = count_calls(lambda: ctd.draw(text))
+        before_ms = timeit(lambda: draw_per_char(ctd, text), repeat=3)
+        after_ms = timeit(lambda: ctd.draw(text), repeat=3)
+        rows.append(
+            (
+                str(n),
+                str(before_calls),
+                str(after_calls),
+                f"{before_ms:.1f}",
+                f"{after_ms:.1f}",
+                f"{before_ms / after_ms:.1f}x",
+            )
+        )
+    report(
+        "ColorTextDrawer.draw",
+        rows,
+        (
+            "chars",
+            "calls(before)",
+            "calls(after)",
+            "ms(before)",
+            "ms(after)",
+            "speedup",
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""导入耗时与每次调用的配置开销
+
+导入耗时由子进程中 `python -X importtime` 的输出累加得到，取多次运行的最小值；
+配置开销包括给 `ColorTextDrawer.conf` 赋值、计算渲染结果缓存的键、解析绘制参数，
+以及命中渲染结果缓存的 draw（此时几乎只剩配置相关的开销）。
+"""
+
+import subprocess
+import sys
+
+from impaper import ColorTextDrawer, ColorTextDrawerConfig, SimpleTextDrawer
+from impaper.render_cache import MemoryRenderCache, render_key
+
+from ._common import report, timeit
+
+STATEMENTS = (
+    "import impaper",
+    "from impaper import SimpleTextDrawer",
+    "from impaper import ColorTextDrawer; import impaper.aio",
+)
+
+
+def import_ms(statement: str, runs: int = 5) -> float:
+    "语句导入的全部模块的耗时之和，单位 ms"
+    best = float("inf")
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            total += int(line.split("|")[0].split(":")[1])
+        best = min(best, total / 1000)
+    return best
+
+
+def main():
+    report(
+        "import time (python -X importtime, sum of self time)",
+        [(s, f"{import_ms(s):.1f}") for s in STATEMENTS],
+        ("statement", "ms"),
+    )
+
+    ctd = ColorTextDrawer()
+    std = SimpleTextDrawer()
+    conf = ColorTextDrawerConfig()
+    ctd.render_cache = MemoryRenderCache()
+    ctd.draw("hello")
+    number = 2000
+    rows = [
+        (
+            "ColorTextDrawer.conf = ...",
+            timeit(lambda: setattr(ctd, "conf", conf), number=number),
+        ),
+        (
+            "render_key(ColorTextDrawer)",
+            timeit(lambda: render_key(ctd, "hello", "image"), number=number),
+        ),
+        (
+            "render_key(SimpleTextDrawer)",
+            timeit(lambda: render_key(std, "hello", "image"), number=number),
+        ),
+        ("ColorTextDrawer._prepare", timeit(ctd._prepare, number=number)),
+        (
+            "ColorTextDrawer.draw, cache hit",
+            timeit(lambda: ctd.draw("hello"), number=number),
+        ),
+    ]
+    report(
+        "per-call config overhead",
+        [(name, f"{ms * 1000:.1f}") for name, ms in rows],
+        ("call", "us"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""实时日志视图：每次追加后对整个缓冲区 draw vs Document.append
+
+模拟每秒追加若干行日志，记录每一轮更新的耗时；
+draw 的耗时随缓冲区增长，append 只与新增文本的长度有关。
+"""
+
+import time
+
+from impaper import ColorTextDrawer
+from impaper.atlas import GlyphAtlas
+from impaper.document import Document
+
+from ._common import report
+from .bench_draw_many import make_messages
+
+ROUNDS = 200
+LINES_PER_ROUND = 5
+
+
+def main():
+    messages = make_messages(ROUNDS * LINES_PER_ROUND)
+    drawer = ColorTextDrawer()
+    # 用字形图集缩短光栅化时间，两种方式同样受益
+    drawer.glyph_atlas = GlyphAtlas()
+    doc = Document(drawer)
+    buffer = ""
+    draw_ms, append_ms = [], []
+    for r in range(ROUNDS):
+        chunk = "".join(
+            m + "\n" for m in messages[r * LINES_PER_ROUND : (r + 1) * LINES_PER_ROUND]
+        )
+        buffer += chunk
+        start = time.perf_counter()
+        drawer.draw(buffer)
+        draw_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        doc.append(chunk)
+        doc.image()
+        append_ms.append((time.perf_counter() - start) * 1000)
+    rows = []
+    for r in (0, ROUNDS // 2 - 1, ROUNDS - 1):
+        rows.append(
+            (
+                str(r + 1),
+                str((r + 1) * LINES_PER_ROUND),
+                f"{draw_ms[r]:.1f}",
+                f"{append_ms[r]:.1f}",
+            )
+        )
+    rows.append(("total", "", f"{sum(draw_ms):.0f}", f"{sum(append_ms):.0f}"))
+    report(
+        f"live tail, {LINES_PER_ROUND} lines per update",
+        rows,
+        ("update", "lines", "draw ms", "append+image ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
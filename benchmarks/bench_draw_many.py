@@ -0,0 +1,42 @@
+"""批量绘制吞吐量：循环调用 draw vs draw_many（单线程 / 线程池）"""
+
+import random
+import time
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+
+from ._common import report
+
+
+def make_messages(n: int = 300, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = ["hello", "world", "你好", "世界", "<Red>", "<Reset/>", "ok", "日志"]
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(3, 20))) for _ in range(n)
+    ]
+
+
+def throughput(fn, n: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    messages = make_messages()
+    rows = []
+    for drawer in (SimpleTextDrawer(), ColorTextDrawer()):
+        name = type(drawer).__name__
+        drawer.draw(messages[0])  # 预热字体
+        cases = {
+            "loop draw": lambda: [drawer.draw(m) for m in messages],
+            "draw_many": lambda: list(drawer.draw_many(messages)),
+            "draw_many workers=4": lambda: list(drawer.draw_many(messages, workers=4)),
+        }
+        for case, fn in cases.items():
+            rows.append((name, case, f"{throughput(fn, len(messages)):.0f}"))
+    report(f"{len(messages)} short messages", rows, ("drawer", "mode", "images/s"))
+
+
+if __name__ == "__main__":
+    main()
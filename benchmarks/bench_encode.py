@@ -0,0 +1,70 @@
+"""编码阶段：draw 后 im.save(BytesIO(), "PNG") vs draw_encoded 各预设
+
+报告每张图的编码耗时、字节数与端到端耗时。
+"""
+
+from io import BytesIO
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.encode import encode_image
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+
+def save_default(im):
+    buffer = BytesIO()
+    im.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def main():
+    messages = make_messages(20)
+    text = "\n".join(messages)
+    rows = []
+    for drawer in (SimpleTextDrawer(), ColorTextDrawer()):
+        name = type(drawer).__name__
+        im = drawer.draw(text)
+        cases = [
+            (
+                "PNG default",
+                lambda: save_default(im),
+                lambda: save_default(drawer.draw(text)),
+            )
+        ]
+        for format, preset in [
+            ("PNG", "fast"),
+            ("PNG", "small"),
+            ("PNG", "palette"),
+            ("WEBP", "fast"),
+            ("JPEG", "fast"),
+        ]:
+            if preset == "palette" and im.mode != "L":
+                continue
+            cases.append(
+                (
+                    f"{format} {preset}",
+                    lambda f=format, p=preset: encode_image(im, f, p),
+                    lambda f=format, p=preset: drawer.draw_encoded(text, f, p),
+                )
+            )
+        for case, encode, end_to_end in cases:
+            size = len(encode())
+            rows.append(
+                (
+                    name,
+                    case,
+                    f"{timeit(encode, repeat=5):.2f}",
+                    str(size),
+                    f"{timeit(end_to_end, repeat=3):.1f}",
+                )
+            )
+    report(
+        f"encode {im.size[0]}x{im.size[1]} image",
+        rows,
+        ("drawer", "encoder", "encode ms", "bytes", "end-to-end ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""N 个工作进程各自加载字体后的内存占用："bytes" 加载 vs "path" 加载
+
+每个工作进程加载默认字体并渲染一段文本，然后在所有进程都存活时读取
+/proc/<pid>/smaps_rollup 中的 Rss、Pss 与匿名内存。
+仅支持 Linux。
+"""
+
+import multiprocessing as mp
+
+from impaper import SimpleTextDrawer
+from impaper.fonts import FontRegistry
+
+from ._common import report
+
+WORKERS = (1, 4, 8)
+
+
+def memory_kb() -> dict[str, int]:
+    result = {}
+    with open("/proc/self/smaps_rollup") as fp:
+        for line in fp:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss", "Anonymous"):
+                result[key] = int(value.split()[0])
+    return result
+
+
+def worker(loader: str, barrier, queue):
+    drawer = SimpleTextDrawer()
+    drawer.font_registry = FontRegistry(loader=loader)
+    drawer.draw("你好世界，hello world。" * 20)
+    barrier.wait()
+    queue.put(memory_kb())
+    barrier.wait()
+
+
+def measure(loader: str, n: int) -> dict[str, int]:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n)
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(loader, barrier, queue)) for _ in range(n)
+    ]
+    for p in procs:
+        p.start()
+    samples = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {key: sum(s[key] for s in samples) for key in samples[0]}
+
+
+def main():
+    rows = []
+    for n in WORKERS:
+        for loader in ("bytes", "path"):
+            m = measure(loader, n)
+            rows.append(
+                (
+                    str(n),
+                    loader,
+                    str(m["Rss"] // 1024),
+                    str(m["Pss"] // 1024),
+                    str(m["Anonymous"] // 1024),
+                )
+            )
+    report(
+        "font memory, summed over workers",
+        rows,
+        ("workers", "loader", "Rss MB", "Pss MB", "Anon MB"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""TextDrawer 创建并首次取得字体的耗时：各自读取字体 vs 共享字体注册表"""
+
+from io import BytesIO
+
+from PIL import ImageFont
+
+from impaper import SimpleTextDrawer
+from impaper.fonts import FontRegistry
+
+from ._common import report, timeit
+
+
+def private_font():
+    """改动前的实现：每个绘制器把整个字体文件复制进自己的 BytesIO"""
+    drawer = SimpleTextDrawer()
+    data = BytesIO(FontRegistry._read(drawer.conf.font.path))
+    return ImageFont.truetype(data, size=drawer.fontsize)
+
+
+def shared_font():
+    return SimpleTextDrawer().font
+
+
+def main():
+    shared_font()  # 预热注册表
+    before = timeit(private_font, repeat=5)
+    after = timeit(shared_font, repeat=5, number=100)
+    report(
+        "new drawer + font",
+        [("private BytesIO", f"{before:.3f}"), ("font_registry", f"{after:.3f}")],
+        ("loader", "ms/drawer"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""标签密集文本的排版：逐行重新匹配标签 vs 整段分词一次
+
+旧的流程先折行，再对每一行用标签正则去掉标签以测量宽度，绘制时又逐行匹配一遍标签；
+新的流程由 `iter_token_lines` 整段分词一次，折行、测量、拆分文本段共用同一份结果。
+只比较排版（不含光栅化），宽度缓存关闭。
+"""
+
+import random
+
+from impaper import ColorTextDrawer
+from impaper.charwidth import string_width
+
+from ._common import report, timeit
+
+
+def make_dense(n_words: int, label_ratio: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    colors = ["Red", "Yellow", "Green", "Blue", "Peach", "Mauve"]
+    pieces = []
+    for _ in range(n_words):
+        word = "".join(
+            rng.choice("abcdefgxyz你好世界") for _ in range(rng.randint(1, 6))
+        )
+        if rng.random() < label_ratio:
+            word = f"<{rng.choice(colors)}>{word}<Reset/>"
+        pieces.append(word)
+        if rng.random() < 0.05:
+            pieces.append("\n")
+    return " ".join(pieces)
+
+
+def layout_per_line(ctd: ColorTextDrawer, text: str):
+    "旧的流程：折行后逐行去掉标签测量，再逐行匹配标签拆分文本段"
+    lines = ctd.ts.wrap_text(text)
+    width = max(string_width(ctd._labels_re.sub("", line)) for line in lines)
+    spans = []
+    color = ctd.fg_color
+    for line in lines:
+        runs = []
+        column = 0
+        cursor = 0
+        for m in ctd._labels_re.finditer(line):
+            start, end = m.span()
+            if start > cursor:
+                runs.append((column, line[cursor:start], color))
+                column += string_width(line[cursor:start])
+            label = m.group()
+            color = (
+                ctd.fg_color if label == "<Reset/>" else ctd.conf.colors[label[1:-1]]
+            )
+            cursor = end
+        if cursor < len(line):
+            runs.append((column, line[cursor:], color))
+        spans.append(runs)
+    return width, spans
+
+
+def main():
+    ctd = ColorTextDrawer()
+    ctd.width_cache = None
+    rows = []
+    for ratio in (0.1, 0.5, 1.0):
+        text = make_dense(3000, ratio)
+        labels = len(ctd._labels_re.findall(text))
+        rows.append(
+            (
+                f"{ratio:.0%}",
+                str(labels),
+                f"{timeit(lambda: layout_per_line(ctd, text)):.2f}",
+                f"{timeit(lambda: ctd.layout(text)):.2f}",
+            )
+        )
+    report(
+        "3000 words, layout only",
+        rows,
+        ("labelled words", "labels", "per-line ms", "token stream ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""先量尺寸再绘制：draw 后再 canvas_size（折行两次）vs layout + render（折行一次）
+
+另外给出只排版（layout）与 pickle 往返的耗时，排版结果可以在进程之间传递或缓存。
+"""
+
+import pickle
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.atlas import GlyphAtlas
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+
+def measure_then_draw(drawer, text: str):
+    size = drawer.canvas_size(drawer.text_size(text))
+    return size, drawer.draw(text)
+
+
+def layout_then_render(drawer, text: str):
+    layout = drawer.layout(text)
+    return layout.canvas_size, drawer.render(layout)
+
+
+def main():
+    text = "\n".join(make_messages(100))
+    rows = []
+    for cls in (SimpleTextDrawer, ColorTextDrawer):
+        drawer = cls()
+        # 用字形图集缩短光栅化时间，突出折行与测量的开销
+        drawer.glyph_atlas = GlyphAtlas()
+        drawer.width_cache = None
+        layout = drawer.layout(text)
+        rows.append(
+            (
+                cls.__name__,
+                f"{timeit(lambda: measure_then_draw(drawer, text)):.2f}",
+                f"{timeit(lambda: layout_then_render(drawer, text)):.2f}",
+                f"{timeit(lambda: drawer.layout(text)):.2f}",
+                f"{timeit(lambda: pickle.loads(pickle.dumps(layout))):.2f}",
+            )
+        )
+    report(
+        "measure + draw, width cache off",
+        rows,
+        ("drawer", "size+draw ms", "layout+render ms", "layout ms", "pickle ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
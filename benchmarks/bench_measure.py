@@ -0,0 +1,50 @@
+"""计算画布尺寸：折行后逐行去掉标签再测量 vs 折行时直接得出每行宽度
+
+旧的流程对每一行执行 `_labels_re.sub` 与 `string_width`（或查询宽度缓存）；
+`iter_measured_lines` 在折行的同时给出每行宽度，尺寸计算只是对行宽取最大值。
+"""
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.cache import WidthCache
+from impaper.charwidth import string_width
+
+from ._common import report, timeit
+from .bench_labels import make_dense
+
+
+def size_by_sub(drawer, text: str, cache: WidthCache | None):
+    lines = drawer.ts.wrap_text(text)
+    measure = string_width if cache is None else cache.measure
+    if isinstance(drawer, ColorTextDrawer):
+        lines = [drawer._labels_re.sub("", line) for line in lines]
+    return max(measure(line) for line in lines), len(lines)
+
+
+def size_by_wrap(drawer, text: str):
+    widths = [width for _, width in drawer.ts.iter_measured_lines(text)]
+    return max(widths), len(widths)
+
+
+def main():
+    text = make_dense(5000, 0.3)
+    rows = []
+    for drawer in (SimpleTextDrawer(), ColorTextDrawer()):
+        cache = WidthCache()
+        assert size_by_sub(drawer, text, None) == size_by_wrap(drawer, text)
+        rows.append(
+            (
+                type(drawer).__name__,
+                f"{timeit(lambda: size_by_sub(drawer, text, None)):.2f}",
+                f"{timeit(lambda: size_by_sub(drawer, text, cache)):.2f}",
+                f"{timeit(lambda: size_by_wrap(drawer, text)):.2f}",
+            )
+        )
+    report(
+        "5000 words, 30% labelled",
+        rows,
+        ("drawer", "wrap+measure ms", "wrap+cached ms", "measured wrap ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""SimpleTextDrawer 各输出模式的 PNG 体积与耗时：L、P（不同灰度级数）、1 位黑白"""
+
+from impaper import OutputMode, SimpleTextDrawer
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+MODES = [
+    None,
+    OutputMode("P", levels=16),
+    OutputMode("P", levels=4),
+    OutputMode("P", levels=2),
+    OutputMode("1", threshold=128),
+]
+
+
+def main():
+    text = "\n".join(make_messages(20))
+    drawer = SimpleTextDrawer()
+    im = drawer.draw(text)
+    rows = []
+    for mode in MODES:
+        drawer.output_mode = mode
+        name = (
+            "L"
+            if mode is None
+            else (
+                f"{mode.mode} levels={mode.levels}"
+                if mode.mode == "P"
+                else f"1 threshold={mode.threshold}"
+            )
+        )
+        data = drawer.draw_encoded(text)
+        rows.append(
+            (
+                name,
+                str(len(data)),
+                f"{timeit(lambda: drawer.draw(text), repeat=3):.1f}",
+                f"{timeit(lambda: drawer.draw_encoded(text), repeat=3):.1f}",
+            )
+        )
+    report(
+        f"output modes, {im.size[0]}x{im.size[1]}, PNG fast",
+        rows,
+        ("mode", "bytes", "draw ms", "draw+encode ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
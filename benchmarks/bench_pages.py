@@ -0,0 +1,55 @@
+"""分页绘制：手工按高度切分文本后逐段 draw vs 一遍折行的 iter_pages
+
+手工切分需要先折行一遍算出每页的行数，再对每一段重新折行、测量。
+另外给出 iter_pages 返回第一页的耗时，体现按需绘制。
+"""
+
+import time
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.atlas import GlyphAtlas
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+MAX_HEIGHT = 4096
+
+
+def draw_by_hand(drawer, text: str) -> list:
+    n = drawer.page_lines(MAX_HEIGHT)
+    lines = drawer.ts.wrap_text(text)
+    return [drawer.draw("\n".join(lines[i : i + n])) for i in range(0, len(lines), n)]
+
+
+def first_page_ms(drawer, text: str) -> float:
+    start = time.perf_counter()
+    next(drawer.iter_pages(text, MAX_HEIGHT))
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    text = "\n".join(make_messages(400))
+    rows = []
+    for cls in (SimpleTextDrawer, ColorTextDrawer):
+        drawer = cls()
+        # 用字形图集缩短光栅化时间，突出折行与测量的差别
+        drawer.glyph_atlas = GlyphAtlas()
+        pages = list(drawer.iter_pages(text, MAX_HEIGHT))
+        rows.append(
+            (
+                cls.__name__,
+                str(len(pages)),
+                f"{timeit(lambda: draw_by_hand(drawer, text), repeat=3):.1f}",
+                f"{timeit(lambda: list(drawer.iter_pages(text, MAX_HEIGHT)), repeat=3):.1f}",
+                f"{first_page_ms(drawer, text):.1f}",
+            )
+        )
+    report(
+        f"pagination, max height {MAX_HEIGHT}px",
+        rows,
+        ("drawer", "pages", "by hand ms", "iter_pages ms", "first page ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""多进程渲染池吞吐量：单进程循环 vs RenderPool，并打印各工作进程的吞吐量"""
+
+import os
+import time
+from io import BytesIO
+
+from impaper import ColorTextDrawer
+from impaper.pool import RenderPool
+
+from ._common import report
+from .bench_draw_many import make_messages
+
+
+def main():
+    messages = make_messages(600)
+    drawer = ColorTextDrawer()
+    rows = []
+
+    start = time.perf_counter()
+    for m in messages:
+        drawer.draw(m).save(BytesIO(), "PNG")
+    rows.append(
+        ("single process", f"{len(messages) / (time.perf_counter() - start):.0f}")
+    )
+
+    for processes in sorted({2, os.cpu_count() or 1}):
+        with RenderPool.from_drawer(drawer, processes=processes) as pool:
+            pool.render(messages[0])  # 等待工作进程启动
+            start = time.perf_counter()
+            for _ in pool.imap(messages):
+                pass
+            elapsed = time.perf_counter() - start
+            rows.append((f"RenderPool x{processes}", f"{len(messages) / elapsed:.0f}"))
+            workers = [
+                (str(pid), str(s.images), f"{s.throughput:.0f}")
+                for pid, s in pool.stats().items()
+            ]
+        report(
+            f"RenderPool x{processes} workers", workers, ("pid", "images", "images/s")
+        )
+    report(f"{len(messages)} messages, PNG encoded", rows, ("mode", "images/s"))
+
+
+if __name__ == "__main__":
+    main()
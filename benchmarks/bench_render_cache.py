@@ -0,0 +1,44 @@
+"""渲染结果缓存：重复渲染同一批模板文本时，无缓存 vs 内存缓存 vs 磁盘缓存
+
+每轮从 20 段模板中按固定的随机序列取 200 次，统计每段文本的平均耗时与命中率。
+"""
+
+import random
+import tempfile
+
+from impaper import ColorTextDrawer
+from impaper.render_cache import DiskRenderCache, MemoryRenderCache
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+
+def main():
+    templates = make_messages(20, seed=1)
+    rng = random.Random(0)
+    texts = [rng.choice(templates) for _ in range(200)]
+    drawer = ColorTextDrawer()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cache in (
+            ("none", None),
+            ("memory", MemoryRenderCache()),
+            ("disk", DiskRenderCache(directory)),
+        ):
+            drawer.render_cache = cache
+            for kind, fn in (
+                ("draw", lambda: [drawer.draw(t) for t in texts]),
+                ("draw_encoded", lambda: [drawer.draw_encoded(t) for t in texts]),
+            ):
+                ms = timeit(fn, repeat=3) / len(texts)
+                hit_rate = f"{cache.stats().hit_rate:.1%}" if cache else "-"
+                rows.append((name, kind, f"{ms:.3f}", hit_rate))
+    report(
+        f"{len(texts)} renders of {len(templates)} templates",
+        rows,
+        ("cache", "call", "ms/text", "hit rate"),
+    )
+
+
+if __name__ == "__main__":
+    main()
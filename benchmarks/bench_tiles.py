@@ -0,0 +1,84 @@
+"""超长文本的峰值内存：整幅 draw vs 分块 iter_tiles
+
+每种情况在独立的进程中运行，读取进程的峰值常驻内存（ru_maxrss）。
+整幅绘制会超过 Pillow 的解压炸弹像素上限，这里临时放开以便对比。
+仅支持 Linux。
+"""
+
+import multiprocessing as mp
+import resource
+import time
+
+from PIL import Image
+
+from impaper import SimpleTextDrawer
+from impaper.atlas import GlyphAtlas
+
+from ._common import report
+
+LINES = (2_000, 20_000, 100_000)
+TILE_HEIGHT = 1024
+
+
+def make_log(n: int) -> str:
+    return "".join(
+        f"2024-01-01 00:00:{i % 60:02d} [INFO] worker-{i % 7} 处理请求 #{i}\n"
+        for i in range(n)
+    )
+
+
+def worker(mode: str, n: int, queue):
+    Image.MAX_IMAGE_PIXELS = None
+    drawer = SimpleTextDrawer()
+    # 用字形图集缩短绘制时间，不影响两种方式的内存对比
+    drawer.glyph_atlas = GlyphAtlas()
+    text = make_log(n)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "draw":
+        im = drawer.draw(text)
+        pixels = im.width * im.height
+        del im
+    else:
+        pixels = 0
+        for tile in drawer.iter_tiles(text, TILE_HEIGHT):
+            pixels += tile.image.width * tile.image.height
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((pixels, seconds, base, peak))
+
+
+def measure(mode: str, n: int):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=worker, args=(mode, n, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    rows = []
+    for n in LINES:
+        for mode in ("draw", "tiles"):
+            pixels, seconds, base, peak = measure(mode, n)
+            rows.append(
+                (
+                    str(n),
+                    mode,
+                    f"{pixels / 1e6:.1f}",
+                    f"{seconds:.2f}",
+                    str(peak // 1024),
+                    str((peak - base) // 1024),
+                )
+            )
+    report(
+        f"long text, tile height {TILE_HEIGHT}px",
+        rows,
+        ("lines", "mode", "Mpx", "seconds", "peak MB", "growth MB"),
+    )
+
+
+if __name__ == "__main__":
+    main()
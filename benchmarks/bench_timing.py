@@ -0,0 +1,41 @@
+"""分阶段计时的开销与各阶段耗时分布"""
+
+from impaper import ColorTextDrawer
+from impaper.timing import HistogramSink
+
+from ._common import report, timeit
+from .bench_draw_many import make_messages
+
+
+def main():
+    messages = make_messages(200)
+    drawer = ColorTextDrawer()
+
+    def run():
+        for m in messages:
+            drawer.draw_encoded(m)
+
+    rows = []
+    run()
+    rows.append(("disabled", f"{timeit(run) / len(messages):.3f}"))
+    sink = HistogramSink()
+    drawer.timing_sink = sink
+    rows.append(("HistogramSink", f"{timeit(run) / len(messages):.3f}"))
+    report("draw_encoded with timing", rows, ("timing_sink", "ms / image"))
+
+    rows = [
+        (
+            stage,
+            s.count,
+            f"{s.p50 * 1000:.3f}",
+            f"{s.p90 * 1000:.3f}",
+            f"{s.p99 * 1000:.3f}",
+            f"{s.max * 1000:.3f}",
+        )
+        for stage, s in sink.summary().items()
+    ]
+    report("stages", rows, ("stage", "count", "p50 ms", "p90 ms", "p99 ms", "max ms"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""计算文本区尺寸时的整行宽度缓存：不缓存 vs WidthCache
+
+语料由重复出现的模板行与大量只出现一次的行混合而成，打印耗时与缓存统计。
+"""
+
+import random
+
+from impaper import SimpleTextDrawer
+from impaper.cache import WidthCache
+
+from ._common import report, timeit
+
+
+def make_lines(n: int = 50_000, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    templates = [f"[INFO] 服务 {i} 启动完成，耗时 {i * 3} ms" for i in range(200)]
+    lines = []
+    for i in range(n):
+        if rng.random() < 0.7:
+            lines.append(rng.choice(templates))
+        else:
+            lines.append(f"request #{i} 处理中：{rng.random():.6f}")
+    return lines
+
+
+def main():
+    lines = make_lines()
+    drawer = SimpleTextDrawer()
+    rows = []
+    drawer.width_cache = None
+    rows.append(
+        (
+            "off",
+            f"{timeit(lambda: drawer._text_size_list(lines), repeat=3):.2f}",
+            "-",
+            "-",
+        )
+    )
+    for max_bytes in (64 * 1024, 4 * 1024 * 1024):
+        drawer.width_cache = WidthCache(max_bytes)
+        ms = timeit(lambda: drawer._text_size_list(lines), repeat=3)
+        stats = drawer.width_cache.stats()
+        rows.append(
+            (
+                f"{max_bytes // 1024} KiB",
+                f"{ms:.2f}",
+                f"{stats.hit_rate:.2f}",
+                str(stats.evictions),
+            )
+        )
+    report(
+        f"_text_size_list, {len(lines)} lines",
+        rows,
+        ("cache", "ms", "hit rate", "evictions"),
+    )
+
+
+if __name__ == "__main__":
+    main()
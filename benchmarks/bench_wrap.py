@@ -0,0 +1,133 @@
+"""1 MB 文本的折行：逐字符两遍扫描 vs 按同宽片段计算的单遍流式折行引擎
+
+语料有混排、纯 ASCII、纯汉字三种。用 tracemalloc 统计峰值内存。
+"list" 为 wrap_text 返回完整行列表，"stream" 为逐行消费 iter_wrapped_lines，
+不保留已处理的行。
+"""
+
+import random
+import tracemalloc
+
+from impaper.charwidth import char_width
+from impaper.charwidth import char_width
+from impaper.typesetting import IgnorableTypeSetting, TypeSetting
+
+from ._common import report, timeit
+
+
+def make_text(words: list[str], size: int = 1_000_000, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    n = 0
+    while n < size:
+        w = rng.choice(words)
+        if rng.random() < 0.02:
+            w += "\n"
+        parts.append(w)
+        n += len(w) + 1
+    return " ".join(parts)
+
+
+def iter_widths(ts: TypeSetting, txt: str):
+    if isinstance(ts, IgnorableTypeSetting):
+        for i, token in ts.iter_tokens(txt):
+            yield i, token, 0 if token in ts.labels else char_width(token)
+    else:
+        for i, c in enumerate(txt):
+            yield i, c, char_width(c)
+
+
+def two_pass_wrap_text(ts: TypeSetting, txt: str) -> list[str]:
+    """最初的实现：逐字符为整个文本打上换行、折行标记，再按标记切分"""
+    signs = {}
+    width = 0
+    for i, token, cw in iter_widths(ts, txt):
+        if token == "\n":
+            signs[i] = 1
+            width = 0
+            continue
+        if width + cw > ts.conf.line_width:
+            signs[i] = 2
+            width = ts.indent_size + 1
+            continue
+        width += cw
+    lines = []
+    cursor = 0
+    need_wrap = False
+    for seq, sign in signs.items():
+        prefix = ts.conf.indentation if need_wrap else ""
+        if sign == 1:
+            lines.append(prefix + txt[cursor:seq])
+            need_wrap = False
+            cursor = seq + 1
+        else:
+            lines.append(prefix + txt[cursor:seq])
+            cursor = seq
+            need_wrap = True
+    if txt[cursor:]:
+        lines.append((ts.conf.indentation if need_wrap else "") + txt[cursor:])
+    return lines
+
+
+def consume(iterable):
+    for _ in iterable:
+        pass
+
+
+def peak_kb(fn) -> int:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak // 1024
+
+
+CORPORA = {
+    "mixed": [
+        "hello",
+        "world",
+        "日志",
+        "你好世界",
+        "error:",
+        "0x1f2e",
+        "<Red>",
+        "<Reset/>",
+    ],
+    "ascii": ["GET", "/api/v1/items", "200", "12ms", "user=alice", "<Red>", "<Reset/>"],
+    "cjk": ["你好世界", "服务启动完成", "请求处理中", "日志", "<Red>", "<Reset/>"],
+}
+
+
+def main():
+    rows = []
+    for corpus, words in CORPORA.items():
+        text = make_text(words)
+        for name, ts in (
+            ("TypeSetting", TypeSetting()),
+            (
+                "IgnorableTypeSetting",
+                IgnorableTypeSetting(labels={"<Red>", "<Reset/>"}),
+            ),
+        ):
+            cases = {
+                "two-pass": lambda: two_pass_wrap_text(ts, text),
+                "list": lambda: ts.wrap_text(text),
+                "stream": lambda: consume(ts.iter_wrapped_lines(text)),
+            }
+            for case, fn in cases.items():
+                rows.append(
+                    (
+                        corpus,
+                        name,
+                        case,
+                        f"{timeit(fn, repeat=3):.1f}",
+                        str(peak_kb(fn)),
+                    )
+                )
+    report(
+        "wrap 1 MB of text", rows, ("corpus", "typesetting", "mode", "ms", "peak KiB")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""基准套件使用的生成语料，只依赖固定的随机种子，同一版本的 Python 上结果完全一致
+
++ `ascii`: 英文日志，时间戳、级别、模块名与消息
++ `cjk`: 纯中文段落，含全角标点
++ `mixed`: 中英文、数字与半角符号混排
++ `labels`: 标签密集的彩色文本，约三成单词带颜色标签
+"""
+
+import random
+from typing import Callable
+
+__all__ = ("CORPORA", "make_corpus")
+
+_LEVELS = ("DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR")
+_MODULES = ("http.server", "db.pool", "auth", "scheduler", "cache", "worker.3")
+_WORDS = (
+    "request",
+    "handled",
+    "in",
+    "ms",
+    "user",
+    "session",
+    "expired",
+    "retry",
+    "connection",
+    "reset",
+    "by",
+    "peer",
+    "timeout",
+    "after",
+    "queue",
+    "depth",
+)
+_HANZI = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+_PUNCT = "，，，。、；："
+_COLORS = ("Red", "Yellow", "Green", "Blue", "Peach", "Mauve", "Teal", "Pink")
+
+
+def _ascii_line(rng: random.Random, i: int) -> str:
+    words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 14)))
+    return (
+        f"2023-03-{i % 28 + 1:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d} "
+        f"{rng.choice(_LEVELS):<7} [{rng.choice(_MODULES)}] {words} id={rng.randrange(1 << 32):08x}"
+    )
+
+
+def _cjk_line(rng: random.Random, i: int) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        parts.append("".join(rng.choice(_HANZI) for _ in range(rng.randint(4, 16))))
+        parts.append(rng.choice(_PUNCT))
+    return "".join(parts[:-1]) + "。"
+
+
+def _mixed_line(rng: random.Random, i: int) -> str:
+    pieces = []
+    for _ in range(rng.randint(3, 12)):
+        r = rng.random()
+        if r < 0.4:
+            pieces.append("".join(rng.choice(_HANZI) for _ in range(rng.randint(1, 6))))
+        elif r < 0.8:
+            pieces.append(rng.choice(_WORDS))
+        else:
+            pieces.append(f"{rng.randint(0, 9999)}{rng.choice('%,.:;()')}")
+    return " ".join(pieces)
+
+
+def _labels_line(rng: random.Random, i: int) -> str:
+    pieces = []
+    for _ in range(rng.randint(3, 12)):
+        word = (
+            rng.choice(_WORDS)
+            if rng.random() < 0.5
+            else "".join(rng.choice(_HANZI) for _ in range(rng.randint(1, 4)))
+        )
+        if rng.random() < 0.3:
+            word = f"<{rng.choice(_COLORS)}>{word}<Reset/>"
+        pieces.append(word)
+    return " ".join(pieces)
+
+
+CORPORA: dict[str, Callable[[random.Random, int], str]] = {
+    "ascii": _ascii_line,
+    "cjk": _cjk_line,
+    "mixed": _mixed_line,
+    "labels": _labels_line,
+}
+
+
+def make_corpus(kind: str, lines: int, seed: int = 0) -> str:
+    "生成 lines 行（折行前）kind 类语料，以换行符连接"
+    make_line = CORPORA[kind]
+    rng = random.Random(f"{kind}/{seed}")
+    return "\n".join(make_line(rng, i) for i in range(lines))
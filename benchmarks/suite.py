@@ -0,0 +1,272 @@
+"""可复现的基准套件：在生成的语料上测量公开接口，结果写入 JSON，并与基线比较
+
+```sh
+# 在改动前运行一次，保存为基线
+python -m benchmarks.suite run -o baseline.json
+# 改动后再次运行并比较，任一用例慢于基线超过阈值时以状态码 1 退出
+python -m benchmarks.suite run -o current.json
+python -m benchmarks.suite compare baseline.json current.json --threshold 0.10
+```
+
+`run` 的 `--quick` 把十万行的用例缩小为一万行，`--filter` 只运行名称包含指定子串的用例。
+每个用例重复若干次，每次连续调用到至少 `MIN_SAMPLE` 秒，记录单次调用的最短与中位耗时；
+比较时使用最短耗时，受偶发干扰最小。
+全部用例只依赖仓库自带的字体与生成语料，不需要网络。
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, NamedTuple
+
+import PIL
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.charwidth import char_width, string_width
+from impaper.typesetting import IgnorableTypeSetting, TypeSetting
+
+from ._common import report
+from .corpora import CORPORA, make_corpus
+
+# JSON 结果的格式版本，格式不兼容时递增
+FORMAT = 1
+# 每次采样的最短时长，单位秒，耗时很短的用例在一次采样内重复调用
+MIN_SAMPLE = 0.01
+
+
+class Case(NamedTuple):
+    """一个基准用例
+
+    + `name`: 名称，形如 `接口/语料/行数`
+    + `setup`: 准备输入，返回无参数的被测函数，不计入耗时
+    + `repeat`: 重复次数
+    """
+
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    repeat: int = 5
+
+
+def _char_width_case(kind: str, lines: int) -> Callable[[], object]:
+    text = make_corpus(kind, lines)
+    return lambda: [char_width(c) for c in text]
+
+
+def _string_width_case(kind: str, lines: int) -> Callable[[], object]:
+    text_lines = make_corpus(kind, lines).split("\n")
+    return lambda: [string_width(line) for line in text_lines]
+
+
+def _wrap_case(kind: str, lines: int) -> Callable[[], object]:
+    text = make_corpus(kind, lines)
+    ts = TypeSetting()
+    return lambda: ts.wrap_text(text)
+
+
+def _iter_tokens_case(kind: str, lines: int) -> Callable[[], object]:
+    text = make_corpus(kind, lines)
+    its: IgnorableTypeSetting = ColorTextDrawer().ts
+    return lambda: sum(1 for _ in its.iter_tokens(text))
+
+
+def _draw_case(drawer_cls, kind: str, lines: int) -> Callable[[], object]:
+    text = make_corpus(kind, lines)
+    drawer = drawer_cls()
+    return lambda: drawer.draw(text)
+
+
+def make_cases(large: int) -> list[Case]:
+    "全部用例，large 为大输入的行数"
+    cases = []
+    for kind in CORPORA:
+        cases.append(
+            Case(f"char_width/{kind}/1000", lambda k=kind: _char_width_case(k, 1000))
+        )
+        cases.append(
+            Case(
+                f"string_width/{kind}/1000", lambda k=kind: _string_width_case(k, 1000)
+            )
+        )
+        for lines, repeat in ((1, 5), (large, 3)):
+            cases.append(
+                Case(
+                    f"wrap_text/{kind}/{lines}",
+                    lambda k=kind, n=lines: _wrap_case(k, n),
+                    repeat,
+                )
+            )
+    for lines, repeat in ((1, 5), (large, 3)):
+        cases.append(
+            Case(
+                f"iter_tokens/labels/{lines}",
+                lambda n=lines: _iter_tokens_case("labels", n),
+                repeat,
+            )
+        )
+    # 绘制的耗时与图像面积成正比，十万行的图像需要上 GB 内存，大输入只用 100 行
+    for kind in ("ascii", "cjk", "mixed"):
+        for lines, repeat in ((1, 5), (100, 3)):
+            cases.append(
+                Case(
+                    f"SimpleTextDrawer.draw/{kind}/{lines}",
+                    lambda k=kind, n=lines: _draw_case(SimpleTextDrawer, k, n),
+                    repeat,
+                )
+            )
+    for lines, repeat in ((1, 5), (100, 3)):
+        cases.append(
+            Case(
+                f"ColorTextDrawer.draw/labels/{lines}",
+                lambda n=lines: _draw_case(ColorTextDrawer, "labels", n),
+                repeat,
+            )
+        )
+    return cases
+
+
+def run_case(case: Case) -> dict:
+    fn = case.setup()
+    # 预热：加载字体、填充缓存，同时估计单次耗时
+    start = time.perf_counter()
+    fn()
+    number = max(1, int(MIN_SAMPLE / max(time.perf_counter() - start, 1e-9)))
+    samples = []
+    for _ in range(case.repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "repeat": case.repeat,
+        "number": number,
+    }
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pillow": PIL.__version__,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run(args) -> int:
+    large = 10_000 if args.quick else 100_000
+    results = {}
+    for case in make_cases(large):
+        if args.filter and args.filter not in case.name:
+            continue
+        results[case.name] = result = run_case(case)
+        print(f"{case.name:<40} {result['min_ms']:>12.3f} ms", file=sys.stderr)
+    data = {"format": FORMAT, "environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    return 0
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float
+) -> tuple[list[tuple[str, ...]], list[str]]:
+    """逐个用例比较最短耗时，返回 (表格行, 变慢超过阈值的用例名)"""
+    rows = []
+    regressions = []
+    old_results = baseline["results"]
+    new_results = current["results"]
+    for name in sorted(old_results.keys() | new_results.keys()):
+        old = old_results.get(name)
+        new = new_results.get(name)
+        if old is None or new is None:
+            rows.append(
+                (
+                    name,
+                    f"{old['min_ms']:.3f}" if old else "-",
+                    f"{new['min_ms']:.3f}" if new else "-",
+                    "",
+                    "missing",
+                )
+            )
+            continue
+        ratio = new["min_ms"] / old["min_ms"] if old["min_ms"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = ""
+        rows.append(
+            (
+                name,
+                f"{old['min_ms']:.3f}",
+                f"{new['min_ms']:.3f}",
+                f"{ratio:.2f}x",
+                status,
+            )
+        )
+    return rows, regressions
+
+
+def compare_files(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    for data, path in ((baseline, args.baseline), (current, args.current)):
+        if data.get("format") != FORMAT:
+            print(
+                f"{path}: unsupported result format {data.get('format')!r}",
+                file=sys.stderr,
+            )
+            return 2
+    if baseline["environment"]["machine"] != current["environment"]["machine"]:
+        print("warning: results come from different machines", file=sys.stderr)
+    rows, regressions = compare(baseline, current, args.threshold)
+    report(
+        f"{args.baseline} -> {args.current}, threshold {args.threshold:.0%}",
+        rows,
+        ("case", "baseline ms", "current ms", "ratio", "status"),
+    )
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("run", help="运行基准，输出 JSON")
+    p.add_argument("-o", "--output", help="输出文件，默认写到标准输出")
+    p.add_argument("--filter", help="只运行名称包含该子串的用例")
+    p.add_argument("--quick", action="store_true", help="大输入只用一万行")
+    p.set_defaults(func=run)
+    p = commands.add_parser("compare", help="与基线比较，有回退时以状态码 1 退出")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="判定为回退的相对变慢幅度，默认 0.10",
+    )
+    p.set_defaults(func=compare_files)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,48 @@
-from .canvas import GreyCanvas, RGBCanvas
-from .draw import SimpleTextDrawer, ColorTextDrawer
-from .config import Config, Font, Layout, ColorTextDrawerConfig
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .canvas import GreyCanvas, RGBCanvas, OutputMode
+    from .draw import SimpleTextDrawer, ColorTextDrawer, TextLayout
+    from .config import Config, Font, Layout, ColorTextDrawerConfig
+    from .fonts import FontRegistry, font_registry
+    from .cache import WidthCache, width_cache
+
+# 名称 => 所在的子模块，首次访问时才导入，`import impaper` 不会加载 Pillow 与 pydantic
+_EXPORTS = {
+    "GreyCanvas": ".canvas",
+    "RGBCanvas": ".canvas",
+    "OutputMode": ".canvas",
+    "SimpleTextDrawer": ".draw",
+    "ColorTextDrawer": ".draw",
+    "TextLayout": ".draw",
+    "Config": ".config",
+    "Font": ".config",
+    "Layout": ".config",
+    "ColorTextDrawerConfig": ".config",
+    "FontRegistry": ".fonts",
+    "font_registry": ".fonts",
+    "WidthCache": ".cache",
+    "width_cache": ".cache",
+}
+
+__all__ = tuple(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        # 子模块（如 `impaper.draw`）同样在首次访问时导入
+        try:
+            return importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
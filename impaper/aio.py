@@ -0,0 +1,263 @@
+"""asyncio 接口
+
+在事件循环中直接调用 `draw` 会阻塞循环数十毫秒。`TextDrawer` 的 `adraw`、
+`adraw_encoded`、`adraw_many` 把折行、光栅化与编码交给 `AsyncRunner`
+管理的线程池或进程池执行，事件循环只负责等待结果：
+
+```py
+from impaper import ColorTextDrawer
+from impaper.aio import AsyncRunner
+
+ctd = ColorTextDrawer()
+png = await ctd.adraw_encoded("<Red>你好<Reset/>世界")
+
+# 使用独立的进程池，最多 4 个任务同时执行，每次调用最多等待 5 秒
+ctd.async_runner = AsyncRunner("process", workers=4, timeout=5)
+async for im in ctd.adraw_many(texts):
+    ...
+print(ctd.async_runner.stats())
+```
+
+未设置 `async_runner` 的绘制器共用 `impaper.aio.async_runner`，
+它是一个以 CPU 核数为并发上限的线程池。
+
+Pillow 光栅化文字时不释放 GIL，线程池只能保证事件循环不被整段阻塞，
+循环仍要与工作线程轮流持有 GIL，延迟会随负载上升；需要延迟平稳时使用进程池。
+进程池中的绘制器按调用时的配置、字号、颜色、输出模式与是否启用字形图集创建，
+每个工作进程中相同配置只创建一次；父进程中的 `render_cache` 不会被工作进程使用。
+"""
+
+import asyncio
+import os
+import pickle
+import weakref
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, NamedTuple
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from .draw import TextDrawer
+
+__all__ = ("AsyncRunner", "AsyncStats", "async_runner")
+
+
+class AsyncStats(NamedTuple):
+    """`AsyncRunner` 的统计数据
+
+    + `submitted`: 已提交的调用数
+    + `completed`: 成功完成的调用数
+    + `failed`: 绘制时抛出异常的调用数
+    + `timeouts`: 超时的调用数
+    + `running`: 正在执行的调用数，不超过 `max_concurrency`
+    + `waiting`: 正在排队等待执行的调用数
+    + `max_waiting`: 排队调用数的历史最大值
+    """
+
+    submitted: int
+    completed: int
+    failed: int
+    timeouts: int
+    running: int
+    waiting: int
+    max_waiting: int
+
+
+# 工作进程内的绘制器缓存，键为 pickle 后的 _DrawerSpec
+_worker_drawers: dict[bytes, "TextDrawer"] = {}
+# 每个工作进程最多缓存的绘制器数量
+_WORKER_DRAWERS = 16
+
+
+def _worker_drawer(spec: bytes) -> "TextDrawer":
+    from .pool import _make_drawer
+
+    drawer = _worker_drawers.get(spec)
+    if drawer is None:
+        if len(_worker_drawers) >= _WORKER_DRAWERS:
+            del _worker_drawers[next(iter(_worker_drawers))]
+        drawer = _worker_drawers[spec] = _make_drawer(pickle.loads(spec))
+    return drawer
+
+
+def _draw_in_worker(spec: bytes, text: str) -> Image.Image:
+    return _worker_drawer(spec).draw(text)
+
+
+def _draw_encoded_in_worker(spec: bytes, text: str, format: str, preset: str) -> bytes:
+    return _worker_drawer(spec).draw_encoded(text, format, preset)
+
+
+class AsyncRunner:
+    """在执行器中运行绘制任务，并限制同时执行的任务数
+
+    + `executor`: `"thread"`、`"process"`，或一个现成的线程池等可以直接调用绘制器方法的执行器
+    + `workers`: 新建执行器的线程数或进程数，默认为 CPU 核数
+    + `max_concurrency`: 同时执行的调用数上限，默认等于 `workers`；
+      超出的调用在事件循环中排队，不会堆积到执行器的队列里
+    + `timeout`: 每次调用的默认超时，单位秒，包含排队时间；None 表示不限制
+
+    超时的调用抛出 `asyncio.TimeoutError`；已经开始执行的绘制无法中断，
+    会在后台执行完毕后丢弃结果，执行完毕前仍占用名额并计入 `running`，
+    因此执行器中同时执行的任务数始终不超过 `max_concurrency`。
+    """
+
+    def __init__(
+        self,
+        executor: str | Executor = "thread",
+        workers: int | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        if isinstance(executor, str):
+            if executor == "thread":
+                executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="impaper"
+                )
+            elif executor == "process":
+                executor = ProcessPoolExecutor(self.workers)
+            else:
+                raise ValueError(f"unknown executor {executor!r}")
+            self._owns_executor = True
+        else:
+            self._owns_executor = False
+        self.executor = executor
+        self.process = isinstance(executor, ProcessPoolExecutor)
+        self.max_concurrency = max_concurrency or self.workers
+        self.timeout = timeout
+        # 每个事件循环各用一个信号量
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._running = 0
+        self._waiting = 0
+        self._max_waiting = 0
+
+    async def draw(
+        self, drawer: "TextDrawer", text: str, timeout: float | None = None
+    ) -> Image.Image:
+        "在执行器中执行 `drawer.draw(text)`"
+        if self.process:
+            return await self._submit(
+                timeout, _draw_in_worker, self._spec(drawer), text
+            )
+        return await self._submit(timeout, drawer.draw, text)
+
+    async def draw_encoded(
+        self,
+        drawer: "TextDrawer",
+        text: str,
+        format: str = "PNG",
+        preset: str = "fast",
+        timeout: float | None = None,
+    ) -> bytes:
+        "在执行器中执行 `drawer.draw_encoded(text, format, preset)`"
+        if self.process:
+            return await self._submit(
+                timeout,
+                _draw_encoded_in_worker,
+                self._spec(drawer),
+                text,
+                format,
+                preset,
+            )
+        return await self._submit(timeout, drawer.draw_encoded, text, format, preset)
+
+    async def draw_many(
+        self, drawer: "TextDrawer", texts: Iterable[str], timeout: float | None = None
+    ) -> AsyncIterator[Image.Image]:
+        """异步生成器，按输入顺序返回每段文本的图像，
+        最多提前提交 `2 * max_concurrency` 个调用
+        """
+        pending = deque()
+        try:
+            for text in texts:
+                pending.append(asyncio.ensure_future(self.draw(drawer, text, timeout)))
+                if len(pending) >= 2 * self.max_concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # 提前退出时取消剩余的调用
+            for future in pending:
+                future.cancel()
+
+    def stats(self) -> AsyncStats:
+        return AsyncStats(
+            submitted=self._submitted,
+            completed=self._completed,
+            failed=self._failed,
+            timeouts=self._timeouts,
+            running=self._running,
+            waiting=self._waiting,
+            max_waiting=self._max_waiting,
+        )
+
+    def close(self):
+        "关闭由本对象创建的执行器"
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    def __enter__(self) -> "AsyncRunner":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    async def _submit(self, timeout: float | None, fn, *args):
+        if timeout is None:
+            timeout = self.timeout
+        self._submitted += 1
+        try:
+            return await asyncio.wait_for(self._run(fn, *args), timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        future = loop.run_in_executor(self.executor, fn, *args)
+
+        def done(future):
+            # 任务真正执行完毕才让出名额，调用方超时或被取消时也是如此
+            self._running -= 1
+            semaphore.release()
+            if not future.cancelled():
+                # 取走异常，调用方已放弃等待时不会报 "exception was never retrieved"
+                future.exception()
+
+        future.add_done_callback(done)
+        try:
+            # shield 使调用方的取消不会传递给执行器中的任务
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        self._completed += 1
+        return result
+
+    @staticmethod
+    def _spec(drawer: "TextDrawer") -> bytes:
+        from .pool import _DrawerSpec
+
+        return pickle.dumps(_DrawerSpec.from_drawer(drawer))
+
+
+# 默认在进程内所有绘制器之间共享的线程池
+async_runner = AsyncRunner()
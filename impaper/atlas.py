@@ -0,0 +1,85 @@
+"""字形图集缓存
+
+默认字体等宽更纱黑体下，输出图像反复使用的只是一小部分字形，但每次 draw
+都要经 FreeType 重新光栅化每个字形。`GlyphAtlas` 把每个 (字体路径, 字号, 字符)
+光栅化一次得到的灰度蒙版缓存起来，绘制时按等宽网格直接贴图：
+半角字符占一格，全角字符占两格，格宽为 `TextDrawer.fontbox_size()` 的宽度。
+
+结果与 `ColorTextDrawer` 一致，后者同样把每个字符放在网格上；
+`SimpleTextDrawer` 按字形步进整行绘制，字形步进与 `string_width` 不一致的字符
+（如 `→`、`…`、emoji）及其后的内容会相差整数格，只有这类字符不出现时结果才一致。
+贴图与 FreeType 直接绘制的混合运算舍入方式不同，像素值可能有 ±1 的差异。
+
+```py
+from impaper import SimpleTextDrawer
+from impaper.atlas import GlyphAtlas
+
+std = SimpleTextDrawer()
+std.glyph_atlas = GlyphAtlas()
+im = std.draw("你好世界")
+```
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .cache import LRUCache
+from .charwidth import char_width
+
+__all__ = ("GlyphAtlas",)
+
+
+class GlyphAtlas(LRUCache):
+    """按字节数限制容量的字形蒙版缓存
+
+    + `max_bytes`: 容量上限，单位字节，默认 8 MiB，每个字形按蒙版像素数计算
+    """
+
+    # 每个条目除蒙版像素以外的开销
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024) -> None:
+        super().__init__(max_bytes)
+
+    def glyph(
+        self, font: ImageFont.FreeTypeFont, fontpath: str, char: str
+    ) -> tuple[Image.Image | None, int, int]:
+        """取出字符的蒙版及其相对于书写起点的偏移 (蒙版, dx, dy)，
+        空白字符的蒙版为 None。
+        """
+        key = (fontpath, font.size, char)
+        glyph = self.get(key)
+        if glyph is None:
+            glyph = self._rasterize(font, char)
+            mask = glyph[0]
+            nbytes = self.ENTRY_OVERHEAD + (mask.width * mask.height if mask else 0)
+            self.put(key, glyph, nbytes)
+        return glyph
+
+    def draw_text(
+        self,
+        canvas: Image.Image,
+        xy: tuple[int, int],
+        text: str,
+        fill,
+        font: ImageFont.FreeTypeFont,
+        fontpath: str,
+        cell: int,
+    ):
+        """在 canvas 上从 xy 开始逐字贴图绘制 text，cell 为一格的宽度，单位 px"""
+        x, y = xy
+        for c in text:
+            mask, dx, dy = self.glyph(font, fontpath, c)
+            if mask is not None:
+                canvas.paste(fill, (x + dx, y + dy), mask)
+            x += char_width(c) * cell
+
+    @staticmethod
+    def _rasterize(
+        font: ImageFont.FreeTypeFont, char: str
+    ) -> tuple[Image.Image | None, int, int]:
+        left, top, right, bottom = font.getbbox(char)
+        if right <= left or bottom <= top:
+            return (None, 0, 0)
+        mask = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), char, fill=0xFF, font=font)
+        return (mask, left, top)
@@ -0,0 +1,154 @@
+"""带容量限制、可观测的缓存
+
+`LRUCache` 按条目占用的字节数限制容量，超出时淘汰最久未使用的条目，
+并记录命中、未命中、淘汰次数，便于在生产环境中调整容量。
+
+`WidthCache` 缓存折行后整行文本的显示宽度，只用于 `TextDrawer.text_size()`。
+`draw` 等绘制方法在折行的同时得出行宽，不经过这个缓存：
+
+```py
+from impaper.cache import width_cache
+
+width_cache.max_bytes = 16 * 1024 * 1024
+print(width_cache.stats())
+```
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple
+
+from .charwidth import string_width
+
+__all__ = ("CacheStats", "LRUCache", "WidthCache", "width_cache")
+
+
+class CacheStats(NamedTuple):
+    """缓存统计数据
+
+    + `hits`: 命中次数
+    + `misses`: 未命中次数
+    + `evictions`: 因超出容量而淘汰的条目数
+    + `entries`: 当前条目数
+    + `nbytes`: 当前占用的字节数（估算）
+    + `max_bytes`: 容量上限，单位字节
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """线程安全、按字节数限制容量的 LRU 缓存
+
+    + `max_bytes`: 容量上限，单位字节
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._lock = threading.Lock()
+        # key => (value, nbytes)
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def get(self, key: Hashable, default=None):
+        "取出缓存的值，不存在时返回 default"
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._data.move_to_end(key)
+            return item[0]
+
+    def put(self, key: Hashable, value, nbytes: int):
+        "存入一个值，nbytes 为该条目占用的字节数；超过容量上限的条目不会被缓存"
+        if nbytes > self._max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+
+    def clear(self):
+        "清空缓存，统计数据也一并清零"
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._data),
+                nbytes=self._nbytes,
+                max_bytes=self._max_bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def _evict(self):
+        while self._nbytes > self._max_bytes and self._data:
+            _, (_, nbytes) = self._data.popitem(last=False)
+            self._nbytes -= nbytes
+            self._evictions += 1
+
+
+class WidthCache(LRUCache):
+    """折行后整行文本的显示宽度缓存，只用于 `TextDrawer.text_size()`
+
+    + `max_bytes`: 容量上限，单位字节，默认 4 MiB。
+      每个条目按行字符串对象的大小加上固定开销计算
+    """
+
+    # 每个条目除字符串本身以外的开销（OrderedDict 节点、元组、整数）
+    ENTRY_OVERHEAD = 128
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024) -> None:
+        super().__init__(max_bytes)
+
+    def measure(self, line: str) -> int:
+        "计算一行文本的显示宽度，优先从缓存中取"
+        width = self.get(line)
+        if width is None:
+            width = string_width(line)
+            self.put(line, width, sys.getsizeof(line) + self.ENTRY_OVERHEAD)
+        return width
+
+
+# 进程内所有 TextDrawer 默认共享的宽度缓存
+width_cache = WidthCache()
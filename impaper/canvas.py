@@ -1,11 +1,39 @@
+import threading
 from abc import ABCMeta, abstractmethod
+from typing import Literal, NamedTuple
 
 from PIL import Image
 
-__all__ = ("GreyCanvas",)
+__all__ = (
+    "GreyCanvas",
+    "RGBCanvas",
+    "OutputMode",
+    "CanvasPool",
+    "CanvasPoolStats",
+    "quantize_grey",
+)
+
+
+class OutputMode(NamedTuple):
+    """画布绘制完成后输出的图像模式
+
+    + `mode`: `"L"` 8 位灰度、`"RGB"` 彩色、`"P"` 调色板、`"1"` 1 位黑白
+    + `levels`: `"P"` 模式下的颜色数，灰度画布为均匀分布的灰度级，保留抗锯齿效果，默认 16
+    + `threshold`: `"1"` 模式下的阈值，灰度不低于此值的像素为白色，否则为黑色，默认 128
+    """
+
+    mode: Literal["L", "RGB", "P", "1"]
+    levels: int = 16
+    threshold: int = 128
+
 
 class CanvasBuilder(metaclass=ABCMeta):
     _size: tuple[int, int]
+    _color = None
+    _output: OutputMode | None = None
+    _pool: "CanvasPool | None" = None
+    # 从画布池借出、尚未归还的画布
+    _acquired: Image.Image | None = None
 
     @abstractmethod
     def size(self, size: tuple[int, int]):
@@ -22,6 +50,50 @@ class CanvasBuilder(metaclass=ABCMeta):
         "构建画布图像"
         raise NotImplementedError
 
+    def output(self, output: OutputMode | None):
+        "设置绘制完成后输出的图像模式，None 表示保持画布原本的模式"
+        self._output = output
+
+    def pool(self, pool: "CanvasPool | None"):
+        """设置画布池，None 表示每次新建画布。
+        使用画布池时 build 返回的画布可能大于设置的尺寸，finish 时裁剪为设置的尺寸并归还画布
+        """
+        self._pool = pool
+
+    def _new_canvas(self, mode: str) -> Image.Image:
+        if self._pool is None:
+            return Image.new(mode, size=self._size, color=self._color)
+        self._acquired = self._pool.acquire(mode, self._size, self._color)
+        return self._acquired
+
+    def finish(self, canvas: Image.Image) -> Image.Image:
+        "将绘制完成的画布转换为输出模式"
+        if canvas is not self._acquired:
+            return self._convert(canvas)
+        self._acquired = None
+        if canvas.size != self._size:
+            image = canvas.crop((0, 0, *self._size))
+        else:
+            image = canvas
+        image = self._convert(image)
+        # 原样输出时画布已交给调用者，不能归还
+        if image is not canvas:
+            self._pool.release(canvas)
+        return image
+
+    def _convert(self, canvas: Image.Image) -> Image.Image:
+        output = self._output
+        if output is None or output.mode == canvas.mode:
+            return canvas
+        if output.mode == "1":
+            grey = canvas if canvas.mode == "L" else canvas.convert("L")
+            return grey.point(lambda v: 255 if v >= output.threshold else 0, mode="1")
+        if output.mode == "P":
+            if canvas.mode == "L":
+                return quantize_grey(canvas, output.levels)
+            return canvas.quantize(colors=output.levels)
+        return canvas.convert(output.mode)
+
 
 class GreyCanvas(CanvasBuilder):
     "灰度画板"
@@ -40,12 +112,12 @@ class GreyCanvas(CanvasBuilder):
         self._color = bg
 
     def build(self) -> Image:
-        canvas = Image.new("L", size=self._size, color=self._color)
-        return canvas
+        return self._new_canvas("L")
 
 
 class RGBCanvas(CanvasBuilder):
     "支持 RGB 颜色的画板（不含透明通道）"
+
     def __init__(self) -> None:
         super().__init__()
         # 默认黑色背景
@@ -60,5 +132,143 @@ class RGBCanvas(CanvasBuilder):
         self._color = bg
 
     def build(self) -> Image:
-        canvas = Image.new("RGB", size=self._size, color=self._color)
+        return self._new_canvas("RGB")
+
+
+class CanvasPoolStats(NamedTuple):
+    """画布池统计数据
+
+    + `allocations`: 新建画布的次数
+    + `reuses`: 复用池中画布的次数
+    + `discards`: 归还时因超出容量而丢弃的画布数
+    + `entries`: 池中空闲的画布数
+    + `nbytes`: 池中空闲画布占用的字节数（估算）
+    + `max_bytes`: 容量上限，单位字节
+    """
+
+    allocations: int
+    reuses: int
+    discards: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+
+class CanvasPool:
+    """线程安全的画布池，复用绘制时的大画布，避免每次绘制都分配并释放大块内存
+
+    画布的宽、高分别向上取整到分桶尺寸：不足 `min_side` 的取 `min_side`，
+    其余每个二倍区间分为 4 档，多分配的面积不超过 25% × 25%。
+    复用时只把本次要用的区域填充为背景色；
+    `CanvasBuilder.finish` 裁剪出实际尺寸后归还，池中空闲画布的总字节数不超过 `max_bytes`。
+
+    ```py
+    from impaper import ColorTextDrawer
+    from impaper.canvas import CanvasPool
+
+    ctd = ColorTextDrawer()
+    ctd.canvas_pool = CanvasPool(max_bytes=64 * 1024 * 1024)
+    im = ctd.draw("<Red>你好<Reset/>世界")
+    print(ctd.canvas_pool.stats())
+    ```
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, min_side: int = 64) -> None:
+        self.max_bytes = max_bytes
+        self.min_side = min_side
+        self._lock = threading.Lock()
+        # (模式, 宽, 高) => 空闲画布
+        self._free: dict[tuple[str, int, int], list[Image.Image]] = {}
+        self._entries = 0
+        self._nbytes = 0
+        self._allocations = 0
+        self._reuses = 0
+        self._discards = 0
+
+    def bucket(self, n: int) -> int:
+        "边长 n 所在的分桶尺寸"
+        if n <= self.min_side:
+            return self.min_side
+        step = 1 << max(n.bit_length() - 3, 0)
+        return -(-n // step) * step
+
+    def acquire(self, mode: str, size: tuple[int, int], color) -> Image.Image:
+        "借出一张不小于 size 的画布，左上角 size 范围内为背景色 color"
+        width, height = size
+        key = (mode, self.bucket(width), self.bucket(height))
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                canvas = free.pop()
+                self._entries -= 1
+                self._nbytes -= self._sizeof(canvas)
+                self._reuses += 1
+            else:
+                canvas = None
+                self._allocations += 1
+        if canvas is None:
+            return Image.new(mode, key[1:], color)
+        canvas.paste(color, (0, 0, width, height))
         return canvas
+
+    def release(self, canvas: Image.Image):
+        "归还 acquire 借出的画布，超出容量时丢弃"
+        nbytes = self._sizeof(canvas)
+        with self._lock:
+            if self._nbytes + nbytes > self.max_bytes:
+                self._discards += 1
+                return
+            self._free.setdefault((canvas.mode, *canvas.size), []).append(canvas)
+            self._entries += 1
+            self._nbytes += nbytes
+
+    def clear(self):
+        "丢弃全部空闲画布"
+        with self._lock:
+            self._free.clear()
+            self._entries = self._nbytes = 0
+
+    def stats(self) -> CanvasPoolStats:
+        with self._lock:
+            return CanvasPoolStats(
+                allocations=self._allocations,
+                reuses=self._reuses,
+                discards=self._discards,
+                entries=self._entries,
+                nbytes=self._nbytes,
+                max_bytes=self.max_bytes,
+            )
+
+    @staticmethod
+    def _sizeof(canvas: Image.Image) -> int:
+        # Pillow 中 RGB 图像每像素占 4 字节
+        return (
+            canvas.width * canvas.height * (1 if canvas.mode in ("L", "P", "1") else 4)
+        )
+
+
+def quantize_grey(image: Image.Image, levels: int) -> Image.Image:
+    """将灰度图量化为只有 levels 级灰度的调色板图像（"P" 模式）
+
+    灰度级均匀分布在图像的最暗与最亮值之间，因此背景色与文字颜色都能精确保留。
+    """
+    if not 2 <= levels <= 256:
+        raise ValueError(f"levels must be in [2, 256], but got {levels!r}")
+    lo, hi = image.getextrema()
+    span = max(hi - lo, 1)
+    lut = [round((min(max(v, lo), hi) - lo) * (levels - 1) / span) for v in range(256)]
+    indexed = Image.frombytes("P", image.size, image.point(lut).tobytes())
+    palette = []
+    for k in range(levels):
+        grey = round(lo + (hi - lo) * k / (levels - 1))
+        palette.extend((grey, grey, grey))
+    indexed.putpalette(palette)
+    return indexed
+
+
+def palette_bits(levels: int) -> int:
+    "存储 levels 种颜色所需的 PNG 位深（1、2、4 或 8）"
+    for bits in (1, 2, 4):
+        if levels <= 1 << bits:
+            return bits
+    return 8
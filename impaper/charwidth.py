@@ -1,54 +1,131 @@
-"""计算字符宽度"""
-from functools import lru_cache
-from typing import Literal
-
-__all__ = ("char_width", "string_width")
-
-
-# GENERATED DATA
-# generated from
-# http://www.unicode.org/Public/4.0-Update/EastAsianWidth-4.0.0.txt
-
-__WIDTHS = [
-    (126, 1),
-    (159, 0),
-    (687, 1),
-    (710, 0),
-    (711, 1),
-    (727, 0),
-    (733, 1),
-    (879, 0),
-    (1154, 1),
-    (1161, 0),
-    (4347, 1),
-    (4447, 2),
-    (7467, 1),
-    (7521, 0),
-    (8369, 1),
-    (8426, 0),
-    (9000, 1),
-    (9002, 2),
-    (11021, 1),
-    (12350, 2),
-    (12351, 1),
-    (12438, 2),
-    (12442, 0),
-    (19893, 2),
-    (19967, 1),
-    (55203, 2),
-    (63743, 1),
-    (64106, 2),
-    (65039, 1),
-    (65059, 0),
-    (65131, 2),
-    (65279, 1),
-    (65376, 2),
-    (65500, 1),
-    (65510, 2),
-    (120831, 1),
-    (262141, 2),
-    (1114109, 1),
-]
+"""计算字符宽度
+
+宽度数据由 `scripts/gen_charwidth.py` 根据 Unicode 字符数据库生成，
+保存在 `res/charwidth.bin` 中，是一组按码位升序排列的 (区间终点, 宽度)。
+数据在第一次计算宽度时才加载，不影响 `import impaper` 的耗时。查询时：
+
++ BMP 内（U+0000 ~ U+FFFF）的字符直接查预先展开的 64 KiB 宽度表
++ 其余字符在区间终点数组上二分查找
+
+`string_width` 不逐字符调用 `char_width`，而是用正则统计 BMP 内宽字符、零宽字符的个数，
+由 `len(s)` 加减得到结果，循环全部在 C 层完成；只有 BMP 以外的字符才逐个查表。
+（正则字符集只含 BMP 字符时才能编译为位图，否则会退化为逐区间比较。）
+"""
+
+import importlib.resources as pkg_resources
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Literal, NamedTuple
+
+__all__ = ("char_width", "string_width", "unicode_version", "char_class")
+
+_MAGIC = b"IMPW"
+
+
+class _WidthTable(NamedTuple):
+    version: str
+    # (起点, 终点, 宽度)
+    ranges: list[tuple[int, int, int]]
+    # 每个区间的终点，供二分查找
+    bounds: array
+    values: bytes
+    bmp: bytes
+    # 匹配 BMP 内连续的宽字符、零宽字符
+    wide_runs: re.Pattern
+    zero_runs: re.Pattern
+
+
+_table: _WidthTable | None = None
+_lock = threading.Lock()
+
+
+def _parse(data: bytes) -> tuple[str, list[tuple[int, int, int]]]:
+    if data[:4] != _MAGIC:
+        raise ValueError("not a impaper char width table")
+    vlen = data[4]
+    version = data[5 : 5 + vlen].decode("ascii")
+    (count,) = struct.unpack_from("<I", data, 5 + vlen)
+    packed = array("I")
+    packed.frombytes(data[9 + vlen : 9 + vlen + count * 4])
+    if sys.byteorder == "big":
+        packed.byteswap()
+    ranges = []
+    start = 0
+    for item in packed:
+        end = item >> 2
+        ranges.append((start, end, item & 3))
+        start = end + 1
+    return version, ranges
+
+
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+def _char_class(
+    ranges: list[tuple[int, int, int]], width: int, exclude: str = ""
+) -> str:
+    "生成匹配 BMP 内指定宽度字符的正则字符集，exclude 中的字符不会被匹配"
+    excluded = sorted(ord(c) for c in exclude)
+    parts = []
+    for start, end, wid in ranges:
+        if start > 0xFFFF:
+            break
+        if wid != width:
+            continue
+        end = min(end, 0xFFFF)
+        for o in excluded:
+            if start <= o <= end:
+                if start < o:
+                    parts.append(f"\\u{start:04x}-\\u{o - 1:04x}")
+                start = o + 1
+        if start <= end:
+            parts.append(f"\\u{start:04x}-\\u{end:04x}")
+    return "[" + "".join(parts) + "]"
+
+
+def char_class(width: Literal[0, 1, 2], exclude: str = "") -> str:
+    """返回匹配 BMP 内指定宽度字符的正则字符集（形如 `[...]` 的字符串），
+    用于拼接成其它正则。exclude 中的字符不会被匹配。
+    """
+    return _char_class((_table or _load()).ranges, width, exclude)
+
+
+def _build_bmp_table(ranges: list[tuple[int, int, int]]) -> bytes:
+    table = bytearray(0x10000)
+    for start, end, wid in ranges:
+        if start > 0xFFFF:
+            break
+        end = min(end, 0xFFFF)
+        table[start : end + 1] = bytes((wid,)) * (end - start + 1)
+    return bytes(table)
+
+
+def _load() -> _WidthTable:
+    "加载宽度表，只在第一次调用时读取文件"
+    global _table
+    with _lock:
+        if _table is None:
+            resource = pkg_resources.files(__package__).joinpath("res/charwidth.bin")
+            version, ranges = _parse(resource.read_bytes())
+            _table = _WidthTable(
+                version=version,
+                ranges=ranges,
+                bounds=array("I", (end for _, end, _ in ranges)),
+                values=bytes(wid for _, _, wid in ranges),
+                bmp=_build_bmp_table(ranges),
+                wide_runs=re.compile(_char_class(ranges, 2) + "+"),
+                zero_runs=re.compile(_char_class(ranges, 0) + "+"),
+            )
+    return _table
+
+
+def unicode_version() -> str:
+    """宽度表所依据的 Unicode 版本"""
+    return (_table or _load()).version
 
 
 def char_width(c: str) -> Literal[0, 1, 2]:
@@ -58,16 +135,23 @@ def char_width(c: str) -> Literal[0, 1, 2]:
     + 英文字母、标点等字符：1
     + 汉字等字符：2
     """
+    table = _table or _load()
     o = ord(c)
-    if o == 0xE or o == 0xF:
-        return 0
-    for num, wid in __WIDTHS:
-        if o <= num:
-            return wid
-    return 1
+    if o < 0x10000:
+        return table.bmp[o]
+    return table.values[bisect_left(table.bounds, o)]
 
 
-@lru_cache(typed=True)
 def string_width(s: str) -> int:
     """计算字符串的宽度"""
-    return sum(char_width(c) for c in s)
+    width = len(s)
+    if s.isascii():
+        # ASCII 中只有 SO、SI、DEL 是零宽字符，没有宽字符
+        return width - s.count("\x0e") - s.count("\x0f") - s.count("\x7f")
+    table = _table or _load()
+    width += sum(map(len, table.wide_runs.findall(s)))
+    width -= sum(map(len, table.zero_runs.findall(s)))
+    # BMP 以外的字符已按宽度 1 计入 len(s)
+    for c in _ASTRAL.findall(s):
+        width += table.values[bisect_left(table.bounds, ord(c))] - 1
+    return width
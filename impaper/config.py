@@ -2,9 +2,38 @@
 Config Module, define config object of {ref}`Text2Png`.
 """
 
+from typing import NamedTuple
+
 from pydantic import BaseModel, Extra
 
-__all__ = ("Font", "Layout", "Config", "ColorTextDrawerConfig")
+__all__ = (
+    "Font",
+    "Layout",
+    "Config",
+    "ColorTextDrawerConfig",
+    "CompiledConfig",
+    "merge_config",
+)
+
+
+class CompiledConfig(NamedTuple):
+    """配置的不可变、可哈希快照，由 `Config.compile` 生成。
+    绘制器每次绘制开始时解析一次，此后不再访问 pydantic 模型；
+    也用于计算渲染结果缓存的键，配置新增影响绘制结果的字段时要同步加入这里。
+
+    + `font_path`: 字体路径
+    + `margin`, `padding`, `spacing`: 布局，见 `Layout`
+    + `line_width`, `indentation`: 折行，见 `TypeSettingConfig`
+    + `colors`: 颜色表的 (标签名, 颜色) 序列，没有颜色表时为空
+    """
+
+    font_path: str
+    margin: tuple[int, int, int, int]
+    padding: tuple[int, int, int, int]
+    spacing: int
+    line_width: int
+    indentation: str
+    colors: tuple[tuple[str, tuple[int, int, int]], ...] = ()
 
 
 class Font(BaseModel, extra=Extra.ignore):
@@ -56,6 +85,19 @@ class Config(BaseModel, extra=Extra.ignore):
     layout: Layout = Layout()
     typesetting: TypeSettingConfig = TypeSettingConfig()
 
+    def compile(self) -> CompiledConfig:
+        "生成当前配置的快照，之后对配置的修改不影响快照"
+        layout = self.layout
+        typesetting = self.typesetting
+        return CompiledConfig(
+            self.font.path,
+            tuple(layout.margin),
+            tuple(layout.padding),
+            layout.spacing,
+            typesetting.line_width,
+            typesetting.indentation,
+        )
+
 
 class ColorTextDrawerConfig(Config, extra=Extra.ignore):
     """构造 ColorTextDrawer 的配置对象
@@ -63,6 +105,7 @@ class ColorTextDrawerConfig(Config, extra=Extra.ignore):
     各颜色都是 HEX 代码。默认颜色参考了 Catppuccin Mocha
     (https://github.com/catppuccin/catppuccin) 主题。
     """
+
     colors: dict[str, tuple[int, int, int]] = {
         "Rosewater": (245, 224, 220),
         "Flamingo": (242, 205, 205),
@@ -91,3 +134,22 @@ class ColorTextDrawerConfig(Config, extra=Extra.ignore):
         "Mantle": (24, 24, 37),
         "Crust": (17, 17, 27),
     }
+
+    def compile(self) -> CompiledConfig:
+        return super().compile()._replace(colors=tuple(self.colors.items()))
+
+
+def merge_config(cls: type[Config], base: Config, update: Config) -> Config:
+    """以 base 为底，用 update 的全部字段覆盖，构造 cls 类型的新配置，
+    效果与 `cls(**{**base.dict(), **update.dict()})` 相同，但两者都已校验过，不再重新校验。
+    子配置与字典都会被复制，之后修改 base、update 不会影响新配置。
+    """
+    values = {}
+    for name in cls.__fields__:
+        value = getattr(update if name in update.__fields__ else base, name)
+        if isinstance(value, BaseModel):
+            value = value.copy()
+        elif isinstance(value, dict):
+            value = dict(value)
+        values[name] = value
+    return cls.construct(**values)
@@ -0,0 +1,113 @@
+"""可追加文本的增量文档
+
+实时滚动的日志视图每次都用 `draw` 重绘整个缓冲区，代价随缓冲区增长。
+`Document` 保留折行状态（当前行宽度、未完成的行、是否需要缩进）与
+`ColorTextDrawer` 当前的文字颜色，`append` 只折行新增的文本，
+只在可扩展的画布上绘制新增的行，代价与新增文本的长度成正比。
+
+```py
+from impaper import ColorTextDrawer
+from impaper.document import Document
+
+doc = Document(ColorTextDrawer())
+doc.append("<Red>ERROR<Reset/> something failed\\n")
+doc.append("retrying...")
+im = doc.image()
+```
+
+与 `iter_tiles` 相同，画布宽度按一行可能的最大宽度 `LineWrapper.max_width` 计算。
+创建文档时解析一次绘制器的字体、布局参数、排版引擎与颜色表，此后修改绘制器的配置不影响该文档。
+追加的文本不能把一个标签拆到两次 `append` 中。
+"""
+
+from PIL import Image, ImageDraw
+
+from .canvas import CanvasBuilder
+from .draw import TextDrawer
+
+__all__ = ("Document",)
+
+
+class Document:
+    """可追加文本的增量文档
+
+    + `drawer`: 绘制器，如 `SimpleTextDrawer()`、`ColorTextDrawer()`
+    + `reserve_lines`: 画布初始容纳的行数，不够时按两倍扩展
+    """
+
+    def __init__(self, drawer: TextDrawer, reserve_lines: int = 64) -> None:
+        self.drawer = drawer
+        self._state = drawer._prepare()
+        self._ts = self._state.ts
+        self._wrapper = self._ts._wrapper(self._state.config)
+        self._columns = self._wrapper.max_width
+        self._width, _ = drawer._canvas_size((self._columns, 1), self._state)
+        _, fh = self._state.fontbox
+        self._pitch = fh + self._state.spacing
+        # 已完成的行数，及最后一个已完成行行尾的文字颜色
+        self.lines = 0
+        self._color = drawer._initial_color()
+        # 画布上已绘制的未完成行，及绘制它之前该行附近的画布内容
+        self._open: str | None = None
+        self._saved: tuple[tuple[int, int], Image.Image] | None = None
+        self._builder: CanvasBuilder | None = None
+        self._canvas: Image.Image | None = None
+        self._reserve(reserve_lines)
+
+    def append(self, text: str) -> int:
+        "追加一段文本，只折行、绘制新增的部分，返回新完成的行数"
+        new = list(self._wrapper.feed(text, self._ts._iter_spans(text)))
+        if self._saved is not None:
+            # 还原上次绘制的未完成行，稍后连同新增的文本重新绘制
+            xy, saved = self._saved
+            self._canvas.paste(saved, xy)
+            self._saved = None
+        row = self.lines
+        self._reserve(row + len(new) + 1)
+        for line in new:
+            self._color = self._draw_row(row, line, self._color)
+            row += 1
+        self.lines = row
+        self._open = self._wrapper.peek()
+        if self._open is not None:
+            # 字形可能超出字体盒，保存上下各多出一个行距的范围
+            y = self._row_y(row) - self._pitch
+            self._saved = (
+                (0, y),
+                self._canvas.crop((0, y, self._width, y + 3 * self._pitch)),
+            )
+            self._draw_row(row, self._open, self._color)
+        return len(new)
+
+    def image(self) -> Image.Image:
+        "当前文档的图像，高度刚好容纳已追加的全部文本"
+        rows = self.lines + (self._open is not None)
+        _, height = self.drawer._canvas_size((self._columns, rows), self._state)
+        return self._builder.finish(self._canvas.crop((0, 0, self._width, height)))
+
+    def _row_y(self, row: int) -> int:
+        return self._state.origin[1] + row * self._pitch
+
+    def _draw_row(self, row: int, line: str, color):
+        xy = (self._state.origin[0], self._row_y(row))
+        tokens = self._ts.line_tokens(line)
+        return self.drawer._draw_line(
+            self._canvas, self._drawboard, xy, tokens, color, self._state
+        )
+
+    def _reserve(self, rows: int):
+        "保证画布至少能容纳 rows 行，不够时扩展为原来的两倍高"
+        _, height = self.drawer._canvas_size((self._columns, rows), self._state)
+        old = self._canvas
+        if old is not None:
+            if height <= old.height:
+                return
+            height = max(height, 2 * old.height)
+        self._builder = self.drawer._canvas_builder((self._width, height))
+        # 文档一直持有自己的画布，不从画布池借用
+        self._builder.pool(None)
+        canvas = self._builder.build()
+        if old is not None:
+            canvas.paste(old, (0, 0))
+        self._canvas = canvas
+        self._drawboard = ImageDraw.Draw(canvas)
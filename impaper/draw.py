@@ -1,16 +1,87 @@
-import importlib.resources as pkg_resources
-import re
 from abc import ABCMeta, abstractmethod
-from io import SEEK_SET, BytesIO
+from collections import deque
+from io import BytesIO
+from itertools import islice
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Iterator, NamedTuple
 
 from PIL import Image, ImageDraw, ImageFont
 
-from .canvas import GreyCanvas, RGBCanvas
-from .charwidth import string_width
-from .config import ColorTextDrawerConfig, Config
-from .typesetting import IgnorableTypeSetting, TypeSetting
+from .atlas import GlyphAtlas
+from .cache import WidthCache, width_cache
+from .canvas import CanvasBuilder, CanvasPool, GreyCanvas, OutputMode, RGBCanvas
+from .charwidth import char_width, string_width
+from .config import ColorTextDrawerConfig, CompiledConfig, Config, merge_config
+from .encode import encode_image
+from .fonts import FontRegistry, font_registry
+from .render_cache import RenderCache, pack_image, render_key, unpack_image
+from .timing import TimingSink, Trace
+from .typesetting import IgnorableTypeSetting, TypeSetting, WrappedLine
+
+if TYPE_CHECKING:
+    from .aio import AsyncRunner
+
+__all__ = ("SimpleTextDrawer", "ColorTextDrawer", "TextLayout")
+
+
+class DrawState(NamedTuple):
+    """一次绘制所需的字体与布局参数，每次 draw / draw_many 开始时解析一次
+
+    + `font`: 字体对象
+    + `fontpath`: 字体路径，即 `conf.font.path`
+    + `fontbox`: 字体盒尺寸 (宽, 高)，单位 px
+    + `origin`: 文本渲染起点 (宽, 高)，单位 px
+    + `margin`, `padding`: 上右下左顺序的四元组，单位 px
+    + `spacing`: 行距，单位 px
+    + `config`: 本次绘制使用的配置快照
+    + `trace`: 本次调用的计时记录，未设置 `timing_sink` 时为 None
+    + `ts`: 本次绘制使用的排版引擎，其标签序号与 `label_colors` 对应
+    + `label_colors`: `ColorTextDrawer` 的标签序号 => 颜色对照表，None 表示 <Reset/>；
+      `SimpleTextDrawer` 为 None
+    """
+
+    font: ImageFont.FreeTypeFont
+    fontpath: str
+    fontbox: tuple[int, int]
+    origin: tuple[int, int]
+    margin: tuple[int, int, int, int]
+    padding: tuple[int, int, int, int]
+    spacing: int
+    config: CompiledConfig
+    trace: Trace | None = None
+    ts: TypeSetting | None = None
+    label_colors: tuple | None = None
+
+
+class TextLayout(NamedTuple):
+    """排版结果：折行、测量、定位都已完成，只差光栅化，可以复用、pickle 与缓存
+
+    + `lines`: 折行后的文本行
+    + `spans`: 每一行的同色文本段 (x, 文本, 颜色)，x 单位 px，不含标签
+    + `positions`: 每一行的书写起点 (x, y)，单位 px
+    + `text_size`: 文本区尺寸 (宽, 高)，单位是字
+    + `canvas_size`: 画布尺寸 (宽, 高)，单位 px
+
+    由 `TextDrawer.layout` 生成，只对生成时的字体、布局与颜色设置有效。
+    """
+
+    lines: tuple[str, ...]
+    spans: tuple[tuple[tuple[int, str, object], ...], ...]
+    positions: tuple[tuple[int, int], ...]
+    text_size: tuple[int, int]
+    canvas_size: tuple[int, int]
+
 
-__all__ = ("SimpleTextDrawer", "ColorTextDrawer")
+class Tile(NamedTuple):
+    """分块绘制得到的一块图像
+
+    + `index`: 块序号，从 0 开始
+    + `box`: 该块在完整图像中的位置 (左, 上, 右, 下)，单位 px
+    + `image`: 块图像
+    """
+
+    index: int
+    box: tuple[int, int, int, int]
+    image: Image.Image
 
 
 class TextDrawer(metaclass=ABCMeta):
@@ -19,8 +90,24 @@ class TextDrawer(metaclass=ABCMeta):
     ts: TypeSetting
     fontsize: int = 14
 
-    _font_binary: BytesIO = None
-    _font: ImageFont.ImageFont = None
+    # 字体注册表，默认在进程内所有绘制器之间共享
+    font_registry: FontRegistry = font_registry
+    # text_size() 使用的整行宽度缓存，默认在进程内所有绘制器之间共享，设为 None 则不缓存；
+    # 绘制时行宽在折行过程中得出，不经过此缓存
+    width_cache: WidthCache | None = width_cache
+    # 输出图像模式，None 表示保持画布原本的模式
+    output_mode: OutputMode | None = None
+    # 字形图集，设置后按等宽网格贴图绘制，不再逐次经 FreeType 光栅化
+    glyph_atlas: GlyphAtlas | None = None
+    # 渲染结果缓存，设置后 draw 与 draw_encoded 先查询缓存，见 `impaper.render_cache`
+    render_cache: RenderCache | None = None
+    # adraw 等异步方法使用的执行器，None 表示使用进程内共享的 `impaper.aio.async_runner`
+    async_runner: "AsyncRunner | None" = None
+    # 分阶段计时的接收者，设置后 draw、draw_encoded、layout、render 记录各阶段耗时，见 `impaper.timing`
+    timing_sink: TimingSink | None = None
+    # 画布池，设置后按分桶尺寸复用绘制用的画布，见 `impaper.canvas.CanvasPool`
+    canvas_pool: CanvasPool | None = None
+    _font: ImageFont.FreeTypeFont = None
     _last_fontpath: str | None = None
     _last_fontsize: int | None = None
 
@@ -31,48 +118,22 @@ class TextDrawer(metaclass=ABCMeta):
 
     @property
     def font(self) -> ImageFont.FreeTypeFont:
-        """加载字体，如果路径为 package:/// 开头则加载包里的字体文件。
-        如果路径或字号变动了，就重新加载字体。
+        """通过字体注册表加载字体，如果路径为 package:/// 开头则加载包里的字体文件。
+        如果路径或字号变动了，就重新从注册表获取字体。
         """
-        if self._font is None:
-            # 未初始化
-            self._read_font(self.conf.font.path)
-            self._last_fontpath = self.conf.font.path
-            self._load_font(self.fontsize)
-            self._last_fontsize = self.fontsize
-            return self._font
-        # 如果字体路径变动了，重新读取并加载
-        if self._last_fontpath != self.conf.font.path:
-            self._read_font(self.conf.font.path)
-            self._last_fontpath = self.conf.font.path
-            self._load_font(self.fontsize)
-            self._last_fontsize = self.fontsize
-            return self._font
-        # 如果字号变动了，重新加载
-        if self._last_fontsize != self.fontsize:
-            self._load_font(self.fontsize)
+        return self._get_font(self.conf.font.path)
+
+    def _get_font(self, fontpath: str) -> ImageFont.FreeTypeFont:
+        if (
+            self._font is None
+            or self._last_fontpath != fontpath
+            or self._last_fontsize != self.fontsize
+        ):
+            self._font = self.font_registry.get(fontpath, self.fontsize)
+            self._last_fontpath = fontpath
             self._last_fontsize = self.fontsize
-            return self._font
-
         return self._font
 
-    def _read_font(self, path: str):
-        "读取字体内容到字节缓冲区"
-        if path.startswith("package:///"):
-            path = path[11:]
-            with pkg_resources.files(__package__).joinpath(path).open("rb") as fc:
-                self._font_binary = BytesIO(fc.read())
-        else:
-            with open(path, "rb") as fc:
-                self._font_binary = BytesIO(fc.read())
-        self._font_binary.seek(0, SEEK_SET)
-
-    def _load_font(self, fontsize: int):
-        "从字节缓冲区内读取对应字号的字体"
-        self._font_binary.seek(0, SEEK_SET)
-        self._font = ImageFont.truetype(self._font_binary, size=fontsize)
-        self._font_binary.seek(0, SEEK_SET)
-
     def text_size(self, text: list[str] | str):
         "计算文本区的宽、高，单位是字"
         if isinstance(text, str):
@@ -85,7 +146,10 @@ class TextDrawer(metaclass=ABCMeta):
     def _text_size_list(self, lines: list[str]) -> tuple[int, int]:
         """计算折行完成后的文本区尺寸 (宽, 高)"""
         height = len(lines)
-        width = max(string_width(line) for line in lines)
+        if self.width_cache is None:
+            width = max(string_width(line) for line in lines)
+        else:
+            width = max(self.width_cache.measure(line) for line in lines)
         return (width, height)
 
     def _text_size_str(self, text: str) -> tuple[int, int]:
@@ -101,11 +165,16 @@ class TextDrawer(metaclass=ABCMeta):
 
     def canvas_size(self, textsize: tuple[int, int]) -> tuple[int, int]:
         """根据文本尺寸、字体设置、布局设置计算画布尺寸 (宽, 高)，单位 px"""
+        return self._canvas_size(textsize, self._prepare())
+
+    def _canvas_size(
+        self, textsize: tuple[int, int], state: DrawState
+    ) -> tuple[int, int]:
         tw, th = textsize
-        um, rm, dm, lm = self.conf.layout.margin
-        up, rp, dp, lp = self.conf.layout.padding
-        sp = self.conf.layout.spacing
-        fw, fh = self.fontbox_size()
+        um, rm, dm, lm = state.margin
+        up, rp, dp, lp = state.padding
+        sp = state.spacing
+        fw, fh = state.fontbox
         width = lm + lp + tw * fw + rm + rp
         height = um + up + th * fh + sp * (th - 1) + dm + dp
 
@@ -120,9 +189,422 @@ class TextDrawer(metaclass=ABCMeta):
 
         return (w, h)
 
-    @abstractmethod
+    def _prepare(
+        self, trace: Trace | None = None, config: CompiledConfig | None = None
+    ) -> DrawState:
+        "解析本次绘制所需的字体与布局参数，config 为已经生成的配置快照"
+        if config is None:
+            config = self.conf.compile()
+        um, _, _, lm = config.margin
+        up, _, _, lp = config.padding
+        state = DrawState(
+            font=self._get_font(config.font_path),
+            fontpath=config.font_path,
+            fontbox=self.fontbox_size(),
+            origin=(lm + lp, um + up),
+            margin=config.margin,
+            padding=config.padding,
+            spacing=config.spacing,
+            config=config,
+            trace=trace,
+            ts=self.ts,
+        )
+        if trace is not None:
+            trace.lap("prepare")
+        return state
+
     def draw(self, text: str) -> Image.Image:
         """将 text 文本绘制到图片上，自动生成合适的画布"""
+        trace = (
+            None
+            if self.timing_sink is None
+            else Trace("draw", len(text), self.glyph_atlas)
+        )
+        cache = self.render_cache
+        if cache is None:
+            image = self._draw(text, self._prepare(trace))
+        else:
+            config = self.conf.compile()
+            key = render_key(self, text, "image", config)
+            data = cache.get(key)
+            if data is not None:
+                image = unpack_image(data)
+            if trace is not None:
+                trace.render_cache_hit = data is not None
+                trace.lap("cache")
+            if data is None:
+                image = self._draw(text, self._prepare(trace, config))
+                cache.put(key, pack_image(image))
+                if trace is not None:
+                    trace.lap("cache")
+        if trace is not None:
+            self.timing_sink.record(trace.timing())
+        return image
+
+    def layout(self, text: str) -> TextLayout:
+        """只排版不绘制：折行、测量并计算每一段文本的位置，
+        可以先用 `canvas_size` 判断是否需要分页，再交给 `render` 绘制，不必重复折行与测量
+        """
+        trace = (
+            None
+            if self.timing_sink is None
+            else Trace("layout", len(text), self.glyph_atlas)
+        )
+        state = self._prepare(trace)
+        layout = self._layout(self._wrap(text, state), state, self._initial_color())[0]
+        if trace is not None:
+            self.timing_sink.record(trace.timing())
+        return layout
+
+    def render(self, layout: TextLayout) -> Image.Image:
+        """将 `layout` 得到的排版结果光栅化"""
+        trace = (
+            None if self.timing_sink is None else Trace("render", 0, self.glyph_atlas)
+        )
+        image = self._render(layout, self._prepare(trace))
+        if trace is not None:
+            trace.lines = len(layout.lines)
+            self.timing_sink.record(trace.timing())
+        return image
+
+    def draw_encoded(
+        self,
+        text: str,
+        format: str = "PNG",
+        preset: str = "fast",
+        buffer: BytesIO | None = None,
+    ) -> bytes | memoryview:
+        """将 text 文本绘制到图片上并直接编码，预设与缓冲区的含义见 `impaper.encode`"""
+        trace = (
+            None
+            if self.timing_sink is None
+            else Trace("draw_encoded", len(text), self.glyph_atlas)
+        )
+        cache = self.render_cache
+        if cache is None:
+            data = encode_image(
+                self._draw(text, self._prepare(trace)), format, preset, buffer
+            )
+            if trace is not None:
+                trace.lap("encode")
+                self.timing_sink.record(trace.timing())
+            return data
+        config = self.conf.compile()
+        key = render_key(self, text, f"{format.upper()}/{preset}", config)
+        data = cache.get(key)
+        if trace is not None:
+            trace.render_cache_hit = data is not None
+            trace.lap("cache")
+        if data is None:
+            data = encode_image(
+                self._draw(text, self._prepare(trace, config)), format, preset
+            )
+            if trace is not None:
+                trace.lap("encode")
+            cache.put(key, data)
+        if buffer is not None:
+            buffer.seek(0)
+            buffer.write(data)
+            data = buffer.getbuffer()[: len(data)]
+        if trace is not None:
+            trace.lap("cache")
+            self.timing_sink.record(trace.timing())
+        return data
+
+    def draw_many(
+        self, texts: Iterable[str], workers: int = 0
+    ) -> Iterator[Image.Image]:
+        """生成器，依次绘制多段文本，按输入顺序返回图像。
+
+        字体与布局参数只在开始时解析一次，绘制过程中修改配置不会影响本批次。
+        `workers` 大于 0 时在线程池中并发绘制，同时进行中的任务最多 `2 * workers` 个；
+        能否加速取决于所用 Pillow 在光栅化文字时是否释放 GIL。
+        """
+        state = self._prepare()
+        if workers <= 0:
+            for text in texts:
+                yield self._draw(text, state)
+            return
+        # 只在需要时导入，减少 import impaper 的耗时
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for text in texts:
+                pending.append(executor.submit(self._draw, text, state))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    async def adraw(self, text: str, timeout: float | None = None) -> Image.Image:
+        """`draw` 的异步版本，在 `async_runner` 的执行器中绘制，
+        timeout 为本次调用的超时，单位秒，None 表示使用 `async_runner.timeout`
+        """
+        return await self._async_runner().draw(self, text, timeout)
+
+    async def adraw_encoded(
+        self,
+        text: str,
+        format: str = "PNG",
+        preset: str = "fast",
+        timeout: float | None = None,
+    ) -> bytes:
+        """`draw_encoded` 的异步版本，编码也在执行器中完成"""
+        return await self._async_runner().draw_encoded(
+            self, text, format, preset, timeout
+        )
+
+    def adraw_many(
+        self, texts: Iterable[str], timeout: float | None = None
+    ) -> AsyncIterator[Image.Image]:
+        """`draw_many` 的异步版本，异步生成器，按输入顺序返回图像"""
+        return self._async_runner().draw_many(self, texts, timeout)
+
+    def _async_runner(self) -> "AsyncRunner":
+        if self.async_runner is not None:
+            return self.async_runner
+        # 只在用到异步接口时才导入 asyncio
+        from .aio import async_runner
+
+        return async_runner
+
+    def page_lines(self, max_height: int) -> int:
+        """高度不超过 max_height（单位 px）的一页图像最多能容纳的行数，
+        按字体盒高度与行距计算
+        """
+        return self._page_lines(max_height, self._prepare())
+
+    def _page_lines(self, max_height: int, state: DrawState) -> int:
+        _, fh = state.fontbox
+        _, empty = self._canvas_size((0, 0), state)
+        # 空白边距的高度已减去一个行距
+        lines = (max_height - empty) // (fh + state.spacing)
+        if lines < 1:
+            raise ValueError(f"max_height {max_height!r}px cannot hold a single line")
+        return lines
+
+    def iter_pages(self, text: str, max_height: int) -> Iterator[Image.Image]:
+        """生成器，将 text 文本分页绘制，每页都是高度不超过 max_height（单位 px）的完整图像。
+
+        只折行一遍，分页位置由字体盒高度与行距算出，每页在取出时才绘制；
+        各页的宽度按该页最宽的一行计算，`ColorTextDrawer` 的颜色会跨页延续。
+        """
+        state = self._prepare()
+        page_lines = self._page_lines(max_height, state)
+        color = self._initial_color()
+        token_lines = state.ts.iter_token_lines(text, state.config)
+        while page := list(islice(token_lines, page_lines)):
+            layout, color = self._layout(page, state, color)
+            yield self._render(layout, state)
+
+    def iter_tiles(self, text: str, tile_height: int = 1024) -> Iterator[Tile]:
+        """生成器，将 text 文本边折行边绘制为一系列等高的图像块，自上而下依次返回。
+
+        为了不必预先折完全部文本，块宽按一行可能的最大宽度 `LineWrapper.max_width`
+        （通常为折行宽度 `conf.typesetting.line_width` 加 1）计算，
+        即文本区宽度能容纳任意一行；块高为 `tile_height`，最后一块可能更矮。
+        按 `Tile.box` 拼接全部块即得到完整图像，跨越块边界的行在相邻两块中各绘制一部分。
+        同一时刻只保留与当前块相交的行，内存占用只取决于块的尺寸。
+        """
+        state = self._prepare()
+        columns = state.ts._wrapper(state.config).max_width
+        width, _ = self._canvas_size((columns, 1), state)
+        _, up = state.origin
+        _, fh = state.fontbox
+        pitch = fh + state.spacing
+        if tile_height < pitch:
+            raise ValueError(
+                f"tile_height must be at least {pitch}px, but got {tile_height!r}"
+            )
+        # [y, 行的 token 序列, 行首颜色]，行首颜色在该行第一次绘制时确定
+        rows: deque[list] = deque()
+        color = self._initial_color()
+        top = 0
+        index = 0
+        n = 0
+
+        def render(height: int) -> Tile:
+            nonlocal color
+            builder = self._canvas_builder((width, height))
+            canvas = builder.build()
+            drawboard = ImageDraw.Draw(canvas)
+            for row in rows:
+                y, tokens, start = row
+                # 字形可能超出字体盒，每行按上下各多出一个行距计算所影响的范围
+                if y - pitch >= top + height or y + fh + pitch <= top:
+                    continue
+                if start is None:
+                    row[2] = color
+                    color = self._draw_line(
+                        canvas,
+                        drawboard,
+                        (state.origin[0], y - top),
+                        tokens,
+                        color,
+                        state,
+                    )
+                else:
+                    self._draw_line(
+                        canvas,
+                        drawboard,
+                        (state.origin[0], y - top),
+                        tokens,
+                        start,
+                        state,
+                    )
+            return Tile(index, (0, top, width, top + height), builder.finish(canvas))
+
+        for line in state.ts.iter_token_lines(text, state.config):
+            y = up + n * pitch
+            n += 1
+            rows.append([y, line.tokens, None])
+            # 新行已不会影响当前块，当前块绘制完成
+            while y - pitch >= top + tile_height:
+                yield render(tile_height)
+                top += tile_height
+                index += 1
+                while rows and rows[0][0] + fh + pitch <= top:
+                    rows.popleft()
+
+        _, total = self._canvas_size((columns, n), state)
+        while top < total:
+            yield render(min(tile_height, total - top))
+            top += tile_height
+            index += 1
+
+    def save_tiles(
+        self,
+        text: str,
+        path: str,
+        tile_height: int = 1024,
+        format: str = "PNG",
+        preset: str = "fast",
+    ) -> list[tuple[str, tuple[int, int, int, int]]]:
+        """将 text 文本分块绘制并逐块编码写入磁盘，返回每一块的 (文件路径, 位置)。
+
+        `path` 是文件路径模板，用 `{index}` 表示块序号，如 `"out/tile-{index:05d}.png"`；
+        分块方式见 `iter_tiles`，编码预设见 `impaper.encode`。
+        """
+        saved = []
+        for tile in self.iter_tiles(text, tile_height):
+            filename = path.format(index=tile.index)
+            with open(filename, "wb") as f:
+                f.write(encode_image(tile.image, format, preset))
+            saved.append((filename, tile.box))
+        return saved
+
+    def _draw_text(
+        self,
+        canvas: Image.Image,
+        drawboard: ImageDraw.ImageDraw,
+        xy: tuple[int, int],
+        text: str,
+        fill,
+        state: DrawState,
+    ):
+        "绘制一段文本，启用字形图集时逐字贴图，否则交给 FreeType 绘制"
+        if self.glyph_atlas is None:
+            drawboard.text(xy=xy, text=text, fill=fill, font=state.font)
+        else:
+            self.glyph_atlas.draw_text(
+                canvas, xy, text, fill, state.font, state.fontpath, state.fontbox[0]
+            )
+
+    def _draw(self, text: str, state: DrawState) -> Image.Image:
+        """使用已解析的参数将 text 文本绘制到图片上"""
+        layout, _ = self._layout(self._wrap(text, state), state, self._initial_color())
+        return self._render(layout, state)
+
+    def _wrap(self, text: str, state: DrawState) -> list[WrappedLine]:
+        "折行、解析标签并测量行宽"
+        wrapped = list(state.ts.iter_token_lines(text, state.config))
+        if state.trace is not None:
+            state.trace.lines = len(wrapped)
+            state.trace.lap("wrap")
+        return wrapped
+
+    def _layout(
+        self, wrapped: list[WrappedLine], state: DrawState, color
+    ) -> tuple[TextLayout, object]:
+        """排版折行后的文本行（见 `TypeSetting.iter_token_lines`），
+        color 为第一行的行首颜色，返回 (排版结果, 最后一行行尾的颜色)
+        """
+        # 行宽在折行时已经得出，不再测量
+        text_size = (max(line.width for line in wrapped), len(wrapped))
+        canvas_size = self._canvas_size(text_size, state)
+        # 寻找作画区域
+        left, up = state.origin
+        fw, fh = state.fontbox
+        spans = []
+        positions = []
+        # 颜色跨行延续
+        for i, line in enumerate(wrapped):
+            y = up + fh * i + i * state.spacing
+            runs, color = self._line_spans(line.tokens, color, state)
+            spans.append(
+                tuple((left + column * fw, run, fill) for column, run, fill in runs)
+            )
+            positions.append((left, y))
+        lines = tuple(line.text for line in wrapped)
+        if state.trace is not None:
+            state.trace.lap("layout")
+        return (
+            TextLayout(lines, tuple(spans), tuple(positions), text_size, canvas_size),
+            color,
+        )
+
+    def _render(self, layout: TextLayout, state: DrawState) -> Image.Image:
+        trace = state.trace
+        canvas_builder = self._canvas_builder(layout.canvas_size)
+        canvas = canvas_builder.build()
+        drawboard = ImageDraw.Draw(canvas)
+        if trace is not None:
+            trace.lap("canvas")
+        for runs, (_, y) in zip(layout.spans, layout.positions):
+            for x, run, fill in runs:
+                self._draw_text(canvas, drawboard, (x, y), run, fill, state)
+        if trace is None:
+            return canvas_builder.finish(canvas)
+        trace.glyph_calls += sum(map(len, layout.spans))
+        trace.lap("raster")
+        image = canvas_builder.finish(canvas)
+        trace.lap("finish")
+        return image
+
+    @abstractmethod
+    def _canvas_builder(self, size: tuple[int, int]) -> CanvasBuilder:
+        "创建设置好尺寸、背景与输出模式的画布构建器"
+        raise NotImplementedError
+
+    def _initial_color(self):
+        "文本开头的文字颜色"
+        return self.fg_color
+
+    def _draw_line(
+        self,
+        canvas: Image.Image,
+        drawboard: ImageDraw.ImageDraw,
+        xy: tuple[int, int],
+        tokens: tuple[str | int, ...],
+        color,
+        state: DrawState,
+    ):
+        "以 color 为行首颜色从 xy 开始绘制折行后一行文本的 token 序列，返回行尾的文字颜色"
+        x, y = xy
+        fw, _ = state.fontbox
+        runs, color = self._line_spans(tokens, color, state)
+        for column, run, fill in runs:
+            self._draw_text(canvas, drawboard, (x + column * fw, y), run, fill, state)
+        return color
+
+    @abstractmethod
+    def _line_spans(
+        self, tokens: tuple[str | int, ...], color, state: DrawState
+    ) -> tuple[list[tuple[int, str, object]], object]:
+        """以 color 为行首颜色把一行的 token 序列（由 `state.ts` 折行得到）
+        转换为同色的文本段 (起始列, 文本, 颜色)，返回 (文本段, 行尾的文字颜色)
+        """
         raise NotImplementedError
 
 
@@ -141,6 +623,9 @@ class SimpleTextDrawer(TextDrawer):
     + `self.conf.layout.margin` : 上右下左顺序的四元组，单位 px，默认全 6px
     + `self.conf.layout.padding` : 上右下左顺序的四元组，单位 px，默认全 2px
     + `self.conf.layout.spacing` : 行距，单位 px，默认 2px
+    + `self.output_mode` : 输出图像模式，如 `OutputMode("P", levels=4)`、
+      `OutputMode("1", threshold=128)`，默认 None 即 8 位灰度
+    + `self.glyph_atlas` : 字形图集 `GlyphAtlas()`，默认 None 即每次经 FreeType 绘制
 
     ```py
     from impaper import SimpleTextDrawer
@@ -161,32 +646,17 @@ class SimpleTextDrawer(TextDrawer):
         self.fg_color = 0xFF
         self.bg_color = 0x24
 
-    def draw(self, text: str) -> Image.Image:
-        # 准备画布
-        lines = self.ts.wrap_text(text)
-        text_size = self._text_size_list(lines)
-        canvas_size = self.canvas_size(text_size)
+    def _canvas_builder(self, size: tuple[int, int]) -> GreyCanvas:
         canvas_builder = GreyCanvas()
-        canvas_builder.size(canvas_size)
+        canvas_builder.size(size)
         canvas_builder.background(self.bg_color)
-        canvas = canvas_builder.build()
-        drawboard = ImageDraw.Draw(canvas)
-
-        # 寻找作画区域
-        left, up = self.text_position()
-        _, fh = self.fontbox_size()
-        # 绘制文字
-        for i, line in enumerate(lines):
-            x = left
-            y = up + fh * i + i * self.conf.layout.spacing
-            drawboard.text(
-                xy=(x, y),
-                text=line,
-                fill=self.fg_color,
-                font=self.font,
-            )
+        canvas_builder.output(self.output_mode)
+        canvas_builder.pool(self.canvas_pool)
+        return canvas_builder
 
-        return canvas
+    def _line_spans(self, tokens, color, state):
+        # 没有标签，token 序列就是整行，空行为空序列
+        return [(0, line, color) for line in tokens], color
 
 
 class ColorTextDrawer(TextDrawer):
@@ -205,6 +675,8 @@ class ColorTextDrawer(TextDrawer):
     + `self.conf.layout.padding` : 上右下左顺序的四元组，单位 px，默认全 2px
     + `self.conf.layout.spacing` : 行距，单位 px，默认 2px
     + `self.conf.colors` : 为一个字典，存储了 标签名 => HEX 格式的颜色
+    + `self.output_mode` : 输出图像模式，如 `OutputMode("P", levels=64)`，默认 None 即 RGB
+    + `self.glyph_atlas` : 字形图集 `GlyphAtlas()`，默认 None 即每次经 FreeType 绘制
 
     在文本中可以使用类似 HTML 的标签 <Color>text<Reset/> 来标记一段文本的颜色。
     和 HTML 不同的是，只支持一种闭合标签 -- <Reset/>，作用是将颜色重设为默认
@@ -226,10 +698,7 @@ class ColorTextDrawer(TextDrawer):
 
     def __init__(self) -> None:
         self.__conf = ColorTextDrawerConfig()
-        self._labels = set(f"<{i}>" for i in self.__conf.colors.keys())
-        self._labels.add("<Reset/>")
-        self._labels_re = re.compile("|".join(self._labels))
-        self.ts = IgnorableTypeSetting(caller=self, labels=self._labels)
+        self._compile_labels(tuple(self.__conf.colors.items()))
         self.fg_color = self.conf.colors["Text"]
         self.bg_color = self.conf.colors["Crust"]
 
@@ -239,50 +708,121 @@ class ColorTextDrawer(TextDrawer):
 
     @conf.setter
     def conf(self, conf: ColorTextDrawerConfig):
-        merged = self.__conf.dict()
-        newone = conf.dict()
-        merged.update(newone)
-        self.__conf = ColorTextDrawerConfig(**merged)
-        self._labels = set(f"<{i}>" for i in self.__conf.colors.keys())
-        self._labels.add("<Reset/>")
-        self._labels_re = re.compile("|".join(self._labels))
-        self.ts = IgnorableTypeSetting(
-            caller=self, labels=self._labels
+        # 未提供的字段（如 Config 没有颜色表）保留原来的值
+        self.__conf = merge_config(ColorTextDrawerConfig, self.__conf, conf)
+        self._compile_labels(tuple(self.__conf.colors.items()))
+
+    def _prepare(
+        self, trace: Trace | None = None, config: CompiledConfig | None = None
+    ) -> DrawState:
+        if config is None:
+            config = self.conf.compile()
+        # 颜色表可能被原地修改（如 `ctd.conf.colors["Red"] = ...`），每次绘制前按快照检查
+        self._compile_labels(config.colors)
+        # 排版引擎与颜色对照表随 state 一起保存，之后颜色表变化也不影响本次绘制
+        state = super()._prepare(trace, config)
+        return state._replace(label_colors=self._label_colors)
+
+    def _compile_labels(self, colors: tuple[tuple[str, tuple[int, int, int]], ...]):
+        """根据颜色表快照 (标签名, 颜色) 序列生成标签、排版引擎，及标签序号 => 颜色的对照表；
+        颜色表没有变化时什么也不做
+        """
+        if colors == getattr(self, "_compiled_colors", None):
+            return
+        labels = set(f"<{name}>" for name, _ in colors)
+        labels.add("<Reset/>")
+        if labels != getattr(self, "_labels", None):
+            self._labels = labels
+            self.ts = IgnorableTypeSetting(caller=self, labels=self._labels)
+            self._labels_re = self.ts.label_re
+        # None 表示 <Reset/>，即恢复为 self.fg_color
+        table = dict(colors)
+        self._label_colors = tuple(
+            None if label == "<Reset/>" else table[label[1:-1]]
+            for label in self.ts.tokenizer.labels
         )
+        self._compiled_colors = colors
 
-    def draw(self, text: str) -> Image.Image:
-        # 准备画布
-        lines = self.ts.wrap_text(text)
-        # 忽略标签计算尺寸
-        text_size = self._text_size_list([self._labels_re.sub("", i) for i in lines])
-        canvas_size = self.canvas_size(text_size)
+    def _canvas_builder(self, size: tuple[int, int]) -> RGBCanvas:
         canvas_builder = RGBCanvas()
-        canvas_builder.size(canvas_size)
+        canvas_builder.size(size)
         canvas_builder.background(self.bg_color)
-        canvas = canvas_builder.build()
-        drawboard = ImageDraw.Draw(canvas)
-
-        # 寻找作画区域
-        left, up = self.text_position()
-        fw, fh = self.fontbox_size()
-        # 绘制文字
-        color = self.fg_color
-        for i, line in enumerate(lines):
-            x = left
-            y = up + fh * i + i * self.conf.layout.spacing
-            for ii, token in self.ts.iter_tokens(line):
-                if token in self._labels:
-                    if token == "<Reset/>":
-                        color = self.fg_color
-                    else:
-                        color_name = token[1:-1]
-                        color = self.conf.colors[color_name]
-                else:
+        canvas_builder.output(self.output_mode)
+        canvas_builder.pool(self.canvas_pool)
+        return canvas_builder
+
+    def _line_spans(self, tokens, color, state):
+        runs = []
+        column = 0
+        label_colors = state.label_colors
+        # 两个标签之间的同色字符已是一个文本段，整段只调用一次 drawboard.text
+        for token in tokens:
+            if isinstance(token, int):
+                color = label_colors[token]
+                if color is None:
+                    color = self.fg_color
+            else:
+                runs.append((column, token, color))
+                column += string_width(token)
+        return runs, color
+
+    def _draw_text(
+        self,
+        canvas: Image.Image,
+        drawboard: ImageDraw.ImageDraw,
+        xy: tuple[int, int],
+        text: str,
+        fill,
+        state: DrawState,
+    ):
+        """绘制一段同色文本，结果与逐字按等宽网格绘制相同：
+        只有字形完全落在自己格子里的字符才成段绘制；字形步进与 `string_width` 不一致
+        （如字体中占两格的 `→`、`…`，字体中缺失、只占一格的 emoji）、字形伸入相邻格子
+        （如左侧承载为负的 `Ĝ`、`Ό`），以及宽度为 0 的字符（零宽连接符、组合符号），
+        都单独放在各自的网格位置上，避免与相邻字形的抗锯齿边缘混合方式不同
+        """
+        if self.glyph_atlas is not None:
+            return super()._draw_text(canvas, drawboard, xy, text, fill, state)
+        x, y = xy
+        fw = state.fontbox[0]
+        aligned = self._aligned_chars(state)
+        start = 0
+        column = 0
+        for i, c in enumerate(text):
+            ok = aligned.get(c)
+            if ok is None:
+                ok = aligned[c] = self._fits_cell(state.font, c, fw)
+            if not ok:
+                if start < i:
                     drawboard.text(
-                        xy=(x, y),
-                        text=token,
-                        fill=color,
-                        font=self.font,
+                        xy=(x, y), text=text[start:i], fill=fill, font=state.font
                     )
-                    x += string_width(token) * fw
-        return canvas
+                    x += column * fw
+                    column = 0
+                drawboard.text(xy=(x, y), text=c, fill=fill, font=state.font)
+                x += char_width(c) * fw
+                start = i + 1
+            else:
+                column += char_width(c)
+        if start == 0:
+            drawboard.text(xy=xy, text=text, fill=fill, font=state.font)
+        elif start < len(text):
+            drawboard.text(xy=(x, y), text=text[start:], fill=fill, font=state.font)
+
+    @staticmethod
+    def _fits_cell(font: ImageFont.FreeTypeFont, c: str, fw: int) -> bool:
+        "字符宽度大于 0、字形步进等于 `char_width` 格，且字形不超出自己的格子"
+        cell = char_width(c) * fw
+        if cell <= 0 or font.getlength(c) != cell:
+            return False
+        left, _, right, _ = font.getbbox(c)
+        return left >= 0 and right <= cell
+
+    def _aligned_chars(self, state: DrawState) -> dict[str, bool]:
+        "当前字体下每个字符能否与相邻字符成段绘制（见 `_fits_cell`），按 (字体路径, 字号) 缓存"
+        key = (state.fontpath, state.font.size)
+        cache = self.__dict__.setdefault("_aligned_cache", {})
+        aligned = cache.get(key)
+        if aligned is None:
+            aligned = cache[key] = {}
+        return aligned
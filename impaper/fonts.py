@@ -0,0 +1,152 @@
+"""进程级共享的字体注册表
+
+字体文件（尤其是 CJK 字体）往往有数十 MB，每个绘制器各自读取一份会浪费大量
+I/O 与内存。`FontRegistry` 按路径只解析一次字体来源，并按
+(路径, 字号, 索引) 缓存 `FreeTypeFont` 对象，缓存数量超过上限时淘汰最久未使用的。
+
+字体来源有两种加载方式：
+
++ `"path"`: 默认，将文件路径直接交给 FreeType，由其内存映射字体文件。
+  映射的页面由操作系统的页缓存在进程间共享，RSS 不随工作进程数增长。
+  包内字体在包以普通目录安装时直接使用其路径，否则解压到临时文件。
++ `"bytes"`: 将整个字体文件读入内存，同一字体的所有字号共享一份字节数据。
+
+```py
+from impaper.fonts import font_registry
+
+font_registry.maxsize = 64
+font = font_registry.get("package:///res/sarasa-mono-sc-regular.ttf", 14)
+```
+"""
+
+import importlib.resources as pkg_resources
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Literal
+
+from PIL import ImageFont
+
+__all__ = ("FontRegistry", "font_registry")
+
+PACKAGE_SCHEME = "package:///"
+
+
+class _SharedBytes:
+    """只读的类文件对象，`read()` 直接返回同一个 bytes 对象。
+
+    PIL 会对传入的文件对象调用一次 `read()` 并持有其结果，
+    借此让同一字体的所有字号共享一份字节数据，而不是各自复制一份。
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def read(self, *_) -> bytes:
+        return self._data
+
+
+class FontRegistry:
+    """线程安全的字体注册表
+
+    + `maxsize`: 最多缓存多少个 `FreeTypeFont` 对象，默认 32
+    + `loader`: 字体来源的加载方式，`"path"` 或 `"bytes"`，默认 `"path"`
+    """
+
+    def __init__(
+        self, maxsize: int = 32, loader: Literal["path", "bytes"] = "path"
+    ) -> None:
+        if loader not in ("path", "bytes"):
+            raise ValueError(f"loader must be 'path' or 'bytes', but got {loader!r}")
+        self.loader = loader
+        self._lock = threading.RLock()
+        # 字体路径 => 文件系统路径或字体字节
+        self._sources: dict[str, str | bytes] = {}
+        self._fonts: OrderedDict[tuple[str, int, int], ImageFont.FreeTypeFont] = (
+            OrderedDict()
+        )
+        self._maxsize = maxsize
+        # 持有从包内解压出的临时字体文件，注册表存在期间保持可用
+        self._resources = ExitStack()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, but got {maxsize!r}")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def source(self, path: str) -> str | bytes:
+        """解析字体来源，同一路径只会解析一次。
+        如果路径为 package:/// 开头则使用包里的字体文件。
+
+        `loader` 为 `"path"` 时返回文件系统路径，为 `"bytes"` 时返回字体文件的原始字节。
+        """
+        with self._lock:
+            source = self._sources.get(path)
+            if source is None:
+                if self.loader == "path":
+                    source = self._locate(path)
+                else:
+                    source = self._read(path)
+                self._sources[path] = source
+            return source
+
+    def get(self, path: str, size: int, index: int = 0) -> ImageFont.FreeTypeFont:
+        "获取指定路径、字号的字体对象，优先从缓存中取"
+        key = (path, size, index)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                return font
+            source = self.source(path)
+            if isinstance(source, bytes):
+                source = _SharedBytes(source)
+            font = ImageFont.truetype(source, size=size, index=index)
+            self._fonts[key] = font
+            self._evict()
+            return font
+
+    def clear(self):
+        "清空所有缓存的字体字节与字体对象"
+        with self._lock:
+            self._sources.clear()
+            self._fonts.clear()
+
+    def __len__(self) -> int:
+        return len(self._fonts)
+
+    def _evict(self):
+        while len(self._fonts) > self._maxsize:
+            self._fonts.popitem(last=False)
+        # 没有字体对象再引用的字节数据也一并释放
+        alive = {path for path, _, _ in self._fonts}
+        for path, source in list(self._sources.items()):
+            if path not in alive and isinstance(source, bytes):
+                del self._sources[path]
+
+    def _locate(self, path: str) -> str:
+        if path.startswith(PACKAGE_SCHEME):
+            path = path[len(PACKAGE_SCHEME) :]
+            resource = pkg_resources.files(__package__).joinpath(path)
+            return str(self._resources.enter_context(pkg_resources.as_file(resource)))
+        return path
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        if path.startswith(PACKAGE_SCHEME):
+            path = path[len(PACKAGE_SCHEME) :]
+            with pkg_resources.files(__package__).joinpath(path).open("rb") as fc:
+                return fc.read()
+        with open(path, "rb") as fc:
+            return fc.read()
+
+
+# 进程内所有 TextDrawer 默认共享的注册表
+font_registry = FontRegistry()
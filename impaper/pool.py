@@ -0,0 +1,180 @@
+"""多进程渲染池
+
+每个工作进程在启动时根据绘制器配置创建一次绘制器，此后只在进程间传递文本与
+编码后的图像字节，不需要序列化绘制器及其字体。
+
+```py
+from impaper import ColorTextDrawer
+from impaper.pool import RenderPool
+
+with RenderPool(ColorTextDrawer, processes=4) as pool:
+    for png in pool.imap(texts):
+        ...
+    print(pool.stats())
+```
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, NamedTuple
+
+from .atlas import GlyphAtlas
+from .canvas import OutputMode
+from .config import Config
+from .draw import TextDrawer
+
+__all__ = ("RenderPool", "WorkerStats")
+
+
+class WorkerStats(NamedTuple):
+    """单个工作进程的统计数据
+
+    + `images`: 已渲染的图像数
+    + `seconds`: 渲染与编码累计耗时，单位秒
+    """
+
+    images: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        "每秒渲染的图像数"
+        return self.images / self.seconds if self.seconds else 0.0
+
+
+class _DrawerSpec(NamedTuple):
+    cls: type[TextDrawer]
+    conf: Config | None
+    fontsize: int | None
+    fg_color: object
+    bg_color: object
+    output_mode: OutputMode | None = None
+    glyph_atlas: bool = False
+
+    @classmethod
+    def from_drawer(cls, drawer: TextDrawer) -> "_DrawerSpec":
+        return cls(
+            type(drawer),
+            drawer.conf,
+            drawer.fontsize,
+            drawer.fg_color,
+            drawer.bg_color,
+            drawer.output_mode,
+            drawer.glyph_atlas is not None,
+        )
+
+
+# 工作进程内的绘制器，由 _init_worker 创建
+_worker_drawer: TextDrawer | None = None
+
+
+def _make_drawer(spec: _DrawerSpec) -> TextDrawer:
+    drawer = spec.cls()
+    if spec.conf is not None:
+        drawer.conf = spec.conf
+    if spec.fontsize is not None:
+        drawer.fontsize = spec.fontsize
+    if spec.fg_color is not None:
+        drawer.fg_color = spec.fg_color
+    if spec.bg_color is not None:
+        drawer.bg_color = spec.bg_color
+    drawer.output_mode = spec.output_mode
+    if spec.glyph_atlas:
+        drawer.glyph_atlas = GlyphAtlas()
+    return drawer
+
+
+def _init_worker(spec: _DrawerSpec):
+    global _worker_drawer
+    _worker_drawer = _make_drawer(spec)
+
+
+def _render(text: str, format: str, preset: str) -> tuple[int, float, bytes]:
+    start = time.perf_counter()
+    data = _worker_drawer.draw_encoded(text, format, preset)
+    return os.getpid(), time.perf_counter() - start, data
+
+
+class RenderPool:
+    """多进程渲染池，按输入顺序流式返回编码后的图像。
+
+    + `drawer_cls`: 绘制器类型，如 `SimpleTextDrawer`、`ColorTextDrawer`
+    + `conf`: 绘制器配置，None 表示使用默认配置
+    + `fontsize`, `fg_color`, `bg_color`, `output_mode`: 绘制器属性，None 表示使用默认值
+    + `glyph_atlas`: 工作进程中的绘制器是否启用字形图集，见 `impaper.atlas`
+    + `processes`: 工作进程数，默认为 CPU 核数
+    + `max_inflight`: 同时进行中的任务数上限，默认为 `2 * processes`
+    + `format`, `preset`: 图像编码格式与预设，见 `impaper.encode`，默认 PNG、fast
+    """
+
+    def __init__(
+        self,
+        drawer_cls: type[TextDrawer],
+        conf: Config | None = None,
+        fontsize: int | None = None,
+        fg_color=None,
+        bg_color=None,
+        output_mode: OutputMode | None = None,
+        glyph_atlas: bool = False,
+        processes: int | None = None,
+        max_inflight: int | None = None,
+        format: str = "PNG",
+        preset: str = "fast",
+    ) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self.max_inflight = max_inflight or 2 * self.processes
+        self.format = format
+        self.preset = preset
+        spec = _DrawerSpec(
+            drawer_cls, conf, fontsize, fg_color, bg_color, output_mode, glyph_atlas
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_init_worker, initargs=(spec,)
+        )
+        # pid => [images, seconds]
+        self._stats: dict[int, list] = {}
+
+    @classmethod
+    def from_drawer(cls, drawer: TextDrawer, **kwargs) -> "RenderPool":
+        "以现有绘制器的配置、字号、颜色、输出模式与是否启用字形图集创建渲染池"
+        return cls(*_DrawerSpec.from_drawer(drawer), **kwargs)
+
+    def imap(self, texts: Iterable[str]) -> Iterator[bytes]:
+        "生成器，按输入顺序返回每段文本编码后的图像"
+        pending = deque()
+        for text in texts:
+            pending.append(
+                self._executor.submit(_render, text, self.format, self.preset)
+            )
+            if len(pending) >= self.max_inflight:
+                yield self._collect(pending.popleft())
+        while pending:
+            yield self._collect(pending.popleft())
+
+    def render(self, text: str) -> bytes:
+        "渲染单段文本"
+        return self._collect(
+            self._executor.submit(_render, text, self.format, self.preset)
+        )
+
+    def stats(self) -> dict[int, WorkerStats]:
+        "各工作进程的统计数据，键为进程号"
+        return {pid: WorkerStats(*s) for pid, s in self._stats.items()}
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self) -> "RenderPool":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _collect(self, future) -> bytes:
+        pid, seconds, data = future.result()
+        s = self._stats.setdefault(pid, [0, 0.0])
+        s[0] += 1
+        s[1] += seconds
+        return data
@@ -0,0 +1,280 @@
+"""渲染结果缓存
+
+同样的公告、帮助文本、模板会被反复渲染。给绘制器设置 `render_cache` 后，
+`draw` 与 `draw_encoded` 先以文本与生效配置的哈希为键查询缓存，命中时不再绘制：
+
+```py
+from impaper import SimpleTextDrawer
+from impaper.render_cache import DiskRenderCache, MemoryRenderCache
+
+std = SimpleTextDrawer()
+std.render_cache = MemoryRenderCache(max_bytes=64 * 1024 * 1024)
+# 或者在多个进程之间共享的磁盘缓存
+std.render_cache = DiskRenderCache("/var/cache/impaper", max_bytes=1024 * 1024 * 1024)
+png = std.draw_encoded("帮助文本")
+print(std.render_cache.stats())
+```
+
+键包含绘制器类型、`conf` 的快照 `CompiledConfig`（字体路径、布局、排版、颜色表）、
+字号、前景与背景色、输出模式、是否启用字形图集以及编码格式与预设，
+因此重新赋值或原地修改配置后自然不会命中旧的结果。
+字体文件本身的内容不在键中，替换同一路径下的字体文件后需要手动 `clear`。
+"""
+
+import functools
+import hashlib
+import os
+import threading
+from abc import ABCMeta, abstractmethod
+
+from PIL import Image
+
+from .cache import CacheStats, LRUCache
+from .config import CompiledConfig
+
+__all__ = (
+    "RenderCache",
+    "MemoryRenderCache",
+    "DiskRenderCache",
+    "render_key",
+    "pack_image",
+    "unpack_image",
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _config_text(config: CompiledConfig) -> str:
+    return repr(config)
+
+
+def render_key(
+    drawer, text: str, kind: str, config: CompiledConfig | None = None
+) -> str:
+    """计算渲染结果的键：文本与绘制器生效配置的 SHA-256，
+    kind 区分结果的种类，如 `"image"`、`"PNG/fast"`；
+    config 为已经生成的配置快照，None 表示由 `drawer.conf` 生成
+    """
+    if config is None:
+        config = drawer.conf.compile()
+    h = hashlib.sha256()
+    for part in (
+        type(drawer).__qualname__,
+        type(drawer.conf).__qualname__,
+        _config_text(config),
+        repr(drawer.fontsize),
+        repr(drawer.fg_color),
+        repr(drawer.bg_color),
+        repr(drawer.output_mode),
+        repr(drawer.glyph_atlas is not None),
+        kind,
+    ):
+        h.update(part.encode())
+        h.update(b"\0")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def pack_image(image: Image.Image) -> bytes:
+    "将图像序列化为 `模式 宽 高 调色板长度\\n调色板像素数据`"
+    palette = bytes(image.getpalette() or ()) if image.mode == "P" else b""
+    header = f"{image.mode} {image.width} {image.height} {len(palette)}\n".encode()
+    return header + palette + image.tobytes()
+
+
+def unpack_image(data: bytes) -> Image.Image:
+    "`pack_image` 的逆运算"
+    end = data.index(b"\n")
+    mode, width, height, palette_size = data[:end].decode().split()
+    start = end + 1 + int(palette_size)
+    image = Image.frombytes(mode, (int(width), int(height)), data[start:])
+    if mode == "P":
+        image.putpalette(data[end + 1 : start])
+    return image
+
+
+class RenderCache(metaclass=ABCMeta):
+    "渲染结果缓存的后端，键为 `render_key` 计算的十六进制字符串，值为 bytes"
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        "取出缓存的结果，不存在时返回 None"
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, key: str, data: bytes):
+        "存入一个结果"
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        "清空缓存"
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        raise NotImplementedError
+
+
+class MemoryRenderCache(RenderCache):
+    """进程内按字节数限制容量的 LRU 缓存
+
+    + `max_bytes`: 容量上限，单位字节，默认 64 MiB
+    """
+
+    # 每个条目除结果本身以外的开销（键字符串、OrderedDict 节点等）
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._cache = LRUCache(max_bytes)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._cache.max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        self._cache.max_bytes = max_bytes
+
+    def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    def put(self, key: str, data: bytes):
+        self._cache.put(key, data, len(data) + self.ENTRY_OVERHEAD)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class DiskRenderCache(RenderCache):
+    """目录中的缓存，每个结果一个文件，可在多个进程之间共享
+
+    + `directory`: 缓存目录，不存在时自动创建
+    + `max_bytes`: 容量上限，单位字节，超出时按最近访问时间淘汰；None 表示不限制
+
+    统计数据只记录本对象的访问；条目数与字节数在创建时扫描目录得到，
+    其他进程写入的文件要等到下次淘汰时才会计入。
+    """
+
+    SUFFIX = ".bin"
+
+    def __init__(
+        self, directory: str | os.PathLike, max_bytes: int | None = None
+    ) -> None:
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._entries, self._nbytes = self._scan()
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        # 记录访问时间，供淘汰时使用
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        # 先写入临时文件再替换，其他进程不会读到写了一半的文件
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = None
+        os.replace(tmp, path)
+        with self._lock:
+            if old is None:
+                self._entries += 1
+                self._nbytes += len(data)
+            else:
+                self._nbytes += len(data) - old
+            if self.max_bytes is not None and self._nbytes > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        with self._lock:
+            for entry in self._iter_entries():
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+            self._entries = self._nbytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=self._entries,
+                nbytes=self._nbytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def __len__(self) -> int:
+        return self._entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _iter_entries(self):
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.SUFFIX):
+                    yield entry
+
+    def _scan(self) -> tuple[int, int]:
+        entries = nbytes = 0
+        for entry in self._iter_entries():
+            entries += 1
+            nbytes += entry.stat().st_size
+        return entries, nbytes
+
+    def _evict(self):
+        "重新扫描目录，删除最久未访问的文件直到不超过容量上限的 90%"
+        files = []
+        for entry in self._iter_entries():
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, entry.path))
+        files.sort()
+        self._entries = len(files)
+        self._nbytes = sum(size for _, size, _ in files)
+        target = self.max_bytes * 9 // 10
+        for _, size, path in files:
+            if self._nbytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._entries -= 1
+            self._nbytes -= size
+            self._evictions += 1
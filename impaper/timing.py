@@ -0,0 +1,297 @@
+"""绘制过程的分阶段计时
+
+给绘制器设置 `timing_sink` 后，`draw`、`draw_encoded`、`layout`、`render`
+每次调用结束时把各阶段耗时与计数作为一条 `DrawTiming` 交给它：
+
+```py
+import logging
+from impaper import ColorTextDrawer
+from impaper.timing import CallbackSink, HistogramSink, LoggingSink
+
+ctd = ColorTextDrawer()
+ctd.timing_sink = HistogramSink()
+for text in texts:
+    ctd.draw_encoded(text)
+for stage, summary in ctd.timing_sink.summary().items():
+    print(stage, summary.p50, summary.p99)
+
+ctd.timing_sink = LoggingSink(logging.getLogger("impaper"))
+ctd.timing_sink = CallbackSink(lambda timing: print(timing.total))
+```
+
+阶段依次为：
+
++ `cache`: 查询与写入渲染结果缓存
++ `prepare`: 解析字体与布局参数
++ `wrap`: 折行、解析标签并测量行宽
++ `layout`: 计算画布尺寸与每一段文本的位置
++ `canvas`: 分配画布
++ `raster`: 逐段绘制文字
++ `finish`: 转换为输出模式
++ `encode`: 编码为图像文件
+
+未经过的阶段不出现在结果中。未设置 `timing_sink` 时每次调用只多几次 None 判断。
+"""
+
+import logging
+import math
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from typing import Callable, NamedTuple
+
+__all__ = (
+    "DrawTiming",
+    "TimingSink",
+    "CallbackSink",
+    "HistogramSink",
+    "LoggingSink",
+    "StageSummary",
+)
+
+
+class DrawTiming(NamedTuple):
+    """一次调用的计时结果
+
+    + `operation`: 调用的方法，如 `"draw"`、`"draw_encoded"`
+    + `stages`: 阶段名 => 耗时，单位秒，按经过的顺序排列
+    + `chars`: 输入文本的字符数，`render` 为 0
+    + `lines`: 折行后的行数，命中渲染结果缓存时为 0
+    + `glyph_calls`: 绘制文字的调用次数，每个同色文本段一次
+    + `render_cache_hit`: 是否命中渲染结果缓存，未设置缓存时为 None
+    + `atlas_hits`, `atlas_misses`: 字形图集的命中与未命中次数，未设置图集时为 0；
+      多个线程共用同一图集时包含其他线程的访问
+    """
+
+    operation: str
+    stages: dict[str, float]
+    chars: int
+    lines: int
+    glyph_calls: int
+    render_cache_hit: bool | None
+    atlas_hits: int
+    atlas_misses: int
+
+    @property
+    def total(self) -> float:
+        "各阶段的总耗时，单位秒"
+        return sum(self.stages.values())
+
+
+class Trace:
+    "一次调用中逐步记录的计时数据，由 `TextDrawer` 创建并在结束时转换为 `DrawTiming`"
+
+    __slots__ = (
+        "operation",
+        "stages",
+        "chars",
+        "lines",
+        "glyph_calls",
+        "render_cache_hit",
+        "_atlas",
+        "_atlas_start",
+        "_last",
+    )
+
+    def __init__(self, operation: str, chars: int, atlas=None) -> None:
+        self.operation = operation
+        self.stages: dict[str, float] = {}
+        self.chars = chars
+        self.lines = 0
+        self.glyph_calls = 0
+        self.render_cache_hit: bool | None = None
+        self._atlas = atlas
+        self._atlas_start = atlas.stats() if atlas is not None else None
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        "把距上一次记录经过的时间计入 stage"
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def timing(self) -> DrawTiming:
+        atlas_hits = atlas_misses = 0
+        if self._atlas is not None:
+            end = self._atlas.stats()
+            atlas_hits = end.hits - self._atlas_start.hits
+            atlas_misses = end.misses - self._atlas_start.misses
+        return DrawTiming(
+            self.operation,
+            self.stages,
+            self.chars,
+            self.lines,
+            self.glyph_calls,
+            self.render_cache_hit,
+            atlas_hits,
+            atlas_misses,
+        )
+
+
+class TimingSink(metaclass=ABCMeta):
+    "计时结果的接收者"
+
+    @abstractmethod
+    def record(self, timing: DrawTiming):
+        raise NotImplementedError
+
+
+class CallbackSink(TimingSink):
+    "把每条计时结果交给 callback"
+
+    def __init__(self, callback: Callable[[DrawTiming], object]) -> None:
+        self.callback = callback
+
+    def record(self, timing: DrawTiming):
+        self.callback(timing)
+
+
+class LoggingSink(TimingSink):
+    """每次调用输出一条日志
+
+    + `logger`: 默认为 `logging.getLogger("impaper.timing")`
+    + `level`: 日志级别，默认 DEBUG
+    """
+
+    def __init__(
+        self, logger: logging.Logger | None = None, level: int = logging.DEBUG
+    ) -> None:
+        self.logger = logger or logging.getLogger("impaper.timing")
+        self.level = level
+
+    def record(self, timing: DrawTiming):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        stages = " ".join(f"{k}={v * 1000:.3f}ms" for k, v in timing.stages.items())
+        self.logger.log(
+            self.level,
+            "%s total=%.3fms %s chars=%d lines=%d glyph_calls=%d render_cache_hit=%s atlas=%d/%d",
+            timing.operation,
+            timing.total * 1000,
+            stages,
+            timing.chars,
+            timing.lines,
+            timing.glyph_calls,
+            timing.render_cache_hit,
+            timing.atlas_hits,
+            timing.atlas_hits + timing.atlas_misses,
+        )
+
+
+class StageSummary(NamedTuple):
+    """一个阶段的耗时分布，单位秒；分位数为所在桶的上界，相对误差不超过 19%
+
+    + `count`: 记录次数
+    + `total`: 累计耗时
+    + `p50`, `p90`, `p99`: 分位数
+    + `max`: 最大值
+    """
+
+    count: int
+    total: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class HistogramSink(TimingSink):
+    """在内存中按阶段统计耗时分布，并累计计数与缓存命中率，内存占用不随记录次数增长
+
+    耗时按对数分桶，每个二倍区间分为 `BUCKETS_PER_OCTAVE` 个桶，最小的桶上界为 1 µs。
+    """
+
+    BUCKETS_PER_OCTAVE = 4
+    # 最小的桶上界，单位秒
+    MIN_SECONDS = 1e-6
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # 阶段名 => {桶序号: 次数}
+            self._buckets: dict[str, dict[int, int]] = {}
+            # 阶段名 => [次数, 累计, 最大]
+            self._totals: dict[str, list] = {}
+            self.calls = 0
+            self.chars = 0
+            self.lines = 0
+            self.glyph_calls = 0
+            self.render_cache_hits = 0
+            self.render_cache_lookups = 0
+            self.atlas_hits = 0
+            self.atlas_lookups = 0
+
+    def record(self, timing: DrawTiming):
+        with self._lock:
+            self.calls += 1
+            self.chars += timing.chars
+            self.lines += timing.lines
+            self.glyph_calls += timing.glyph_calls
+            if timing.render_cache_hit is not None:
+                self.render_cache_lookups += 1
+                self.render_cache_hits += timing.render_cache_hit
+            self.atlas_hits += timing.atlas_hits
+            self.atlas_lookups += timing.atlas_hits + timing.atlas_misses
+            self._add("total", timing.total)
+            for stage, seconds in timing.stages.items():
+                self._add(stage, seconds)
+
+    def summary(self) -> dict[str, StageSummary]:
+        "阶段名 => 耗时分布，`total` 为整个调用"
+        with self._lock:
+            return {
+                stage: StageSummary(
+                    count,
+                    total,
+                    self._percentile(stage, count, 0.5),
+                    self._percentile(stage, count, 0.9),
+                    self._percentile(stage, count, 0.99),
+                    maximum,
+                )
+                for stage, (count, total, maximum) in self._totals.items()
+            }
+
+    @property
+    def render_cache_hit_rate(self) -> float:
+        return (
+            self.render_cache_hits / self.render_cache_lookups
+            if self.render_cache_lookups
+            else 0.0
+        )
+
+    @property
+    def atlas_hit_rate(self) -> float:
+        return self.atlas_hits / self.atlas_lookups if self.atlas_lookups else 0.0
+
+    def _add(self, stage: str, seconds: float):
+        totals = self._totals.get(stage)
+        if totals is None:
+            totals = self._totals[stage] = [0, 0.0, 0.0]
+            self._buckets[stage] = {}
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+        buckets = self._buckets[stage]
+        index = self._bucket(seconds)
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        return math.ceil(
+            math.log2(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_OCTAVE
+        )
+
+    def _percentile(self, stage: str, count: int, q: float) -> float:
+        rank = max(1, math.ceil(count * q))
+        seen = 0
+        for index, n in sorted(self._buckets[stage].items()):
+            seen += n
+            if seen >= rank:
+                upper = self.MIN_SECONDS * 2 ** (index / self.BUCKETS_PER_OCTAVE)
+                # 不超过实际的最大值
+                return min(upper, self._totals[stage][2])
+        return self._totals[stage][2]
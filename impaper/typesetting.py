@@ -1,15 +1,222 @@
 """简单的文字排版引擎"""
 
 import re
+from itertools import chain, islice
 
-from typing import TYPE_CHECKING, Union
-from .charwidth import char_width, string_width
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple
+from .charwidth import char_class, char_width, string_width
 from .config import TypeSettingConfig
 
 if TYPE_CHECKING:
     from .draw import TextDrawer
 
 
+_width_runs: re.Pattern | None = None
+
+
+def _width_runs_re() -> re.Pattern:
+    "匹配连续的宽度为 1（不含换行符）或宽度为 2 的字符，首次使用时编译"
+    global _width_runs
+    if _width_runs is None:
+        narrow = char_class(1, exclude="\n")
+        wide = char_class(2)
+        _width_runs = re.compile(f"({narrow}{{2,}})|({wide}{{2,}})")
+    return _width_runs
+
+
+def iter_width_spans(
+    txt: str, start: int = 0, end: int | None = None
+) -> Iterator[tuple[int, int, int]]:
+    """生成器，将 txt[start:end] 切分为 `LineWrapper.feed` 所需的 (起点, 终点, 宽度) 片段：
+    连续的同宽字符合并为一段，其余字符（零宽字符、BMP 以外的字符、换行符等）各自为一段。
+    """
+    if end is None:
+        end = len(txt)
+    cursor = start
+    for m in _width_runs_re().finditer(txt, start, end):
+        run_start, run_end = m.span()
+        for i in range(cursor, run_start):
+            yield i, i + 1, char_width(txt[i])
+        # 第 1 组匹配宽度为 1 的字符，第 2 组匹配宽度为 2 的字符，分组序号即宽度
+        yield run_start, run_end, m.lastindex
+        cursor = run_end
+    for i in range(cursor, end):
+        yield i, i + 1, char_width(txt[i])
+
+
+class WrappedLine(NamedTuple):
+    """折行后的一行
+
+    + `text`: 该行文本，折行产生的行以缩进符开头
+    + `width`: 显示宽度，单位是字，标签不计入宽度
+    + `tokens`: token 序列，标签之间的文本段为 str，标签为其序号，见 `LabelTokenizer`
+    """
+
+    text: str
+    width: int
+    tokens: tuple[str | int, ...]
+
+
+class LabelTokenizer:
+    """标签分词器
+
+    标签转义后按长度从长到短组成一个正则，同一位置上较长的标签优先匹配，
+    标签中的正则元字符也按字面匹配。每个标签以其在 `labels` 中的下标作为序号。
+
+    ```py
+    tokenizer = LabelTokenizer({"<Red>", "<Reset/>"})
+    assert tokenizer.split("a<Red>b") == ("a", tokenizer.ids["<Red>"], "b")
+    ```
+    """
+
+    def __init__(self, labels: Iterable[str] = ()) -> None:
+        self.labels: tuple[str, ...] = tuple(
+            sorted({i for i in labels if i}, key=lambda i: (-len(i), i))
+        )
+        self.ids: dict[str, int] = {label: i for i, label in enumerate(self.labels)}
+        # 没有标签时使用永不匹配的正则，空的分支会在每个位置匹配空字符串
+        self.pattern = re.compile(
+            "|".join(map(re.escape, self.labels)) if self.labels else "(?!)"
+        )
+
+    def tokenize(self, text: str) -> list[tuple[int, int, int]]:
+        "扫描一遍文本，返回其中每个标签的 (起点, 终点, 序号)"
+        ids = self.ids
+        return [
+            (m.start(), m.end(), ids[m.group()]) for m in self.pattern.finditer(text)
+        ]
+
+    def split(self, text: str) -> tuple[str | int, ...]:
+        "将文本拆分为 token 序列，标签之间的文本段为 str，标签为其序号"
+        tokens = []
+        cursor = 0
+        for start, end, label in self.tokenize(text):
+            if start > cursor:
+                tokens.append(text[cursor:start])
+            tokens.append(label)
+            cursor = end
+        if cursor < len(text):
+            tokens.append(text[cursor:])
+        return tuple(tokens)
+
+
+class LineWrapper:
+    """流式折行引擎，`TypeSetting` 与 `IgnorableTypeSetting` 共用。
+
+    向 `feed` 传入文本及其 (起点, 终点, 宽度) 片段序列，每凑满一行就立即返回该行；
+    文本结束后调用 `close` 取出最后一行。折行状态保存在对象上，
+    因此可以分多次 `feed` 同一段文本的连续片段。
+
+    片段有三种：
+
+    + 单个字符，宽度为该字符的宽度，换行符也是单独的一段
+    + 多个宽度相同的字符，宽度为其中每个字符的宽度（1 或 2），
+      折行位置直接按算术计算，不逐字符判断
+    + 宽度为 0 的多字符片段，视作一个不可拆分的整体（如 `IgnorableTypeSetting` 的标签）
+
+    + `line_width`: 行宽度
+    + `indentation`: 折行后在新行首添加的缩进符
+    + `indent_size`: 缩进符的宽度
+
+    每返回一行，`last_width` 即为该行的显示宽度（含缩进，不含宽度为 0 的片段），
+    调用方在取得该行后读取，不必再测量一遍。
+    """
+
+    def __init__(self, line_width: int, indentation: str, indent_size: int) -> None:
+        self.line_width = line_width
+        self.indentation = indentation
+        self.indent_size = indent_size
+        # 当前行已占用的宽度
+        self.width = 0
+        # 当前行是否由折行产生，需要添加缩进
+        self.need_wrap = False
+        # 当前行在之前的片段中已累积的文本
+        self._pending: list[str] = []
+        # 折行时触发折行的字符按宽度 1 计入 width，与其实际宽度之差
+        self._skew = 0
+        # 最近返回的一行的显示宽度
+        self.last_width = 0
+
+    @property
+    def max_width(self) -> int:
+        """折行后一行可能的最大显示宽度。
+        触发折行的宽字符在折行时按宽度 1 计入，行宽因此可能比 `line_width` 多 1；
+        缩进符不比行宽窄时以缩进符为准
+        """
+        return max(self.line_width, self.indent_size + 1) + 1
+
+    def feed(self, txt: str, spans: Iterable[tuple[int, int, int]]) -> Iterator[str]:
+        "生成器，处理一段文本，每次返回一个已完成的行"
+        cursor = 0
+        line_width = self.line_width
+        for start, end, cw in spans:
+            if cw and end - start > 1:
+                # 同宽字符组成的片段：算出当前行还能放下几个字符，直接跳到折行处
+                i = start
+                while True:
+                    fit = max(0, (line_width - self.width) // cw)
+                    if i + fit >= end:
+                        self.width += (end - i) * cw
+                        break
+                    i += fit
+                    self.width += fit * cw
+                    yield self._take(txt[cursor:i])
+                    self.need_wrap = True
+                    # 折行时有缩进，触发折行的字符按宽度 1 计
+                    self.width = self.indent_size + 1
+                    self._skew = cw - 1
+                    cursor = i
+                    i += 1
+                continue
+            if end - start == 1 and txt[start] == "\n":
+                yield self._take(txt[cursor:start])
+                self.need_wrap = False
+                self.width = 0
+                self._skew = 0
+                cursor = end  # 忽略换行符
+                continue
+            if self.width + cw > line_width:
+                yield self._take(txt[cursor:start])
+                self.need_wrap = True
+                # 折行时有缩进
+                self.width = self.indent_size + 1
+                self._skew = cw - 1
+                cursor = start
+                continue
+            self.width += cw
+        if cursor < len(txt):
+            self._pending.append(txt[cursor:])
+
+    def peek(self) -> str | None:
+        "尚未完成的当前行，与 `close` 将要返回的内容相同，但不改变状态；没有时返回 None"
+        if not self._pending:
+            return None
+        line = "".join(self._pending)
+        if self.need_wrap:
+            return self.indentation + line
+        return line
+
+    def close(self) -> Iterator[str]:
+        "生成器，文本结束时返回尚未完成的最后一行（如果非空），并重置状态"
+        if self._pending:
+            yield self._take("")
+        self.width = 0
+        self._skew = 0
+        self.need_wrap = False
+
+    def _take(self, tail: str) -> str:
+        self.last_width = self.width + self._skew
+        if self._pending:
+            self._pending.append(tail)
+            line = "".join(self._pending)
+            self._pending.clear()
+        else:
+            line = tail
+        if self.need_wrap:
+            return self.indentation + line
+        return line
+
+
 class TypeSetting:
     """简单的文本排版引擎，计算文本折行，可以修改此对象的一些属性：
 
@@ -59,54 +266,56 @@ class TypeSetting:
 
     def wrap_text(self, txt: str) -> list[str]:
         "根据折行规则给文本换行、折行，不保留换行符"
-        # 字符序号 => 换行/折行（1, 2)
-        newline = 1
-        wrapline = 2
-        signs = {}
-
-        # 当前行宽度
-        width = 0
-        # 给文本打上换行、折行标记
-        for i, c in enumerate(txt):
-            if c == "\n":
-                signs[i] = newline
-                width = 0
-                continue
-            cw = char_width(c)
-            if width + cw > self.conf.line_width:
-                signs[i] = wrapline
-                # 折行时有缩进
-                width = self.indent_size + 1
-                continue
-            width += cw
+        return list(self.iter_wrapped_lines(txt))
 
-        # 根据换行、折行标记将文本拆分
-        lines = []
-        cursor = 0
-        need_wrap = False
-        for seq, sign in signs.items():
-            if sign == newline:
-                if need_wrap:
-                    lines.append(self.conf.indentation + txt[cursor:seq])
-                    need_wrap = False
-                else:
-                    lines.append(txt[cursor:seq])
-                cursor = seq + 1  # 忽略换行符
-            elif sign == wrapline:
-                if need_wrap:
-                    lines.append(self.conf.indentation + txt[cursor:seq])
-                else:
-                    lines.append(txt[cursor:seq])
-                cursor = seq
-                need_wrap = True
-        lastline = txt[cursor:]
-        if lastline:
-            if need_wrap:
-                lines.append(self.conf.indentation + txt[cursor:])
-                need_wrap = False
-            else:
-                lines.append(txt[cursor:])
-        return lines
+    def iter_wrapped_lines(self, txt: str) -> Iterator[str]:
+        """生成器，根据折行规则给文本换行、折行，每次返回一行，不保留换行符。
+        只扫描一遍文本，不会为整个文本建立折行位置表。
+        """
+        wrapper = self._wrapper()
+        yield from wrapper.feed(txt, self._iter_spans(txt))
+        yield from wrapper.close()
+
+    def iter_measured_lines(self, txt: str, conf=None) -> Iterator[tuple[str, int]]:
+        """生成器，折行并返回每一行及其显示宽度 (行, 宽度)，宽度由折行过程直接得出，不再测量；
+        conf 见 `_wrapper`
+        """
+        wrapper = self._wrapper(conf)
+        for line in chain(wrapper.feed(txt, self._iter_spans(txt)), wrapper.close()):
+            yield line, wrapper.last_width
+
+    def iter_token_lines(self, txt: str, conf=None) -> Iterator[WrappedLine]:
+        """生成器，折行并返回每一行的文本、显示宽度及 token 序列，见 `WrappedLine`。
+        没有标签时每行的 token 序列就是该行本身；conf 见 `_wrapper`
+        """
+        for line, width in self.iter_measured_lines(txt, conf):
+            yield WrappedLine(line, width, self.line_tokens(line))
+
+    def line_tokens(self, line: str) -> tuple[str | int, ...]:
+        "折行后一行文本的 token 序列"
+        return (line,) if line else ()
+
+    def iter_pages(self, txt: str, page_lines: int) -> Iterator[list[str]]:
+        """生成器，边折行边分页，每页最多 page_lines 行，每次返回一页折行后的文本行。"""
+        if page_lines < 1:
+            raise ValueError(f"page_lines must be at least 1, but got {page_lines!r}")
+        lines = self.iter_wrapped_lines(txt)
+        while page := list(islice(lines, page_lines)):
+            yield page
+
+    def _wrapper(self, conf=None) -> LineWrapper:
+        """按 conf 的 `line_width` 与 `indentation` 创建折行器，
+        conf 可以是 `TypeSettingConfig` 或绘制时的配置快照 `CompiledConfig`，默认 `self.conf`
+        """
+        if conf is None:
+            conf = self.conf
+        return LineWrapper(
+            conf.line_width, conf.indentation, string_width(conf.indentation)
+        )
+
+    def _iter_spans(self, txt: str) -> Iterator[tuple[int, int, int]]:
+        "生成器，每次返回一个 (起点, 终点, 宽度) 片段，见 `LineWrapper`"
+        return iter_width_spans(txt)
 
 
 class IgnorableTypeSetting(TypeSetting):
@@ -124,76 +333,73 @@ class IgnorableTypeSetting(TypeSetting):
     def __init__(self, caller: "TextDrawer" = None, labels: set[str] = None) -> None:
         super().__init__(caller)
         self.labels = labels if labels else set()
-        self.label_re = re.compile("|".join(self.labels))
+        self.tokenizer = LabelTokenizer(self.labels)
+        self.label_re = self.tokenizer.pattern
 
-    def iter_tokens(self, text: str) -> tuple[int, str]:
-        """生成器，每次返回一个 token 和该 token 在原字符串中的位置。
-        """
-        # Token Start => Token End
-        token_map = {}
+    def iter_tokens(self, text: str) -> Iterator[tuple[int, str]]:
+        """生成器，每次返回一个 token 和该 token 在原字符串中的位置。"""
+        i = 0
         for m in self.label_re.finditer(text):
             start, end = m.span()
-            token_map[start] = end
-        i = 0
-        length = len(text)
-        while i < length:
-            if i in token_map:
-                end = token_map[i]
-                yield i, text[i:end]
-                i = end
-            else:
+            while i < start:
                 yield i, text[i]
                 i += 1
+            yield start, text[start:end]
+            i = end
+        length = len(text)
+        while i < length:
+            yield i, text[i]
+            i += 1
 
-    def wrap_text(self, txt: str) -> list[str]:
-        """根据折行规则给文本换行、折行，不保留换行符。
-        会检查传入内容是否在 self.labels 中，如果在，则将其宽度当作0。
+    def iter_token_lines(self, txt: str, conf=None) -> Iterator[WrappedLine]:
+        """生成器，折行并返回每一行的文本、显示宽度及 token 序列，见 `WrappedLine`。
+
+        整段文本只分词一次，折行、测量、绘制共用同一份标签位置，不再逐行重新匹配标签。
         """
-        # 字符序号 => 换行/折行（1, 2)
-        newline = 1
-        wrapline = 2
-        signs = {}
-
-        # 当前行宽度
-        width = 0
-        # 给文本打上换行、折行标记
-        for i, token in self.iter_tokens(txt):
-            if token == "\n":
-                signs[i] = newline
-                width = 0
-                continue
-            cw = char_width(token) if token not in self.labels else 0
-            if width + cw > self.conf.line_width:
-                signs[i] = wrapline
-                # 折行时有缩进
-                width = self.indent_size + 1
-                continue
-            width += cw
+        labels = self.tokenizer.tokenize(txt)
+        wrapper = self._wrapper(conf)
+        indentation = wrapper.indentation
+        length = len(txt)
+        # 当前行在原文中的起点，及下一个尚未归入某一行的标签
+        pos = 0
+        k = 0
+        for line in chain(
+            wrapper.feed(txt, self._label_spans(txt, labels)), wrapper.close()
+        ):
+            # 折行器在返回一行之后才更新状态，此时 need_wrap 表示这一行是否由折行产生
+            head = indentation if wrapper.need_wrap else ""
+            # 每一行都是原文中连续的一段，行尾的换行符被丢弃，折行产生的行首加上了缩进
+            end = pos + len(line) - len(head)
+            tokens = [head] if head else []
+            cursor = pos
+            while k < len(labels) and labels[k][0] < end:
+                start, stop, label = labels[k]
+                if start > cursor:
+                    tokens.append(txt[cursor:start])
+                tokens.append(label)
+                cursor = stop
+                k += 1
+            if cursor < end:
+                tokens.append(txt[cursor:end])
+            if head and len(tokens) > 1 and isinstance(tokens[1], str):
+                tokens[0:2] = [head + tokens[1]]
+            yield WrappedLine(line, wrapper.last_width, tuple(tokens))
+            # 换行符不会触发折行，因此行尾紧跟换行符时这一行是因换行而结束的
+            pos = end + 1 if end < length and txt[end] == "\n" else end
+
+    def line_tokens(self, line: str) -> tuple[str | int, ...]:
+        return self.tokenizer.split(line)
+
+    def _iter_spans(self, txt: str) -> Iterator[tuple[int, int, int]]:
+        "生成器，每次返回一个 (起点, 终点, 宽度) 片段，self.labels 中的标签是宽度为 0 的整体"
+        return self._label_spans(txt, self.tokenizer.tokenize(txt))
 
-        # 根据换行、折行标记将文本拆分
-        lines = []
+    def _label_spans(
+        self, txt: str, labels: list[tuple[int, int, int]]
+    ) -> Iterator[tuple[int, int, int]]:
         cursor = 0
-        need_wrap = False
-        for seq, sign in signs.items():
-            if sign == newline:
-                if need_wrap:
-                    lines.append(self.conf.indentation + txt[cursor:seq])
-                    need_wrap = False
-                else:
-                    lines.append(txt[cursor:seq])
-                cursor = seq + 1  # 忽略换行符
-            elif sign == wrapline:
-                if need_wrap:
-                    lines.append(self.conf.indentation + txt[cursor:seq])
-                else:
-                    lines.append(txt[cursor:seq])
-                cursor = seq
-                need_wrap = True
-        lastline = txt[cursor:]
-        if lastline:
-            if need_wrap:
-                lines.append(self.conf.indentation + txt[cursor:])
-                need_wrap = False
-            else:
-                lines.append(txt[cursor:])
-        return lines
+        for start, end, _ in labels:
+            yield from iter_width_spans(txt, cursor, start)
+            yield start, end, 0
+            cursor = end
+        yield from iter_width_spans(txt, cursor)
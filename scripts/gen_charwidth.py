@@ -0,0 +1,150 @@
+"""生成 impaper/res/charwidth.bin 字符宽度表
+
+数据来源（按优先级）：
+
+1. `--ucd DIR` 目录下的 Unicode 字符数据库文件 `EastAsianWidth.txt` 与
+   `DerivedGeneralCategory.txt`（即 https://www.unicode.org/Public/<版本>/ucd/
+   下的 `EastAsianWidth.txt` 和 `extracted/DerivedGeneralCategory.txt`），
+   版本号从文件头读取
+2. 未指定 `--ucd` 时使用已安装的 `unicodedata2`，再退回标准库 `unicodedata`。
+   开发依赖中固定了 `unicodedata2==18.0.0`，与仓库中的 `charwidth.bin` 一致，
+   重新生成的结果逐字节相同；升级 Unicode 版本时同时修改该依赖
+
+宽度规则：
+
++ SO、SI、DEL 与 C1 控制字符：0
++ 通用类别为 Mn、Me、Cf 的字符（软连字符 U+00AD 除外）：0
++ 谚文字母中声、终声 U+1160 ~ U+11FF：0
++ East Asian Width 为 W 或 F 的字符：2
++ 其余字符：1
+
+输出格式（小端序）：
+
+    b"IMPW" | u8 版本号长度 | ASCII 版本号 | u32 区间数 | u32 * 区间数
+
+每个区间编码为 `(区间终点码位 << 2) | 宽度`，按码位升序排列，
+区间起点为上一区间终点 + 1。
+
+```sh
+python scripts/gen_charwidth.py --ucd path/to/ucd
+```
+"""
+
+import argparse
+import re
+import struct
+from pathlib import Path
+
+MAX_CODEPOINT = 0x10FFFF
+OUTPUT = Path(__file__).parent.parent / "impaper" / "res" / "charwidth.bin"
+MAGIC = b"IMPW"
+
+
+def parse_ucd_file(path: Path, default: str) -> tuple[str, list[str]]:
+    """解析 UCD 的 `码位范围 ; 属性值` 格式文件，返回 (版本号, 每个码位的属性值)"""
+    values = [default] * (MAX_CODEPOINT + 1)
+    version = ""
+    explicit = []
+    missing = re.compile(r"#\s*@missing:\s*([0-9A-F.]+)\s*;\s*(\w+)")
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            if not version:
+                m = re.search(r"-(\d+\.\d+\.\d+)\.txt", line)
+                if m:
+                    version = m.group(1)
+            m = missing.match(line)
+            if m:
+                # @missing 行给出未列出码位的默认值，先于显式条目生效
+                start, end = parse_range(m.group(1))
+                values[start : end + 1] = [m.group(2)] * (end - start + 1)
+                continue
+            data = line.split("#", 1)[0].strip()
+            if not data:
+                continue
+            cps, value = (i.strip() for i in data.split(";")[:2])
+            explicit.append((*parse_range(cps), value))
+    for start, end, value in explicit:
+        values[start : end + 1] = [value] * (end - start + 1)
+    return version, values
+
+
+def parse_range(cps: str) -> tuple[int, int]:
+    if ".." in cps:
+        start, end = cps.split("..")
+        return int(start, 16), int(end, 16)
+    return int(cps, 16), int(cps, 16)
+
+
+def load_ucd(directory: Path) -> tuple[str, list[str], list[str]]:
+    version, eaw = parse_ucd_file(directory / "EastAsianWidth.txt", "N")
+    _, gc = parse_ucd_file(directory / "DerivedGeneralCategory.txt", "Cn")
+    return version, eaw, gc
+
+
+def load_unicodedata() -> tuple[str, list[str], list[str]]:
+    try:
+        import unicodedata2 as unicodedata
+    except ImportError:
+        import unicodedata
+    chars = [chr(cp) for cp in range(MAX_CODEPOINT + 1)]
+    eaw = [unicodedata.east_asian_width(c) for c in chars]
+    gc = [unicodedata.category(c) for c in chars]
+    return unicodedata.unidata_version, eaw, gc
+
+
+def width(cp: int, eaw: str, gc: str) -> int:
+    if cp in (0x0E, 0x0F) or 0x7F <= cp <= 0x9F:
+        return 0
+    if gc in ("Mn", "Me", "Cf") and cp != 0xAD:
+        return 0
+    if 0x1160 <= cp <= 0x11FF:
+        return 0
+    if eaw in ("W", "F"):
+        return 2
+    return 1
+
+
+def build_ranges(eaw: list[str], gc: list[str]) -> list[tuple[int, int]]:
+    "合并宽度相同的相邻码位，返回 (区间终点, 宽度) 列表"
+    ranges = []
+    current = width(0, eaw[0], gc[0])
+    for cp in range(1, MAX_CODEPOINT + 1):
+        w = width(cp, eaw[cp], gc[cp])
+        if w != current:
+            ranges.append((cp - 1, current))
+            current = w
+    ranges.append((MAX_CODEPOINT, current))
+    return ranges
+
+
+def encode(version: str, ranges: list[tuple[int, int]]) -> bytes:
+    raw = version.encode("ascii")
+    header = MAGIC + struct.pack("<B", len(raw)) + raw + struct.pack("<I", len(ranges))
+    body = struct.pack(f"<{len(ranges)}I", *((end << 2) | wid for end, wid in ranges))
+    return header + body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--ucd",
+        type=Path,
+        help="包含 EastAsianWidth.txt 与 DerivedGeneralCategory.txt 的目录",
+    )
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT)
+    args = parser.parse_args()
+
+    if args.ucd:
+        version, eaw, gc = load_ucd(args.ucd)
+    else:
+        version, eaw, gc = load_unicodedata()
+    ranges = build_ranges(eaw, gc)
+    data = encode(version, ranges)
+    args.output.write_bytes(data)
+    print(
+        f"Unicode {version}: {len(ranges)} ranges, {len(data)} bytes -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
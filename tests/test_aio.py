@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+
+from impaper.aio import AsyncRunner
+from impaper.draw import ColorTextDrawer, SimpleTextDrawer
+
+
+def test_adraw():
+    std = SimpleTextDrawer()
+    ctd = ColorTextDrawer()
+
+    async def main():
+        return (
+            await std.adraw("你好世界，hello world"),
+            await ctd.adraw_encoded("<Red>你好<Reset/>世界", preset="palette"),
+        )
+
+    image, png = asyncio.run(main())
+    assert image.tobytes() == std.draw("你好世界，hello world").tobytes()
+    assert png == ctd.draw_encoded("<Red>你好<Reset/>世界", preset="palette")
+
+
+def test_adraw_many_keeps_order():
+    texts = [f"第 {i} 条消息" * (i % 4 + 1) for i in range(10)]
+    std = SimpleTextDrawer()
+    std.async_runner = AsyncRunner(workers=2, max_concurrency=2)
+
+    async def main():
+        return [im async for im in std.adraw_many(texts)]
+
+    with std.async_runner:
+        images = asyncio.run(main())
+        stats = std.async_runner.stats()
+    assert [im.tobytes() for im in images] == [std.draw(t).tobytes() for t in texts]
+    assert stats.submitted == stats.completed == len(texts)
+    assert stats.running == stats.waiting == 0
+
+
+class SlowDrawer(SimpleTextDrawer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def draw(self, text):
+        self.release.wait(5)
+        return super().draw(text)
+
+
+def test_concurrency_limit_and_timeout():
+    std = SlowDrawer()
+    std.async_runner = AsyncRunner(workers=4, max_concurrency=1)
+
+    async def main():
+        tasks = [asyncio.ensure_future(std.adraw("slow")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        busy = std.async_runner.stats()
+        with pytest.raises(asyncio.TimeoutError):
+            await std.adraw("timeout", timeout=0.05)
+        std.release.set()
+        await asyncio.gather(*tasks)
+        return busy
+
+    with std.async_runner:
+        busy = asyncio.run(main())
+        stats = std.async_runner.stats()
+    assert busy.running == 1 and busy.waiting == 2
+    assert stats.timeouts == 1
+    assert stats.completed == 3
+    assert stats.max_waiting == 3
+
+
+def test_timeout_keeps_slot_until_done():
+    std = SlowDrawer()
+    std.async_runner = AsyncRunner(workers=2, max_concurrency=1)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await std.adraw("slow", timeout=0.05)
+        # 超时后绘制仍在执行，名额没有让出
+        after_timeout = std.async_runner.stats()
+        queued = asyncio.ensure_future(std.adraw("queued"))
+        await asyncio.sleep(0.05)
+        queued_stats = std.async_runner.stats()
+        std.release.set()
+        await queued
+        return after_timeout, queued_stats
+
+    with std.async_runner:
+        after_timeout, queued_stats = asyncio.run(main())
+        stats = std.async_runner.stats()
+    assert after_timeout.running == 1
+    assert queued_stats.running == 1 and queued_stats.waiting == 1
+    assert stats.running == stats.waiting == 0
+    assert stats.timeouts == 1 and stats.completed == 1
+
+
+def test_process_runner():
+    ctd = ColorTextDrawer()
+    ctd.fontsize = 20
+    text = "<Red>你好世界<Reset/>，hello world"
+
+    async def main():
+        return await ctd.adraw_encoded(text), await ctd.adraw(text)
+
+    with AsyncRunner("process", workers=1) as runner:
+        ctd.async_runner = runner
+        png, image = asyncio.run(main())
+    assert png == ctd.draw_encoded(text)
+    assert image.tobytes() == ctd.draw(text).tobytes()
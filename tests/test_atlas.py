@@ -0,0 +1,46 @@
+from PIL import ImageChops
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.atlas import GlyphAtlas
+
+TEXT = "abcdefg,你好世界 hello\n全角，标点。gjpqy ~!@#$%^&*()\n" * 3
+
+
+def max_diff(a, b) -> int:
+    extrema = ImageChops.difference(a, b).getextrema()
+    if isinstance(extrema[0], tuple):
+        return max(e[1] for e in extrema)
+    return extrema[1]
+
+
+def test_simple_atlas_matches_freetype():
+    x = SimpleTextDrawer()
+    expected = x.draw(TEXT)
+    x.glyph_atlas = GlyphAtlas()
+    im = x.draw(TEXT)
+    assert im.size == expected.size
+    assert max_diff(im, expected) <= 1
+    stats = x.glyph_atlas.stats()
+    # 每个不同的字符只光栅化一次
+    assert stats.misses == len(set(TEXT) - {"\n"})
+    assert stats.hits > stats.misses
+
+
+def test_color_atlas_matches_freetype():
+    x = ColorTextDrawer()
+    text = (
+        "<Red>红色<Reset/>abc<Green>绿色 gjpqy<Reset/>默认\n" * 3
+        + "a“b”c—d…e x😀y <Red>α→β<Reset/> ★①■"
+    )
+    expected = x.draw(text)
+    x.glyph_atlas = GlyphAtlas()
+    assert max_diff(x.draw(text), expected) <= 1
+
+
+def test_atlas_byte_limit():
+    x = SimpleTextDrawer()
+    x.glyph_atlas = GlyphAtlas(max_bytes=2048)
+    x.draw(TEXT)
+    stats = x.glyph_atlas.stats()
+    assert stats.nbytes <= 2048
+    assert stats.evictions > 0
@@ -0,0 +1,40 @@
+from impaper.cache import LRUCache, WidthCache
+from impaper.draw import SimpleTextDrawer
+
+
+def test_lru_byte_limit():
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", 1, 4)
+    cache.put("b", 2, 4)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 4)
+    # b 最久未使用，被淘汰
+    assert "b" not in cache
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 1)
+    assert (stats.entries, stats.nbytes) == (2, 8)
+    cache.put("huge", 0, 11)
+    assert "huge" not in cache
+    cache.max_bytes = 4
+    assert len(cache) == 1
+
+
+def test_width_cache():
+    cache = WidthCache()
+    assert cache.measure("你好abc") == 7
+    assert cache.measure("你好abc") == 7
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_drawer_width_cache():
+    x = SimpleTextDrawer()
+    x.width_cache = WidthCache()
+    assert x.text_size("abc\n你好世界") == (8, 2)
+    assert x.width_cache.stats().misses == 2
+    x.text_size("abc\n你好世界")
+    assert x.width_cache.stats().hits == 2
+    x.width_cache = None
+    assert x.text_size("abc\n你好世界") == (8, 2)
@@ -0,0 +1,60 @@
+from impaper.canvas import CanvasPool, OutputMode
+from impaper.draw import ColorTextDrawer, SimpleTextDrawer
+
+
+def test_bucket():
+    pool = CanvasPool(min_side=64)
+    assert pool.bucket(1) == 64
+    assert pool.bucket(64) == 64
+    assert pool.bucket(65) == 80
+    assert pool.bucket(100) == 112
+    assert pool.bucket(1000) == 1024
+    for n in range(1, 5000):
+        assert n <= pool.bucket(n) <= max(64, n * 1.25)
+
+
+def test_pooled_draw_is_identical():
+    texts = [
+        "你好世界，hello world" * 5,
+        "abc",
+        "gjpqy\n" * 20,
+        "短",
+        "<Red>你好<Reset/>世界\n" * 3,
+    ]
+    for drawer in (SimpleTextDrawer(), ColorTextDrawer()):
+        expected = [drawer.draw(t) for t in texts]
+        drawer.canvas_pool = CanvasPool()
+        # 两轮：第二轮复用第一轮归还的画布，之前的内容必须被清除
+        for _ in range(2):
+            for text, image in zip(texts, expected):
+                pooled = drawer.draw(text)
+                assert pooled.size == image.size
+                assert pooled.tobytes() == image.tobytes()
+        stats = drawer.canvas_pool.stats()
+        assert stats.reuses >= len(texts)
+        assert stats.allocations + stats.reuses == 2 * len(texts)
+
+
+def test_pooled_output_modes_and_tiles():
+    std = SimpleTextDrawer()
+    text = "\n".join(f"第 {i} 行 line {i}" for i in range(60))
+    std.output_mode = OutputMode("P", levels=4)
+    expected = std.draw(text)
+    tiles = [tile.image.tobytes() for tile in std.iter_tiles(text, tile_height=200)]
+    std.canvas_pool = CanvasPool()
+    assert std.draw(text).tobytes() == expected.tobytes()
+    assert std.draw(text).getpalette() == expected.getpalette()
+    assert [
+        tile.image.tobytes() for tile in std.iter_tiles(text, tile_height=200)
+    ] == tiles
+    assert std.canvas_pool.stats().reuses > 0
+
+
+def test_pool_is_bounded():
+    std = SimpleTextDrawer()
+    std.canvas_pool = CanvasPool(max_bytes=1)
+    std.draw("hello")
+    std.draw("hello")
+    stats = std.canvas_pool.stats()
+    assert stats.entries == 0 and stats.nbytes == 0
+    assert stats.discards == 2 and stats.allocations == 2
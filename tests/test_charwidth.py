@@ -1,7 +1,7 @@
 import exrex
 import pytest
 
-from impaper.charwidth import char_width, string_width
+from impaper.charwidth import char_width, string_width, unicode_version
 
 
 @pytest.mark.parametrize("char", list(exrex.generate("[a-zA-Z]")))
@@ -24,3 +24,45 @@ def test_chinese_alphabet(char):
 )
 def test_string(s, exp):
     assert exp == string_width(s)
+
+
+@pytest.mark.parametrize(
+    "char, exp",
+    [
+        ("\x0e", 0),
+        ("\x0f", 0),
+        ("\x7f", 0),
+        ("̀", 0),
+        ("가", 2),
+        ("！", 2),
+        ("\U00020000", 2),
+        ("\U0001d400", 1),
+        ("\U0010ffff", 1),
+    ],
+)
+def test_char_width_boundaries(char, exp):
+    assert char_width(char) == exp
+
+
+@pytest.mark.parametrize(
+    "s",
+    [
+        "",
+        "plain ascii\x0e\x0f\x7f",
+        "combining é and 全角！",
+        "\U00020000\U0001d400abc你好",
+    ],
+)
+def test_string_width_matches_char_width(s):
+    assert string_width(s) == sum(char_width(c) for c in s)
+
+
+@pytest.mark.parametrize("char", ["😀", "⌚", "\U0003134a", "​", "〪"])
+def test_generated_table(char):
+    # 新版 Unicode 中的 emoji、CJK 扩展区为宽字符，零宽空格与组合符号为零宽
+    assert char_width(char) == (0 if char in "​〪" else 2)
+
+
+def test_unicode_version():
+    major, _, _ = unicode_version().split(".")
+    assert int(major) >= 15
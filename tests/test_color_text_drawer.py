@@ -0,0 +1,83 @@
+from PIL import ImageChops, ImageDraw
+
+from impaper.canvas import OutputMode, RGBCanvas
+from impaper.charwidth import string_width
+from impaper.draw import ColorTextDrawer
+from impaper.render_cache import MemoryRenderCache
+
+TEXT = (
+    "abcdefg,abcdefg,abcdefg\n"
+    "你好世界，你好世界，<Yellow>你好世界。<Reset/>\n"
+    "你好世界，你好世界，你好世界，你好世界，<Red>你好世界<Reset/>，你好世界，"
+    "<Green>There is a pen<Reset/>, <Blue>there is an apple<Reset/>!\n"
+    "a“b”c—d…e x😀y <Red>α→β<Reset/>ok ★①■\n"
+    "<Red>step 1 → step 2 … done…<Reset/>\n"
+    "ĜΌ ĔΏ a\u200d┬ a\u035cb\u0361c <Red>ĜΌ<Reset/>a\u200d┬"
+)
+
+
+def draw_per_token(ctd: ColorTextDrawer, text: str):
+    "逐字符调用 drawboard.text 的参考实现"
+    lines = ctd.ts.wrap_text(text)
+    text_size = ctd._text_size_list([ctd._labels_re.sub("", i) for i in lines])
+    canvas_builder = RGBCanvas()
+    canvas_builder.size(ctd.canvas_size(text_size))
+    canvas_builder.background(ctd.bg_color)
+    canvas = canvas_builder.build()
+    drawboard = ImageDraw.Draw(canvas)
+    left, up = ctd.text_position()
+    fw, fh = ctd.fontbox_size()
+    color = ctd.fg_color
+    for i, line in enumerate(lines):
+        x = left
+        y = up + fh * i + i * ctd.conf.layout.spacing
+        for _, token in ctd.ts.iter_tokens(line):
+            if token in ctd._labels:
+                if token == "<Reset/>":
+                    color = ctd.fg_color
+                else:
+                    color = ctd.conf.colors[token[1:-1]]
+            else:
+                drawboard.text(xy=(x, y), text=token, fill=color, font=ctd.font)
+                x += string_width(token) * fw
+    return canvas
+
+
+def test_draw_pixel_identical():
+    ctd = ColorTextDrawer()
+    im = ctd.draw(TEXT)
+    expected = draw_per_token(ctd, TEXT)
+    assert im.size == expected.size
+    assert ImageChops.difference(im, expected).getbbox() is None
+
+
+def test_colors_mutated_in_place():
+    text = "<Red>red<Reset/> <Green2>green2<Reset/>"
+    for cached in (False, True):
+        ctd = ColorTextDrawer()
+        if cached:
+            ctd.render_cache = MemoryRenderCache()
+        before = ctd.draw(text)
+        ctd.conf.colors["Red"] = (1, 2, 3)
+        ctd.conf.colors["Green2"] = (4, 5, 6)
+        im = ctd.draw(text)
+        assert im.tobytes() != before.tobytes()
+        assert ImageChops.difference(im, draw_per_token(ctd, text)).getbbox() is None
+        colors = {c for _, c in im.getcolors()}
+        assert (1, 2, 3) in colors and (4, 5, 6) in colors
+        assert (243, 139, 168) not in colors
+
+
+def test_draw_many():
+    ctd = ColorTextDrawer()
+    texts = [TEXT, "<Red>red<Reset/> plain", "x"]
+    expected = [ctd.draw(t).tobytes() for t in texts]
+    assert [im.tobytes() for im in ctd.draw_many(texts, workers=2)] == expected
+
+
+def test_output_mode():
+    ctd = ColorTextDrawer()
+    ctd.output_mode = OutputMode("P", levels=32)
+    im = ctd.draw(TEXT)
+    assert im.mode == "P"
+    assert len(im.getcolors()) <= 32
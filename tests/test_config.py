@@ -1,4 +1,8 @@
-from impaper.config import Font, Layout, Config
+import subprocess
+import sys
+
+from impaper.config import ColorTextDrawerConfig, Config, Font, Layout, merge_config
+from impaper.draw import ColorTextDrawer, SimpleTextDrawer
 
 
 def test_font():
@@ -15,3 +19,83 @@ def test_config():
     config = Config()
     assert config.font.path == "package:///res/sarasa-mono-sc-regular.ttf"
     assert config.layout.spacing == 2
+
+
+def test_compile():
+    config = ColorTextDrawerConfig()
+    compiled = config.compile()
+    assert compiled.font_path == config.font.path
+    assert compiled.line_width == 48
+    assert dict(compiled.colors) == config.colors
+    assert hash(compiled) == hash(config.compile())
+    config.typesetting.line_width = 10
+    assert compiled.line_width == 48
+    assert config.compile().line_width == 10
+    assert Config().compile().colors == ()
+
+
+def test_merge_config():
+    base = ColorTextDrawerConfig(colors={"Red": (255, 0, 0)})
+    update = Config(layout=Layout(spacing=5))
+    merged = merge_config(ColorTextDrawerConfig, base, update)
+    assert merged.layout.spacing == 5
+    assert merged.colors == {"Red": (255, 0, 0)}
+    assert (
+        merged.dict()
+        == ColorTextDrawerConfig(**{**base.dict(), **update.dict()}).dict()
+    )
+    # 新配置与原来的对象互不影响
+    update.layout.spacing = 7
+    base.colors["Blue"] = (0, 0, 255)
+    assert merged.layout.spacing == 5
+    assert "Blue" not in merged.colors
+
+
+def test_color_drawer_conf_setter():
+    ctd = ColorTextDrawer()
+    ctd.conf = ColorTextDrawerConfig(colors={"Red": (255, 0, 0)})
+    assert ctd._labels == {"<Red>", "<Reset/>"}
+    ts = ctd.ts
+    ctd.conf = Config(layout=Layout(spacing=5))
+    assert ctd.conf.colors == {"Red": (255, 0, 0)}
+    assert ctd.ts is ts
+    ctd.conf = ColorTextDrawerConfig(colors={"Red": (1, 2, 3)})
+    assert ctd.ts is ts
+    assert ctd._label_colors[ts.tokenizer.ids["<Red>"]] == (1, 2, 3)
+
+
+def test_draw_many_uses_snapshot():
+    text = "你好世界，hello world " * 10
+    for drawer in (SimpleTextDrawer(), ColorTextDrawer()):
+        expected = drawer.draw(text).size
+        images = drawer.draw_many([text] * 3)
+        assert next(images).size == expected
+        # 批次开始后修改折行与布局，不影响本批次
+        drawer.conf.typesetting.line_width = 10
+        drawer.conf.typesetting.indentation = ">>>>"
+        drawer.conf.layout.spacing = 20
+        assert [im.size for im in images] == [expected, expected]
+        assert drawer.draw(text).size != expected
+
+
+def test_lazy_import():
+    code = (
+        "import sys, impaper\n"
+        "assert 'pydantic' not in sys.modules and 'PIL' not in sys.modules\n"
+        "assert impaper.SimpleTextDrawer.__name__ == 'SimpleTextDrawer'\n"
+        "assert 'asyncio' not in sys.modules\n"
+        "assert 'SimpleTextDrawer' in dir(impaper)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_submodule_attributes():
+    code = (
+        "import impaper\n"
+        "assert impaper.draw.SimpleTextDrawer is impaper.SimpleTextDrawer\n"
+        "assert impaper.config.Config.__name__ == 'Config'\n"
+        "for name in ('canvas', 'typesetting', 'charwidth'):\n"
+        "    assert getattr(impaper, name).__name__ == 'impaper.' + name\n"
+        "assert not hasattr(impaper, 'nonexistent')\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from PIL import ImageChops
+
+from impaper import ColorTextDrawer, ColorTextDrawerConfig, SimpleTextDrawer
+from impaper.document import Document
+from impaper.typesetting import LineWrapper
+
+# 触发折行的全角字符按宽度 1 计，第二行比折行宽度多 1，文档图像与整体 draw 的结果等宽
+FULL = "你" * 24 + "你a" + "你" * 22 + "\n"
+
+
+def same(a, b) -> bool:
+    return a.size == b.size and ImageChops.difference(a, b).getbbox() is None
+
+
+def split_randomly(text: str, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(text)), 12))
+    # 不在标签内部切分
+    cuts = [c for c in cuts if text.rfind("<", 0, c) <= text.rfind(">", 0, c)]
+    return [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)])]
+
+
+def test_line_wrapper_peek():
+    w = LineWrapper(10, ">>", 2)
+    assert w.peek() is None
+    assert list(w.feed("abc", [(0, 3, 1)])) == []
+    assert w.peek() == "abc"
+    assert list(w.feed("defghijkl", [(0, 9, 1)])) == ["abcdefghij"]
+    assert w.peek() == ">>kl"
+    assert list(w.close()) == [">>kl"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_simple_document_matches_draw(seed):
+    x = SimpleTextDrawer()
+    text = (
+        FULL
+        + "".join(f"第 {i} 行 line {i} " + "长" * (i * 3) + "\n" for i in range(12))
+        + "未完成"
+    )
+    expected = x.draw(text)
+    doc = Document(x, reserve_lines=2)
+    heights = []
+    for piece in split_randomly(text, seed):
+        doc.append(piece)
+        heights.append(doc.image().height)
+    assert heights == sorted(heights)
+    assert doc.lines == len(x.ts.wrap_text(text)) - 1
+    assert same(doc.image(), expected)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_color_document_carries_color(seed):
+    x = ColorTextDrawer()
+    text = (
+        FULL
+        + "<Red>红色\n跨行"
+        + "<Green>绿色" * 10
+        + "\n<Reset/>默认\n" * 3
+        + "<Blue>蓝"
+    )
+    doc = Document(x)
+    for piece in split_randomly(text, seed):
+        doc.append(piece)
+    assert same(doc.image(), x.draw(text))
+
+
+def test_document_returns_new_lines():
+    doc = Document(SimpleTextDrawer())
+    assert doc.append("abc") == 0
+    assert doc.append("def\nghi\n") == 2
+    assert doc.lines == 2
+    assert doc.image().size == SimpleTextDrawer().canvas_size((49, 2))
+
+
+def test_document_keeps_config():
+    x = ColorTextDrawer()
+    text = "<Yellow>a<Reset/> <Red>b\n" + FULL + "<Yellow>c<Reset/> <Red>d\n"
+    expected = x.draw(text)
+    doc = Document(x)
+    doc.append(text[:20])
+    # 创建文档后修改绘制器的颜色表与折行宽度，不影响该文档
+    x.conf = ColorTextDrawerConfig(colors={"Red": (255, 0, 0)})
+    x.conf.typesetting.line_width = 10
+    doc.append(text[20:])
+    assert same(doc.image(), expected)
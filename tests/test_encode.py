@@ -0,0 +1,85 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from impaper.canvas import OutputMode, quantize_grey
+from impaper.draw import ColorTextDrawer, SimpleTextDrawer
+from impaper.encode import PRESETS, encode_image
+
+TEXT = "abcdefg,你好世界\n第二行"
+
+
+@pytest.mark.parametrize("format", ["PNG", "WEBP"])
+def test_lossless_round_trip(format):
+    x = SimpleTextDrawer()
+    data = x.draw_encoded(TEXT, format=format)
+    assert isinstance(data, bytes)
+    assert Image.open(BytesIO(data)).convert("L").tobytes() == x.draw(TEXT).tobytes()
+
+
+def test_jpeg():
+    data = ColorTextDrawer().draw_encoded(TEXT, format="jpeg", preset="small")
+    assert Image.open(BytesIO(data)).format == "JPEG"
+
+
+@pytest.mark.parametrize("drawer_cls", [SimpleTextDrawer, ColorTextDrawer])
+@pytest.mark.parametrize(
+    "output_mode",
+    [
+        None,
+        OutputMode("L"),
+        OutputMode("RGB"),
+        OutputMode("P", levels=4),
+        OutputMode("1"),
+    ],
+)
+def test_every_output_mode_and_format(drawer_cls, output_mode):
+    x = drawer_cls()
+    x.output_mode = output_mode
+    expected = x.draw(TEXT)
+    for format, presets in PRESETS.items():
+        for preset in presets:
+            im = Image.open(BytesIO(x.draw_encoded(TEXT, format=format, preset=preset)))
+            assert im.format == format
+            assert im.size == expected.size
+            if format == "JPEG" and expected.mode == "P":
+                # 灰度调色板编码为灰度 JPEG
+                assert im.mode == ("L" if drawer_cls is SimpleTextDrawer else "RGB")
+
+
+def test_palette_preset():
+    x = SimpleTextDrawer()
+    im = Image.open(BytesIO(x.draw_encoded(TEXT, preset="palette")))
+    assert im.mode == "P"
+    # 背景色与文字颜色都被保留
+    colors = {c for _, c in im.convert("L").getcolors()}
+    assert {x.bg_color, x.fg_color} <= colors
+    assert len(colors) <= 16
+
+
+def test_quantize_grey():
+    im = Image.linear_gradient("L")
+    q = quantize_grey(im, 4)
+    assert q.mode == "P"
+    assert sorted(c for _, c in q.convert("L").getcolors()) == [0, 85, 170, 255]
+    with pytest.raises(ValueError):
+        quantize_grey(im, 1)
+
+
+def test_reuse_buffer():
+    x = SimpleTextDrawer()
+    first = x.draw_encoded("a" * 200)
+    second = x.draw_encoded("b")
+    assert first == x.draw_encoded("a" * 200)
+    assert len(second) < len(first)
+    buffer = BytesIO()
+    view = x.draw_encoded("b", buffer=buffer)
+    assert isinstance(view, memoryview)
+    assert view.tobytes() == second
+    view.release()
+
+
+def test_unknown_preset():
+    with pytest.raises(ValueError):
+        encode_image(Image.new("L", (1, 1)), "PNG", "turbo")
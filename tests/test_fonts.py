@@ -0,0 +1,64 @@
+import pytest
+
+from impaper.draw import SimpleTextDrawer
+from impaper.fonts import FontRegistry
+
+FONT = "package:///res/sarasa-mono-sc-regular.ttf"
+
+
+def test_font_shared_between_drawers():
+    registry = FontRegistry()
+    a = SimpleTextDrawer()
+    b = SimpleTextDrawer()
+    a.font_registry = b.font_registry = registry
+    assert a.font is b.font
+    assert len(registry) == 1
+
+
+def test_font_bytes_read_once():
+    registry = FontRegistry(loader="bytes")
+    f14 = registry.get(FONT, 14)
+    f20 = registry.get(FONT, 20)
+    assert f14 is not f20
+    assert f14.font_bytes is f20.font_bytes
+    assert registry.get(FONT, 14) is f14
+
+
+def test_fontsize_change():
+    registry = FontRegistry()
+    x = SimpleTextDrawer()
+    x.font_registry = registry
+    assert x.font.size == 14
+    x.fontsize = 20
+    assert x.font.size == 20
+    assert len(registry) == 2
+
+
+def test_lru_eviction():
+    registry = FontRegistry(maxsize=2)
+    f10 = registry.get(FONT, 10)
+    registry.get(FONT, 11)
+    registry.get(FONT, 10)
+    registry.get(FONT, 12)
+    assert len(registry) == 2
+    assert registry.get(FONT, 10) is f10
+    registry.maxsize = 1
+    assert len(registry) == 1
+    with pytest.raises(ValueError):
+        registry.maxsize = 0
+
+
+def test_path_loader():
+    registry = FontRegistry(loader="path")
+    font = registry.get(FONT, 14)
+    assert isinstance(font.path, str)
+    assert font.path.endswith("sarasa-mono-sc-regular.ttf")
+    assert not hasattr(font, "font_bytes")
+    assert font.getbbox("\u2002") == FontRegistry(loader="bytes").get(FONT, 14).getbbox(
+        "\u2002"
+    )
+
+
+def test_invalid_loader():
+    with pytest.raises(ValueError):
+        FontRegistry(loader="mmap")
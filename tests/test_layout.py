@@ -0,0 +1,41 @@
+import pickle
+
+from impaper import ColorTextDrawer, SimpleTextDrawer, TextLayout
+
+
+def test_simple_layout():
+    x = SimpleTextDrawer()
+    text = "abc\n你好世界\n" + "x" * 60
+    layout = x.layout(text)
+    assert isinstance(layout, TextLayout)
+    assert list(layout.lines) == x.ts.wrap_text(text)
+    assert layout.text_size == x.text_size(text)
+    assert layout.canvas_size == x.draw(text).size
+    left, up = x.text_position()
+    _, fh = x.fontbox_size()
+    assert layout.positions[1] == (left, up + fh + x.conf.layout.spacing)
+    assert layout.spans[0] == ((left, "abc", x.fg_color),)
+    assert x.render(layout).tobytes() == x.draw(text).tobytes()
+
+
+def test_color_layout_spans():
+    x = ColorTextDrawer()
+    text = "默认<Red>红色<Reset/>\n仍是默认<Green>绿\n绿"
+    layout = x.layout(text)
+    left, _ = x.text_position()
+    fw, _ = x.fontbox_size()
+    red, green, fg = x.conf.colors["Red"], x.conf.colors["Green"], x.fg_color
+    assert layout.spans[0] == ((left, "默认", fg), (left + 4 * fw, "红色", red))
+    assert layout.spans[1] == ((left, "仍是默认", fg), (left + 8 * fw, "绿", green))
+    assert layout.spans[2] == ((left, "绿", green),)
+    # 标签不计入宽度
+    assert layout.text_size == (10, 3)
+    assert x.render(layout).tobytes() == x.draw(text).tobytes()
+
+
+def test_layout_pickle():
+    x = ColorTextDrawer()
+    layout = x.layout("<Red>红色<Reset/>abc\n" * 3)
+    restored = pickle.loads(pickle.dumps(layout))
+    assert restored == layout
+    assert x.render(restored).tobytes() == x.render(layout).tobytes()
@@ -0,0 +1,52 @@
+import pytest
+from PIL import ImageChops
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+from impaper.typesetting import TypeSetting
+
+
+def same(a, b) -> bool:
+    return a.size == b.size and ImageChops.difference(a, b).getbbox() is None
+
+
+def test_typesetting_iter_pages():
+    ts = TypeSetting()
+    ts.conf.line_width = 10
+    text = "1234567890" * 3 + "\nabc"
+    lines = ts.wrap_text(text)
+    assert len(lines) == 5
+    pages = list(ts.iter_pages(text, 2))
+    assert pages == [lines[0:2], lines[2:4], lines[4:]]
+    with pytest.raises(ValueError):
+        next(ts.iter_pages("abc", 0))
+
+
+@pytest.mark.parametrize("max_height", [40, 100, 333])
+def test_simple_pages(max_height):
+    x = SimpleTextDrawer()
+    text = "".join(f"第 {i} 行 line {i}\n" for i in range(30))
+    pages = list(x.iter_pages(text, max_height))
+    n = x.page_lines(max_height)
+    lines = x.ts.wrap_text(text)
+    assert len(pages) == -(-len(lines) // n)
+    assert all(p.height <= max_height for p in pages)
+    # 除最后一页外，再多一行就会超出高度
+    assert x.canvas_size((1, n + 1))[1] > max_height
+    for i, page in enumerate(pages):
+        assert same(page, x.draw("\n".join(lines[i * n : (i + 1) * n])))
+
+
+def test_color_pages_carry_color():
+    x = ColorTextDrawer()
+    text = "<Red>" + "红色\n" * 5 + "<Reset/>默认\n<Green>绿色"
+    pages = list(x.iter_pages(text, x.canvas_size((1, 2))[1]))
+    assert len(pages) == 4
+    # 第二页没有标签，但仍是红色
+    assert same(pages[1], x.draw("<Red>红色\n红色"))
+    assert same(pages[2], x.draw("<Red>红色<Reset/>\n默认"))
+
+
+def test_page_too_small():
+    x = SimpleTextDrawer()
+    with pytest.raises(ValueError):
+        x.page_lines(10)
@@ -0,0 +1,39 @@
+from impaper.atlas import GlyphAtlas
+from impaper.config import ColorTextDrawerConfig
+from impaper.draw import ColorTextDrawer, SimpleTextDrawer
+from impaper.pool import RenderPool
+from impaper.typesetting import TypeSettingConfig
+
+
+def test_render_pool_keeps_order():
+    texts = [f"第 {i} 条消息 message" * (i % 5 + 1) for i in range(12)]
+    drawer = SimpleTextDrawer()
+    with RenderPool(SimpleTextDrawer, processes=2, max_inflight=3) as pool:
+        result = list(pool.imap(texts))
+        stats = pool.stats()
+    assert result == [drawer.draw_encoded(t) for t in texts]
+    assert sum(s.images for s in stats.values()) == len(texts)
+    assert all(s.throughput > 0 for s in stats.values())
+
+
+def test_render_pool_from_drawer():
+    drawer = ColorTextDrawer()
+    drawer.conf = ColorTextDrawerConfig(typesetting=TypeSettingConfig(line_width=10))
+    drawer.fontsize = 20
+    drawer.bg_color = (0, 0, 0)
+    text = "<Red>你好世界<Reset/>，hello world"
+    with RenderPool.from_drawer(drawer, processes=1) as pool:
+        assert pool.render(text) == drawer.draw_encoded(text)
+
+
+def test_render_pool_glyph_atlas():
+    drawer = SimpleTextDrawer()
+    drawer.glyph_atlas = GlyphAtlas()
+    # 字形图集把 → … 放在网格上，与 FreeType 直接绘制的结果不同
+    text = "step 1 → step 2 … done"
+    expected = drawer.draw_encoded(text)
+    assert expected != SimpleTextDrawer().draw_encoded(text)
+    with RenderPool.from_drawer(drawer, processes=1) as pool:
+        assert pool.render(text) == expected
+    with RenderPool(SimpleTextDrawer, glyph_atlas=True, processes=1) as pool:
+        assert pool.render(text) == expected
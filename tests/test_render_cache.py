@@ -0,0 +1,92 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from impaper import ColorTextDrawer, ColorTextDrawerConfig, OutputMode, SimpleTextDrawer
+from impaper.render_cache import (
+    DiskRenderCache,
+    MemoryRenderCache,
+    pack_image,
+    unpack_image,
+)
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryRenderCache()
+    return DiskRenderCache(tmp_path / "cache")
+
+
+def test_pack_image_round_trip():
+    x = SimpleTextDrawer()
+    for mode in (None, OutputMode("P", levels=4), OutputMode("1")):
+        x.output_mode = mode
+        im = x.draw("你好 hello")
+        restored = unpack_image(pack_image(im))
+        assert restored.mode == im.mode and restored.size == im.size
+        assert restored.tobytes() == im.tobytes()
+        assert restored.getpalette() == im.getpalette()
+
+
+def test_draw_cached(cache):
+    x = SimpleTextDrawer()
+    x.render_cache = cache
+    expected = x.draw("你好 hello")
+    assert x.draw("你好 hello").tobytes() == expected.tobytes()
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    png = x.draw_encoded("你好 hello")
+    assert x.draw_encoded("你好 hello") == png
+    buffer = BytesIO()
+    assert bytes(x.draw_encoded("你好 hello", buffer=buffer)) == png
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (3, 2, 2)
+
+
+def test_config_changes_invalidate(cache):
+    x = ColorTextDrawer()
+    x.render_cache = cache
+    text = "<Red>红色<Reset/>默认"
+    first = x.draw(text)
+    x.conf = ColorTextDrawerConfig(colors={"Red": (255, 0, 0)})
+    second = x.draw(text)
+    assert first.tobytes() != second.tobytes()
+    x.conf.layout.spacing = 10
+    x.fontsize = 20
+    x.fg_color = (1, 2, 3)
+    x.draw(text)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (0, 3)
+    x.draw(text)
+    assert cache.stats().hits == 1
+
+
+def test_memory_byte_limit():
+    x = SimpleTextDrawer()
+    x.render_cache = MemoryRenderCache(max_bytes=20000)
+    for i in range(10):
+        x.draw(f"第 {i} 段")
+    stats = x.render_cache.stats()
+    assert stats.nbytes <= 20000
+    assert stats.evictions > 0
+
+
+def test_disk_eviction_and_sharing(tmp_path):
+    directory = tmp_path / "cache"
+    x = SimpleTextDrawer()
+    x.render_cache = DiskRenderCache(directory, max_bytes=4096)
+    for i in range(20):
+        x.draw_encoded(f"第 {i} 段")
+    stats = x.render_cache.stats()
+    assert stats.evictions > 0
+    assert stats.nbytes <= 4096
+    assert stats.entries == len(os.listdir(directory))
+    # 另一个缓存对象（如另一个进程）可以读到已写入的结果
+    y = SimpleTextDrawer()
+    y.render_cache = DiskRenderCache(directory)
+    assert y.draw_encoded("第 19 段") == x.draw_encoded("第 19 段")
+    assert y.render_cache.stats().hits == 1
+    y.render_cache.clear()
+    assert os.listdir(directory) == []
@@ -1,7 +1,9 @@
+from impaper.canvas import OutputMode
 from impaper.draw import SimpleTextDrawer
 from impaper.config import Config
 from impaper.typesetting import TypeSettingConfig
 
+
 def test_dynamic_config():
     x = SimpleTextDrawer()
     assert id(x.conf.typesetting) == id(x.ts.conf)
@@ -9,3 +11,30 @@ def test_dynamic_config():
     x.conf = Config(typesetting=TypeSettingConfig(line_width=100))
     assert id(x.conf.typesetting) == id(x.ts.conf)
     assert x.ts.conf.line_width == 100
+
+
+def test_draw_many():
+    x = SimpleTextDrawer()
+    texts = ["abc", "你好世界\n第二行", "x" * 100]
+    expected = [x.draw(t).tobytes() for t in texts]
+    assert [im.tobytes() for im in x.draw_many(texts)] == expected
+    assert [
+        im.tobytes() for im in x.draw_many(iter(texts * 3), workers=2)
+    ] == expected * 3
+
+
+def test_output_mode():
+    x = SimpleTextDrawer()
+    grey = x.draw("你好世界 hello")
+    x.output_mode = OutputMode("P", levels=4)
+    p = x.draw("你好世界 hello")
+    assert p.mode == "P" and p.size == grey.size
+    assert len(p.getcolors()) <= 4
+    x.output_mode = OutputMode("1", threshold=128)
+    bw = x.draw("你好世界 hello")
+    assert bw.mode == "1"
+    assert (
+        bw.tobytes() == grey.point(lambda v: 255 if v >= 128 else 0, mode="1").tobytes()
+    )
+    x.output_mode = OutputMode("L")
+    assert x.draw("你好世界 hello").tobytes() == grey.tobytes()
@@ -0,0 +1,83 @@
+import pytest
+from PIL import Image, ImageChops
+
+from impaper import ColorTextDrawer, SimpleTextDrawer
+
+
+def stitch(tiles, mode):
+    width = max(t.box[2] for t in tiles)
+    height = max(t.box[3] for t in tiles)
+    im = Image.new(mode, (width, height))
+    for tile in tiles:
+        assert tile.image.size == (tile.box[2] - tile.box[0], tile.box[3] - tile.box[1])
+        im.paste(tile.image, tile.box[:2])
+    return im
+
+
+# 折行时触发折行的全角字符按宽度 1 计，第二行比折行宽度多 1，完整图像与分块图像等宽
+FULL = "你" * 24 + "你a" + "你" * 22 + "\n"
+
+
+@pytest.mark.parametrize("tile_height", [16, 37, 100, 4096])
+def test_simple_tiles_stitch(tile_height):
+    x = SimpleTextDrawer()
+    text = FULL + "你好世界，gjpqy hello\n" * 20
+    tiles = list(x.iter_tiles(text, tile_height))
+    assert [t.index for t in tiles] == list(range(len(tiles)))
+    assert all(t.image.height == tile_height for t in tiles[:-1])
+    expected = x.draw(text)
+    assert ImageChops.difference(stitch(tiles, "L"), expected).getbbox() is None
+
+
+@pytest.mark.parametrize("tile_height", [16, 50])
+def test_color_tiles_carry_color(tile_height):
+    x = ColorTextDrawer()
+    text = (
+        FULL
+        + "<Red>红色跨越\n多行\n"
+        + "仍是红色<Reset/>默认\n" * 10
+        + "<Green>"
+        + "绿" * 60
+    )
+    tiles = list(x.iter_tiles(text, tile_height))
+    expected = x.draw(text)
+    assert ImageChops.difference(stitch(tiles, "RGB"), expected).getbbox() is None
+
+
+def test_tiles_bounded_rows():
+    x = SimpleTextDrawer()
+    tiles = x.iter_tiles("hello\n" * 1000, 64)
+    first = next(tiles)
+    assert first.box == (0, 0, first.image.width, 64)
+    # 第一块在读完全部文本之前就已返回
+    frame = tiles.gi_frame
+    assert frame is None or len(frame.f_locals["rows"]) < 10
+    with pytest.raises(ValueError):
+        next(x.iter_tiles("hello", 8))
+
+
+def test_save_tiles(tmp_path):
+    x = SimpleTextDrawer()
+    saved = x.save_tiles("hello\n" * 100, str(tmp_path / "tile-{index:03d}.png"), 256)
+    assert len(saved) == len(list(tmp_path.iterdir()))
+    path, box = saved[0]
+    assert path.endswith("tile-000.png")
+    with Image.open(path) as im:
+        assert im.size == (box[2] - box[0], box[3] - box[1])
+
+
+def test_tiles_overflowing_line(tmp_path):
+    x = SimpleTextDrawer()
+    x.fontsize = 28
+    text = FULL * 3
+    expected = x.draw(text)
+    assert x.text_size(text)[0] == 49
+    tiles = list(x.iter_tiles(text, 64))
+    assert tiles[0].image.width == expected.width
+    assert ImageChops.difference(stitch(tiles, "L"), expected).getbbox() is None
+    saved = x.save_tiles(text, str(tmp_path / "tile-{index:03d}.png"), 64)
+    im = Image.new("L", expected.size)
+    for path, box in saved:
+        with Image.open(path) as tile:
+            im.paste(tile, box[:2])
+    assert ImageChops.difference(im, expected).getbbox() is None
@@ -0,0 +1,84 @@
+import logging
+
+from impaper.atlas import GlyphAtlas
+from impaper.draw import ColorTextDrawer, SimpleTextDrawer
+from impaper.render_cache import MemoryRenderCache
+from impaper.timing import CallbackSink, DrawTiming, HistogramSink, LoggingSink
+
+
+def test_draw_stages():
+    timings = []
+    ctd = ColorTextDrawer()
+    ctd.timing_sink = CallbackSink(timings.append)
+    text = "<Red>你好<Reset/>世界\nhello <Blue>world"
+    image = ctd.draw(text)
+    ctd.draw_encoded(text)
+
+    draw, encoded = timings
+    assert draw.operation == "draw"
+    assert list(draw.stages) == [
+        "prepare",
+        "wrap",
+        "layout",
+        "canvas",
+        "raster",
+        "finish",
+    ]
+    assert draw.chars == len(text)
+    assert draw.lines == 2
+    assert draw.glyph_calls == 4
+    assert draw.render_cache_hit is None
+    assert list(encoded.stages)[-1] == "encode"
+    assert encoded.total >= encoded.stages["raster"] > 0
+
+    ctd.timing_sink = None
+    assert ctd.draw(text).tobytes() == image.tobytes()
+
+
+def test_layout_render_and_caches():
+    timings = []
+    std = SimpleTextDrawer()
+    std.timing_sink = CallbackSink(timings.append)
+    std.render_cache = MemoryRenderCache()
+    std.glyph_atlas = GlyphAtlas()
+    std.draw("你好世界")
+    std.draw("你好世界")
+    std.render(std.layout("abc"))
+
+    miss, hit, layout, render = timings
+    assert miss.render_cache_hit is False
+    assert miss.atlas_misses == 4 and miss.atlas_hits == 0
+    assert hit.render_cache_hit is True
+    assert list(hit.stages) == ["cache"]
+    assert list(layout.stages) == ["prepare", "wrap", "layout"]
+    assert render.operation == "render" and render.lines == 1
+    assert render.atlas_misses == 3
+
+
+def test_histogram_sink():
+    sink = HistogramSink()
+    for ms in range(1, 101):
+        sink.record(
+            DrawTiming("draw", {"raster": ms / 1000}, 10, 1, 1, ms % 2 == 0, 3, 1)
+        )
+    summary = sink.summary()
+    raster = summary["raster"]
+    assert raster.count == 100
+    assert abs(raster.total - 5.05) < 1e-9
+    assert raster.max == 0.1
+    assert 0.050 <= raster.p50 <= 0.050 * 1.19
+    assert 0.099 <= raster.p99 <= 0.1
+    assert summary["total"].count == 100
+    assert sink.calls == 100 and sink.chars == 1000
+    assert sink.render_cache_hit_rate == 0.5
+    assert sink.atlas_hit_rate == 0.75
+
+
+def test_logging_sink(caplog):
+    std = SimpleTextDrawer()
+    std.timing_sink = LoggingSink()
+    with caplog.at_level(logging.DEBUG, logger="impaper.timing"):
+        std.draw("hello")
+    (record,) = caplog.records
+    assert record.getMessage().startswith("draw total=")
+    assert "raster=" in record.getMessage()
@@ -1,4 +1,14 @@
-from impaper.typesetting import TypeSetting, IgnorableTypeSetting
+import random
+
+import pytest
+
+from impaper.charwidth import char_width, string_width
+from impaper.typesetting import (
+    IgnorableTypeSetting,
+    LabelTokenizer,
+    LineWrapper,
+    TypeSetting,
+)
 
 
 def test_typesetting():
@@ -111,3 +121,162 @@ def test_ignorabletypesetting_wrap_text():
     line2 = wrapped2[0]
     cleaned2 = ts2.label_re.sub("", line2)
     assert cleaned == cleaned2
+
+
+def reference_wrap_text(txt, line_width, indentation, indent_size, widths):
+    "改动前两遍扫描的折行实现，作为对照"
+    signs = {}
+    width = 0
+    for i, token, cw in widths:
+        if token == "\n":
+            signs[i] = 1
+            width = 0
+            continue
+        if width + cw > line_width:
+            signs[i] = 2
+            width = indent_size + 1
+            continue
+        width += cw
+    lines = []
+    cursor = 0
+    need_wrap = False
+    for seq, sign in signs.items():
+        prefix = indentation if need_wrap else ""
+        if sign == 1:
+            lines.append(prefix + txt[cursor:seq])
+            need_wrap = False
+            cursor = seq + 1
+        else:
+            lines.append(prefix + txt[cursor:seq])
+            cursor = seq
+            need_wrap = True
+    if txt[cursor:]:
+        lines.append((indentation if need_wrap else "") + txt[cursor:])
+    return lines
+
+
+def random_texts(alphabet, count=300, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 300)))
+
+
+@pytest.mark.parametrize("line_width", [1, 2, 3, 10, 48])
+@pytest.mark.parametrize("indentation", ["", "  ", ">>>", "缩进"])
+def test_wrap_text_differential(line_width, indentation):
+    ts = TypeSetting()
+    ts.conf.line_width = line_width
+    ts.conf.indentation = indentation
+    for text in random_texts("ab \n你好，́\x0e😀", count=50):
+        widths = [(i, c, char_width(c)) for i, c in enumerate(text)]
+        expected = reference_wrap_text(
+            text, line_width, indentation, ts.indent_size, widths
+        )
+        assert ts.wrap_text(text) == expected
+        assert list(ts.iter_wrapped_lines(text)) == expected
+
+
+def test_ignorable_wrap_text_differential():
+    ts = IgnorableTypeSetting(labels={"<A>", "<A/>"})
+    ts.conf.line_width = 10
+    for text in random_texts(["a", "你", " ", "\n", "<A>", "<A/>"], count=200):
+        widths = [
+            (i, t, 0 if t in ts.labels else char_width(t))
+            for i, t in ts.iter_tokens(text)
+        ]
+        expected = reference_wrap_text(
+            text, 10, ts.conf.indentation, ts.indent_size, widths
+        )
+        assert ts.wrap_text(text) == expected
+
+
+def test_line_wrapper_feed_in_pieces():
+    ts = TypeSetting()
+    ts.conf.line_width = 7
+    text = "abc你好世界\nxyz 12345678 你好"
+    wrapper = LineWrapper(7, ts.conf.indentation, ts.indent_size)
+    lines = []
+    for piece in (text[:4], text[4:9], text[9:]):
+        lines.extend(wrapper.feed(piece, ts._iter_spans(piece)))
+    lines.extend(wrapper.close())
+    assert lines == ts.wrap_text(text)
+
+
+def random_run_texts(count=200, seed=1):
+    "由长段 ASCII、长段汉字、零宽字符、emoji、换行拼成的文本，覆盖按段计算折行的路径"
+    rng = random.Random(seed)
+    pieces = [
+        lambda: "x" * rng.randint(1, 120),
+        lambda: "汉" * rng.randint(1, 80),
+        lambda: "é" * rng.randint(1, 5),
+        lambda: "😀" * rng.randint(1, 3),
+        lambda: "\n" * rng.randint(1, 2),
+        lambda: "<A>" if rng.random() < 0.5 else "<A/>",
+    ]
+    for _ in range(count):
+        yield "".join(rng.choice(pieces)() for _ in range(rng.randint(0, 12)))
+
+
+@pytest.mark.parametrize("line_width", [0, 1, 2, 5, 48, 80])
+@pytest.mark.parametrize("indentation", ["", "  ", "缩进"])
+def test_wrap_text_runs_differential(line_width, indentation):
+    ts = TypeSetting()
+    its = IgnorableTypeSetting(labels={"<A>", "<A/>"})
+    for t in (ts, its):
+        t.conf.line_width = line_width
+        t.conf.indentation = indentation
+    for text in random_run_texts():
+        widths = [(i, c, char_width(c)) for i, c in enumerate(text)]
+        expected = reference_wrap_text(
+            text, line_width, indentation, ts.indent_size, widths
+        )
+        assert ts.wrap_text(text) == expected
+        widths = [
+            (i, t, 0 if t in its.labels else char_width(t))
+            for i, t in its.iter_tokens(text)
+        ]
+        expected = reference_wrap_text(
+            text, line_width, indentation, its.indent_size, widths
+        )
+        assert its.wrap_text(text) == expected
+
+
+def test_label_tokenizer():
+    tokenizer = LabelTokenizer({"<Re", "<Red>", "[x]", "a+", ""})
+    # 长的标签优先，元字符按字面匹配，空标签被忽略
+    assert tokenizer.labels == ("<Red>", "<Re", "[x]", "a+")
+    ids = tokenizer.ids
+    assert tokenizer.split("<Red>x<Re[x]aa+") == (
+        ids["<Red>"],
+        "x",
+        ids["<Re"],
+        ids["[x]"],
+        "a",
+        ids["a+"],
+    )
+    assert tokenizer.tokenize("x<Red>") == [(1, 6, ids["<Red>"])]
+    assert LabelTokenizer().split("abc") == ("abc",)
+
+
+@pytest.mark.parametrize("line_width", [1, 3, 10])
+@pytest.mark.parametrize("indentation", ["", ">>>", "缩进"])
+def test_iter_token_lines(line_width, indentation):
+    ts = TypeSetting()
+    its = IgnorableTypeSetting(labels={"<A>", "<A/>", "<A"})
+    for t in (ts, its):
+        t.conf.line_width = line_width
+        t.conf.indentation = indentation
+    for text in random_run_texts(count=100):
+        for t in (ts, its):
+            token_lines = list(t.iter_token_lines(text))
+            assert [line.text for line in token_lines] == t.wrap_text(text)
+            assert [(line.text, line.width) for line in token_lines] == list(
+                t.iter_measured_lines(text)
+            )
+            for line, width, tokens in token_lines:
+                # 整段分词得到的结果与逐行分词一致
+                assert tokens == t.line_tokens(line)
+                # 折行时得出的宽度与去掉标签后测量的宽度一致
+                assert width == string_width(
+                    t.label_re.sub("", line) if t is its else line
+                )